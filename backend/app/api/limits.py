@@ -0,0 +1,232 @@
+import json
+from typing import Callable
+
+from fastapi import HTTPException
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.ingest import PDF_HEADER_WINDOW, FileContentError, check_signature, check_size
+from app.services.metrics import record_error
+
+
+class BodyTooLargeError(HTTPException):
+    """Raised from receive(); FastAPI renders it like any HTTPException raised while parsing the form"""
+
+
+class UploadRejectedError(HTTPException):
+    """Raised from receive() when a file part fails its size or type check"""
+
+
+async def _reject(send: Send, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 400,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class BodySizeLimitMiddleware:
+    """Reject request bodies over a per-path byte limit while they stream in.
+
+    limits maps each path to its byte limit and the detail to reject with.
+    A Content-Length above the limit is refused before any body is read;
+    chunked bodies are counted as they arrive and cut off once they cross it.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, tuple[int, str]]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit_for_path = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit_for_path is None:
+            await self.app(scope, receive, send)
+            return
+        limit, detail = limit_for_path
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await _reject(send, detail)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise BodyTooLargeError(status_code=400, detail=detail)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except BodyTooLargeError as e:
+            if not started:
+                await _reject(send, e.detail)
+
+
+class _FilePartChecker:
+    """Feeds a multipart body through a streaming parser and checks each file part as it arrives"""
+
+    def __init__(self, boundary: bytes, part_limit: Callable[[str], int]):
+        self.part_limit = part_limit
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._file_name: str | None = None
+        self._head = bytearray()
+        self._size = 0
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk: bytes) -> None:
+        """Raises UploadRejectedError naming the first file that fails"""
+        try:
+            self._parser.write(chunk)
+        except FileContentError as e:
+            raise UploadRejectedError(status_code=400, detail=f"{self._file_name}: {e}")
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+        self._file_name = None
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"filename" in options:
+            self._file_name = options[b"filename"].decode("utf-8", errors="replace")
+            self._head = bytearray()
+            self._size = 0
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._file_name is None:
+            return
+        if len(self._head) < PDF_HEADER_WINDOW:
+            self._head += data[start:min(end, start + PDF_HEADER_WINDOW - len(self._head))]
+            if len(self._head) == PDF_HEADER_WINDOW:
+                check_signature(self._head, self._file_name)
+        self._size += end - start
+        check_size(self._size, self.part_limit(self._file_name))
+
+    def _on_part_end(self) -> None:
+        if self._file_name is not None and 0 < len(self._head) < PDF_HEADER_WINDOW:
+            check_signature(self._head, self._file_name)
+
+
+class UploadCheckMiddleware:
+    """Check each file of a multipart upload while the body streams in.
+
+    paths maps each path to a function giving the size limit for a file
+    name. A file part whose leading bytes do not match its extension, or
+    that grows past its limit, fails the whole request with 400 naming the
+    file, before the rest of the body is read and spooled.
+    """
+
+    def __init__(self, app: ASGIApp, paths: dict[str, Callable[[str], int]]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        part_limit = self.paths.get(scope["path"]) if scope["type"] == "http" else None
+        if part_limit is None:
+            await self.app(scope, receive, send)
+            return
+        content_type, options = parse_options_header(dict(scope["headers"]).get(b"content-type", b""))
+        if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+            await self.app(scope, receive, send)
+            return
+
+        checker = _FilePartChecker(options[b"boundary"], part_limit)
+        started = False
+
+        async def checked_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                checker.feed(message.get("body", b""))
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, checked_receive, tracking_send)
+        except UploadRejectedError as e:
+            if not started:
+                await _reject(send, e.detail)
+
+
+class AdmissionMiddleware:
+    """Admit uploads through the admission controller before their body is read.
+
+    paths maps each admitted path to the cost charged when a request has no
+    Content-Length; otherwise the request is charged its Content-Length. Shed requests get a 429/503 with Retry-After without touching
+    the body. The permit is exposed as request.state.admission so the route
+    can hand its slot over to the parse job or batch.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, paths: dict[str, int]):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        cost = int(content_length) if content_length is not None and content_length.isdigit() else self.paths[scope["path"]]
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        try:
+            permit = await self.controller.acquire(client, cost)
+        except AdmissionRejected as e:
+            record_error("admission", e.status_code, e)
+            body = json.dumps({"detail": e.detail}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": e.status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        scope.setdefault("state", {})["admission"] = permit
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            permit.release()
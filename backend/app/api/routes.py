@@ -1,25 +1,60 @@
+import asyncio
+import hashlib
+import json
 import uuid
+import zipfile
 from datetime import datetime
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import AsyncIterator, Callable
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-from app.models.schemas import ResumeUploadResponse, ResumeSummary, ErrorResponse
-from app.services.storage import storage
-from app.services.parser import extract_text, parse_resume
+from app.models.schemas import (
+    ResumeUploadResponse, ResumeSummary, ErrorResponse, BatchUploadResponse, ResumeSearchHit, ResumeSearchResponse,
+    JobMatchRequest, JobMatchHit, JobMatchResponse
+)
+from app.services.storage import SerializedSummary, storage
+from app.services.extraction import extraction_executor, validate_extracted_text
+from app.services.jobs import job_queue, inflight, ParseJob, QueueFullError
+from app.services.batches import batch_processor, BatchSource
+from app.services.events import progress
+from app.services.search import resume_index, ResumeQuery
+from app.services.ranking import ranking_index
+from app.services.dedup import reuse_near_duplicate
+from app.services.reparse import reparse_job
+from app.services.ingest import FileContentError, IngestedFile, check_signature, check_size, read_upload
+from app.services.metrics import cache_lookups, current_file_type, file_type_of, record_error, timed
 
 
 router = APIRouter(prefix="/api/resumes", tags=["resumes"])
 
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_ARCHIVE_SIZE = 100 * 1024 * 1024  # 100MB
+# Multipart boundaries and part headers on top of the files themselves
+UPLOAD_BODY_LIMIT = MAX_FILE_SIZE + 64 * 1024
+BATCH_BODY_LIMIT = MAX_ARCHIVE_SIZE + 64 * 1024
+MAX_BATCH_ITEMS = 200
 ALLOWED_EXTENSIONS = {".pdf", ".txt", ".docx"}
+SSE_KEEPALIVE_SECONDS = 15
+MAX_SEARCH_LIMIT = 100
+
+
+def upload_size_limit(file_name: str) -> int:
+    """Largest accepted size of one uploaded file"""
+    return MAX_ARCHIVE_SIZE if file_name.lower().endswith(".zip") else MAX_FILE_SIZE
 
 
 def validate_file(file: UploadFile) -> None:
     """Validate uploaded file"""
-    if not file.filename:
+    validate_file_name(file.filename)
+
+
+def validate_file_name(file_name: str | None) -> None:
+    """Validate a file name against the allowed extensions"""
+    if not file_name:
         raise HTTPException(status_code=400, detail="No file name provided")
 
-    ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
+    ext = "." + file_name.split(".")[-1].lower() if "." in file_name else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
@@ -27,133 +62,414 @@ def validate_file(file: UploadFile) -> None:
         )
 
 
+def _cached_upload_response(resume_data: dict, file_name: str) -> ResumeUploadResponse:
+    """Upload response pointing at an existing (completed or in-flight) resume"""
+    return ResumeUploadResponse(
+        id=resume_data["id"],
+        fileName=file_name,
+        uploadDate=resume_data.get("uploadDate", datetime.utcnow()),
+        status=resume_data["status"]
+    )
+
+
+def _split_terms(values: list[str] | None) -> list[str]:
+    """Accept both repeated query parameters and comma-separated lists"""
+    return [term.strip() for value in values or [] for term in value.split(",") if term.strip()]
+
+
+@router.get(
+    "",
+    response_model=ResumeSearchResponse,
+    responses={400: {"model": ErrorResponse}}
+)
+async def search_resumes(
+    skills: list[str] | None = Query(default=None, description="Skills the candidate must all have"),
+    anySkills: list[str] | None = Query(default=None, description="Skills of which the candidate needs at least one"),
+    notSkills: list[str] | None = Query(default=None, description="Skills the candidate must not have"),
+    role: str | None = Query(default=None, description="Words that must all appear in the current role"),
+    location: str | None = Query(default=None, description="Words that must all appear in the location"),
+    minYears: int | None = Query(default=None, ge=0),
+    maxYears: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=20, ge=1, le=MAX_SEARCH_LIMIT),
+    cursor: str | None = None
+):
+    """
+    Search parsed resumes, newest first.
+
+    All given filters must match, e.g. `?skills=python,kubernetes&minYears=5&location=berlin`.
+    Follow `nextCursor` to page through the results.
+    """
+    query = ResumeQuery(
+        all_skills=_split_terms(skills),
+        any_skills=_split_terms(anySkills),
+        not_skills=_split_terms(notSkills),
+        role=role,
+        location=location,
+        min_years=minYears,
+        max_years=maxYears
+    )
+    try:
+        page = resume_index.search(query, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items = []
+    for resume_id in page.ids:
+        resume_data = storage.get_resume(resume_id)
+        if not resume_data or not resume_data["summary"]:
+            continue
+        summary = resume_data["summary"]
+        items.append(ResumeSearchHit(
+            id=resume_id,
+            fileName=resume_data["fileName"],
+            uploadDate=resume_data["uploadDate"],
+            name=summary.name,
+            currentRole=summary.currentRole,
+            experienceYears=summary.experienceYears,
+            location=summary.location,
+            skills=summary.skills
+        ))
+
+    return ResumeSearchResponse(total=page.total, items=items, nextCursor=page.next_cursor)
+
+
+@router.post(
+    "/match",
+    response_model=JobMatchResponse
+)
+async def match_resumes(request: JobMatchRequest):
+    """
+    Rank every parsed resume against a job description, best match first.
+
+    Scores are TF-IDF cosine similarities over skills, role, summary and resume text;
+    no LLM call is made.
+    """
+    # Vectorized scoring is CPU-bound; keep it off the event loop
+    result = await asyncio.to_thread(ranking_index.rank, request.jobDescription, request.limit)
+
+    items = []
+    for resume_id, score in zip(result.ids, result.scores):
+        resume_data = storage.get_resume(resume_id)
+        if not resume_data or not resume_data["summary"]:
+            continue
+        items.append(JobMatchHit(
+            id=resume_id,
+            score=score,
+            name=resume_data["summary"].name,
+            currentRole=resume_data["summary"].currentRole
+        ))
+
+    return JobMatchResponse(candidates=result.candidates, items=items)
+
+
 @router.post(
     "/upload",
     response_model=ResumeUploadResponse,
-    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}}
+    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}}
 )
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(request: Request, file: UploadFile = File(...)):
     """
     Upload a resume file (PDF, TXT, or DOCX) for parsing.
     Maximum file size: 10MB
+
+    Parsing runs in the background; poll the summary endpoint until it completes.
+    Under overload the upload is shed with 429 or 503 and a Retry-After header.
     """
     validate_file(file)
+    file_type = file_type_of(file.filename)
+    current_file_type.set(file_type)
 
-    # Read file content
-    file_content = await file.read()
-
-    # Check file size
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+    # Copy the file to disk in chunks, hashing it; the extraction pool reads it from there
+    try:
+        with timed("read"):
+            ingested = await read_upload(file, MAX_FILE_SIZE)
+    except FileContentError as e:
+        record_error("read", 400, e)
+        raise HTTPException(status_code=400, detail=str(e))
 
-    if len(file_content) == 0:
-        raise HTTPException(status_code=400, detail="File is empty")
+    # The spooled copy is only needed until the response; the parse works from the text
+    try:
+        # Exact re-uploads are answered from the raw-byte cache without extracting again
+        raw_hash = ingested.raw_hash
+        cached_resume = storage.get_resume_by_raw_hash(raw_hash)
+        if cached_resume and cached_resume.get("status") in ("processing", "completed"):
+            cache_lookups.inc("raw", "hit")
+            return _cached_upload_response(cached_resume, file.filename)
+        cache_lookups.inc("raw", "miss")
 
-    # Generate unique ID
-    resume_id = str(uuid.uuid4())
+        # Generate unique ID
+        resume_id = str(uuid.uuid4())
 
-    try:
-        # Extract text from file
+        # Extract text from file off the event loop
+        progress.stage(resume_id, "extracting")
         try:
-            text_content = extract_text(file_content, file.filename)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Could not extract text from file: {str(e)}. Please ensure the file is a valid PDF, DOCX, or TXT format."
-            )
+            try:
+                extracted = await extraction_executor.extract(ingested.path, file.filename)
+            except Exception as e:
+                progress.stage(resume_id, "error")
+                record_error("extract", 400, e)
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Could not extract text from file: {str(e)}. Please ensure the file is a valid PDF, DOCX, or TXT format."
+                )
 
-        if not text_content.strip():
-            raise HTTPException(status_code=400, detail="Could not extract text from file. The file may be corrupted or empty.")
-        
-        # Check if extracted text is too short (likely not a resume)
-        if len(text_content.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="The extracted text is too short to be a valid resume. Please upload a complete resume document."
+            text_content = extracted.text
+            try:
+                validate_extracted_text(text_content)
+            except ValueError as e:
+                progress.stage(resume_id, "error")
+                record_error("validate", 400, e)
+                raise HTTPException(status_code=400, detail=str(e))
+
+            # Check cache using MD5 hash of extracted text
+            with timed("hash"):
+                text_hash = storage.compute_hash(text_content)
+            cached_resume = storage.get_resume_by_hash(text_hash)
+    
+            if cached_resume and cached_resume.get("summary") and cached_resume.get("status") == "completed":
+                # Return cached result - use existing resume_id
+                cache_lookups.inc("text", "hit")
+                storage.cache_raw_hash(raw_hash, cached_resume["id"])
+                return _cached_upload_response(cached_resume, file.filename)
+            cache_lookups.inc("text", "miss")
+
+            # Near-identical resumes (e.g. a changed phone number) reuse an existing summary
+            reused = reuse_near_duplicate(resume_id, file.filename, text_content, text_hash, raw_hash)
+            if reused:
+                progress.stage(resume_id, "completed")
+                return _cached_upload_response(reused, file.filename)
+
+            # Concurrent uploads of the same resume share a single parse
+            owner = inflight.claim(text_hash, resume_id)
+            if owner:
+                return _cached_upload_response(storage.get_resume(owner[0]), file.filename)
+
+            # Store resume
+            with storage.transaction():
+                stored = storage.store_resume(
+                    resume_id=resume_id,
+                    file_name=file.filename,
+                    file_content=text_content,
+                    status="processing"
+                )
+                storage.cache_raw_hash(raw_hash, resume_id)
+
+            # Hand off to the parse workers; the client polls the summary endpoint
+            job = ParseJob(
+                resume_id=resume_id, text_content=text_content, text_hash=text_hash, file_type=file_type,
+                page_lines=extracted.page_lines
             )
+            permit = getattr(request.state, "admission", None)
+            if permit:
+                # The upload stays admitted until its parse finishes, not just until we respond
+                job.on_done = permit.hand_off()
+            try:
+                job_queue.submit(job)
+            except QueueFullError as e:
+                if job.on_done:
+                    job.on_done()
+                record_error("queue", 503, e)
+                inflight.release(text_hash)
+                storage.delete_resume(resume_id)
+                raise HTTPException(
+                    status_code=503,
+                    detail="The server is busy processing other resumes. Please try again shortly.",
+                    headers={"Retry-After": "5"}
+                )
 
-        # Check cache using MD5 hash of extracted text
-        text_hash = storage.compute_hash(text_content)
-        cached_resume = storage.get_resume_by_hash(text_hash)
-        
-        if cached_resume and cached_resume.get("summary") and cached_resume.get("status") == "completed":
-            # Return cached result - use existing resume_id
-            cached_id = cached_resume["id"]
             return ResumeUploadResponse(
-                id=cached_id,
+                id=resume_id,
                 fileName=file.filename,
-                uploadDate=cached_resume.get("uploadDate", datetime.utcnow()),
-                status="completed"
+                uploadDate=stored["uploadDate"],
+                status="processing"
             )
+        finally:
+            # Answered without queueing a parse (cache hit, shared parse, rejected): nothing will follow
+            progress.forget(resume_id, stage="extracting")
+    finally:
+        ingested.discard()
 
-        # Store resume
-        storage.store_resume(
-            resume_id=resume_id,
-            file_name=file.filename,
-            file_content=text_content,
-            status="processing"
-        )
 
-        # Parse resume using LangChain
-        summary = await parse_resume(text_content, resume_id)
+def _read_archive_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Read one archive member, refusing to decompress past the file size limit"""
+    with archive.open(info) as member:
+        content = member.read(MAX_FILE_SIZE + 1)
+    check_size(len(content), MAX_FILE_SIZE)
+    if not content:
+        raise FileContentError("File is empty")
+    check_signature(content, info.filename)
+    return content
 
-        # Update storage with summary and cache the hash
-        storage.update_summary(resume_id, summary, status="completed")
-        storage.cache_resume_hash(text_hash, resume_id)
 
-        return ResumeUploadResponse(
-            id=resume_id,
-            fileName=file.filename,
-            uploadDate=datetime.utcnow(),
-            status="completed"
-        )
+def _archive_sources(archive: zipfile.ZipFile) -> list[BatchSource]:
+    """List the resumes inside a ZIP archive without decompressing them yet"""
+    sources = []
+    for info in archive.infolist():
+        member_name = info.filename
+        base_name = member_name.rsplit("/", 1)[-1]
+        # Skip directories and OS metadata such as __MACOSX/ and dotfiles
+        if info.is_dir() or member_name.startswith("__MACOSX/") or base_name.startswith("."):
+            continue
+        try:
+            validate_file_name(base_name)
+        except HTTPException as e:
+            sources.append(BatchSource(file_name=member_name, error=(e.status_code, e.detail)))
+            continue
+        if info.file_size > MAX_FILE_SIZE:
+            sources.append(BatchSource(file_name=member_name, error=(400, "File size exceeds 10MB limit")))
+            continue
+        sources.append(BatchSource(
+            file_name=member_name,
+            read=lambda info=info: _read_archive_member(archive, info)
+        ))
+    return sources
 
-    except HTTPException:
-        raise
-    except ValueError as e:
-        # Handle validation errors (e.g., non-resume files, partial data issues)
-        if storage.get_resume(resume_id):
-            storage.update_status(resume_id, "error")
-        raise HTTPException(status_code=400, detail=str(e))
-    except KeyError as e:
-        # Handle missing required fields in parsed data
-        if storage.get_resume(resume_id):
-            storage.update_status(resume_id, "error")
-        raise HTTPException(
-            status_code=400,
-            detail="The resume appears to be incomplete or missing required information. "
-                   "Please ensure the file contains a person's name and professional details."
-        )
-    except Exception as e:
-        # Update status to error if stored
-        if storage.get_resume(resume_id):
-            storage.update_status(resume_id, "error")
-        # Check if it's a parsing error
-        error_str = str(e).lower()
-        if any(keyword in error_str for keyword in [
-            "parsedresumedata", "output parsing", "validation error", 
-            "pydantic", "validation", "parse", "schema"
-        ]):
+
+def _release_batch_uploads(
+    archives: list[zipfile.ZipFile],
+    spooled: list[IngestedFile],
+    release_slot: Callable[[], None] | None = None
+) -> None:
+    """Close and delete a batch's spooled uploads, then give back its admission slot"""
+    for archive in archives:
+        archive.close()
+    for upload in spooled:
+        upload.discard()
+    if release_slot:
+        release_slot()
+
+
+@router.post(
+    "/batch",
+    response_model=BatchUploadResponse,
+    responses={400: {"model": ErrorResponse}, 429: {"model": ErrorResponse}, 503: {"model": ErrorResponse}}
+)
+async def upload_batch(request: Request, files: list[UploadFile] = File(...)):
+    """
+    Upload many resume files (PDF, TXT, DOCX) and/or ZIP archives of them.
+
+    Each item is extracted, deduplicated and parsed in the background with a bounded
+    number of concurrent LLM calls. Poll the batch endpoint for per-item status.
+    """
+    sources: list[BatchSource] = []
+    # Spooled files stay on disk until the batch has extracted them
+    spooled: list[IngestedFile] = []
+    archives: list[zipfile.ZipFile] = []
+    try:
+        for file in files:
+            file_name = file.filename or ""
+            if file_name.lower().endswith(".zip"):
+                try:
+                    upload = await read_upload(file, MAX_ARCHIVE_SIZE, label="Archive")
+                except FileContentError as e:
+                    sources.append(BatchSource(file_name=file_name, error=(400, str(e))))
+                    continue
+                spooled.append(upload)
+                try:
+                    archive = zipfile.ZipFile(upload.path)
+                except zipfile.BadZipFile:
+                    sources.append(BatchSource(file_name=file_name, error=(400, "Invalid ZIP archive")))
+                    continue
+                archives.append(archive)
+                sources.extend(_archive_sources(archive))
+                continue
+
+            try:
+                validate_file(file)
+            except HTTPException as e:
+                sources.append(BatchSource(file_name=file_name, error=(e.status_code, e.detail)))
+                continue
+
+            try:
+                upload = await read_upload(file, MAX_FILE_SIZE)
+            except FileContentError as e:
+                sources.append(BatchSource(file_name=file_name, error=(400, str(e))))
+            else:
+                spooled.append(upload)
+                sources.append(BatchSource(
+                    file_name=file_name, read=lambda path=upload.path: path, raw_hash=upload.raw_hash
+                ))
+
+        if not sources:
+            raise HTTPException(status_code=400, detail="No resume files found in the upload")
+
+        if len(sources) > MAX_BATCH_ITEMS:
             raise HTTPException(
                 status_code=400,
-                detail="The uploaded file does not appear to be a resume or CV, or the format is not recognized. "
-                       "Please upload a document containing a person's professional background, work experience, skills, and education."
+                detail=f"Too many files in batch ({len(sources)}). Maximum is {MAX_BATCH_ITEMS} files per batch."
             )
-        # For other errors, provide a generic but helpful message
-        raise HTTPException(
-            status_code=500, 
-            detail="An unexpected error occurred while processing the resume. Please try again or contact support if the issue persists."
-        )
+    except BaseException:
+        _release_batch_uploads(archives, spooled)
+        raise
+
+    # The batch stays admitted until every item has been processed, not just until we respond
+    permit = getattr(request.state, "admission", None)
+    release_slot = permit.hand_off() if permit else None
+    batch = batch_processor.submit(
+        sources, on_done=lambda: _release_batch_uploads(archives, spooled, release_slot)
+    )
+    return BatchUploadResponse(**batch)
+
+
+@router.get(
+    "/batch/{batch_id}",
+    response_model=BatchUploadResponse,
+    responses={404: {"model": ErrorResponse}}
+)
+async def get_batch(batch_id: str):
+    """
+    Get the per-item status of a batch upload.
+    """
+    batch = batch_processor.get_batch(batch_id)
+
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return BatchUploadResponse(**batch)
+
+
+@router.get("/reparse")
+async def get_reparse_progress():
+    """
+    Progress of the background upgrade of summaries produced by an older prompt, model or schema.
+    """
+    return reparse_job.snapshot()
+
+
+@router.post("/reparse/pause")
+async def pause_reparse():
+    """
+    Pause the background re-parse after the resume in progress; outdated summaries stay in use.
+    """
+    reparse_job.paused = True
+    return reparse_job.snapshot()
+
+
+@router.post("/reparse/resume")
+async def resume_reparse():
+    """
+    Resume a paused background re-parse where it stopped.
+    """
+    reparse_job.paused = False
+    return reparse_job.snapshot()
 
 
 @router.get(
     "/{resume_id}/summary",
     response_model=ResumeSummary,
-    responses={404: {"model": ErrorResponse}}
+    responses={304: {"description": "Summary unchanged since the ETag in If-None-Match"}, 404: {"model": ErrorResponse}}
 )
-async def get_resume_summary(resume_id: str):
+async def get_resume_summary(
+    resume_id: str,
+    request: Request,
+    fields: list[str] | None = Query(default=None, description="Only return these summary fields, e.g. name,skills"),
+    includeRaw: bool = Query(default=True, description="Include the extracted text as rawText")
+):
     """
     Get the parsed summary for a resume by ID.
+
+    Completed summaries are served from JSON serialized once when the parse finished,
+    with a strong ETag; send it back in If-None-Match to get a 304 while it is unchanged.
     """
     resume_data = storage.get_resume(resume_id)
 
@@ -164,15 +480,140 @@ async def get_resume_summary(resume_id: str):
         raise HTTPException(status_code=202, detail="Resume is still being processed")
 
     if resume_data["status"] == "error":
-        raise HTTPException(status_code=500, detail="Resume processing failed")
+        raise HTTPException(
+            status_code=resume_data.get("error_code") or 500,
+            detail=resume_data.get("error") or "Resume processing failed"
+        )
 
-    if not resume_data["summary"]:
+    serialized = storage.get_summary_json(resume_id) if resume_data["summary"] else None
+    if not serialized:
         raise HTTPException(status_code=500, detail="Resume summary not available")
 
-    # Include raw text in the summary response
-    summary = resume_data["summary"]
-    # Create a new dict with rawText included
-    summary_dict = summary.model_dump()
-    summary_dict["rawText"] = resume_data.get("file_content")
-    
-    return ResumeSummary(**summary_dict)
+    selected = _split_terms(fields)
+    unknown = [field for field in selected if field not in ResumeSummary.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown summary fields: {', '.join(unknown)}")
+    include_raw = "rawText" in selected if selected else includeRaw
+
+    etag = _summary_etag(serialized, selected, include_raw)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = _summary_json(resume_id, resume_data, serialized, selected, include_raw)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _summary_json(
+    resume_id: str,
+    resume_data: dict,
+    serialized: SerializedSummary,
+    fields: list[str] | None = None,
+    include_raw: bool = True
+) -> bytes:
+    """Summary JSON bytes, optionally narrowed to some fields, with the raw text appended on request"""
+    body = serialized.body
+    if fields:
+        body = resume_data["summary"].model_dump_json(include=set(fields) - {"rawText"}).encode("utf-8")
+    if not include_raw:
+        return body
+    # rawText is the last field of ResumeSummary, so appending it keeps the usual field order
+    raw_text = json.dumps(storage.get_raw_text(resume_id), ensure_ascii=False).encode("utf-8")
+    separator = b"," if body != b"{}" else b""
+    return body[:-1] + separator + b'"rawText":' + raw_text + b"}"
+
+
+def _summary_etag(serialized: SerializedSummary, fields: list[str], include_raw: bool) -> str:
+    """Strong ETag of one representation of the summary"""
+    if not fields and include_raw:
+        return f'"{serialized.etag}"'
+    variant = ",".join(sorted(set(fields))) if fields else "-rawText"
+    return f'"{serialized.etag}-{hashlib.md5(variant.encode()).hexdigest()[:8]}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check; like the RFC, weak validators compare equal to strong ones"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _terminal_event(resume_id: str) -> str | None:
+    """completed/failed event if the resume has finished processing, else None"""
+    resume_data = storage.get_resume(resume_id)
+    if not resume_data:
+        return _sse("failed", {"stage": "error", "status": 404, "detail": "Resume not found"})
+    serialized = storage.get_summary_json(resume_id) if resume_data["summary"] else None
+    if resume_data["status"] == "completed" and serialized:
+        # Serialized JSON never contains a raw newline, so it fits in a single data line
+        body = _summary_json(resume_id, resume_data, serialized).decode("utf-8")
+        return f"event: completed\ndata: {body}\n\n"
+    if resume_data["status"] == "error":
+        return _sse("failed", {
+            "stage": "error",
+            "status": resume_data.get("error_code") or 500,
+            "detail": resume_data.get("error") or "Resume processing failed"
+        })
+    return None
+
+
+async def _resume_event_stream(resume_id: str) -> AsyncIterator[str]:
+    # Subscribe before reading the current state so no transition is missed
+    queue = progress.subscribe(resume_id)
+    try:
+        terminal = _terminal_event(resume_id)
+        if terminal:
+            yield terminal
+            return
+
+        state = progress.state(resume_id) or {}
+        yield _sse("stage", {"stage": state.get("stage") or "queued"})
+        if state.get("fields"):
+            yield _sse("partial", state["fields"])
+
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Progress events are per process; storage is the fallback when another worker parses
+                terminal = _terminal_event(resume_id)
+                if terminal:
+                    yield terminal
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            if event == "stage" and data["stage"] in ("completed", "error"):
+                yield _terminal_event(resume_id) or _sse("failed", {"stage": "error", **data})
+                return
+            yield _sse(event, data)
+    finally:
+        progress.unsubscribe(resume_id, queue)
+
+
+@router.get(
+    "/{resume_id}/events",
+    responses={200: {"content": {"text/event-stream": {}}}, 404: {"model": ErrorResponse}}
+)
+async def stream_resume_events(resume_id: str):
+    """
+    Server-Sent Events stream of parse progress for a resume.
+
+    Emits `stage` events (extracting, queued, llm), `partial` events with parsed
+    fields as the LLM produces them, and ends with `completed` (the full summary)
+    or `failed` (status and detail).
+    """
+    if not storage.get_resume(resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    return StreamingResponse(
+        _resume_event_stream(resume_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,19 +1,140 @@
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+
+# Timed for the startup report; the heavy LLM and document libraries are not imported here
+_import_started, _import_modules = time.perf_counter(), len(sys.modules)
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from app.api.routes import router
-
-# Load environment variables
+# Load environment variables before the services read their settings
 load_dotenv()
 
+from app.api.routes import router, BATCH_BODY_LIMIT, UPLOAD_BODY_LIMIT, upload_size_limit
+from app.api.limits import AdmissionMiddleware, BodySizeLimitMiddleware, UploadCheckMiddleware
+from app.services.admission import ADMISSION_ENABLED, admission
+from app.services.jobs import job_queue
+from app.services.reparse import REPARSE_ENABLED, reparse_job
+from app.services.extraction import extraction_executor
+from app.services.batches import batch_processor
+from app.services.storage import storage
+from app.services.llm import chains
+from app.services.scheduler import llm_scheduler
+from app.services.compaction import compaction_stats
+from app.services.output_stats import output_stats
+from app.services.search import resume_index
+from app.services.ranking import ranking_index
+from app.services.dedup import near_duplicates
+from app.services.index_sync import index_sync
+from app.services.rules import rule_stats
+from app.services.long_resume import long_document_stats
+from app.services.metrics import CONTENT_TYPE, metrics
+from app.services.startup import (
+    STARTUP_WARMUP, WARMUP_MODULES, WARMUP_RETRY_MAX_SECONDS, WARMUP_RETRY_SECONDS, startup_profile
+)
+
+startup_profile.imported("app.main", _import_started, _import_modules)
+
+
+async def warm_up() -> None:
+    """Load the LLM stack and document libraries, build the LLM chains and open connections.
+
+    Failed imports are retried with backoff while /ready stays 503. Failing to
+    build the chains or pre-open connections (e.g. a transient LLM API error)
+    only marks the app degraded, since requests redo both on first use.
+    """
+    delay = WARMUP_RETRY_SECONDS
+    while True:
+        try:
+            for module in WARMUP_MODULES:
+                await startup_profile.import_module(module)
+            break
+        except Exception as e:
+            print(f"Warning: Startup warmup failed, retrying in {delay:.0f}s: {str(e)}")
+            startup_profile.mark_failed(e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    with startup_profile.phase("llm.chains"):
+        await chains.startup()
+    startup_profile.mark_ready(degraded=chains.warmup_error)
+    if REPARSE_ENABLED:
+        # Upgrade summaries from an older prompt, model or schema in the background
+        reparse_job.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index resumes already persisted by a durable storage backend; changes other workers make
+    # from here on are replayed by index_sync
+    index_sync.mark()
+    with startup_profile.phase("index.search"):
+        resume_index.rebuild(storage.iter_summaries())
+    with startup_profile.phase("index.ranking"):
+        await asyncio.to_thread(ranking_index.rebuild, storage.iter_summaries())
+    with startup_profile.phase("index.nearDuplicates"):
+        await asyncio.to_thread(near_duplicates.rebuild, storage.iter_summaries())
+    if storage.shared:
+        index_sync.start()
+    job_queue.start()
+    warmup_task = None
+    if STARTUP_WARMUP == "blocking":
+        # Build the LLM chains and open connections before we start taking traffic
+        await warm_up()
+    elif STARTUP_WARMUP == "background":
+        # Take traffic at once; /ready reports 503 until the warmup is done
+        warmup_task = asyncio.create_task(warm_up(), name="warmup")
+    else:
+        startup_profile.mark_ready()
+        if REPARSE_ENABLED:
+            reparse_job.start()
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await reparse_job.stop()
+    await index_sync.stop()
+    # Let in-flight and queued parses finish before the process exits
+    await job_queue.shutdown()
+    await batch_processor.shutdown()
+    extraction_executor.shutdown()
+    await chains.aclose()
+
+
 app = FastAPI(
     title="GridRez - Resume Parser API",
     description="API for parsing resumes using AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS middleware for Angular frontend
+# Cap concurrent uploads and their buffered bytes; shed the excess before reading any body
+if ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        paths={"/api/resumes/upload": UPLOAD_BODY_LIMIT, "/api/resumes/batch": BATCH_BODY_LIMIT},
+    )
+
+# Check each file's type and size as it streams in, before the multipart body is spooled
+app.add_middleware(
+    UploadCheckMiddleware,
+    paths={"/api/resumes/upload": upload_size_limit, "/api/resumes/batch": upload_size_limit},
+)
+
+# Refuse oversize bodies up front from Content-Length, or as soon as they cross the limit
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/resumes/upload": (UPLOAD_BODY_LIMIT, "File size exceeds 10MB limit"),
+        "/api/resumes/batch": (BATCH_BODY_LIMIT, "Batch size exceeds 100MB limit"),
+    },
+)
+
+# CORS middleware for Angular frontend (added last so it also wraps rejected uploads)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:4200"],
@@ -28,5 +149,38 @@ app.include_router(router)
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Liveness: answers as soon as the app is up, warm or not"""
+    return {
+        "status": "healthy",
+        "parseQueue": job_queue.snapshot(),
+        "storage": storage.stats(),
+        "llm": {"model": chains.model, "warmedUp": chains.warmed_up},
+        "llmScheduler": llm_scheduler.snapshot(),
+        "compaction": compaction_stats.snapshot(),
+        "llmOutput": output_stats.snapshot(),
+        "searchIndex": resume_index.snapshot(),
+        "ranking": ranking_index.snapshot(),
+        "nearDuplicates": near_duplicates.snapshot(),
+        "indexSync": index_sync.snapshot(),
+        "rules": rule_stats.snapshot(),
+        "longDocuments": long_document_stats.snapshot(),
+        "extraction": extraction_executor.snapshot(),
+        "admission": admission.snapshot(),
+        "reparse": reparse_job.snapshot(),
+        "startup": startup_profile.snapshot(),
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 until the LLM stack and document libraries are loaded and the chains are built"""
+    return JSONResponse(
+        {"status": "ready" if startup_profile.ready else "starting", "startup": startup_profile.snapshot()},
+        status_code=200 if startup_profile.ready else 503,
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency histograms, cache lookups, LLM tokens, errors and storage size"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -9,6 +9,15 @@ class Education(BaseModel):
     graduationYear: int | None = Field(default=None, description="Year of graduation")
 
 
+class SocialHandles(BaseModel):
+    """Social media and professional profile handles"""
+    linkedin: str | None = Field(default=None, description="LinkedIn profile URL or username")
+    github: str | None = Field(default=None, description="GitHub profile URL or username")
+    twitter: str | None = Field(default=None, description="Twitter/X profile URL or username")
+    portfolio: str | None = Field(default=None, description="Personal website or portfolio URL")
+    other: list[str] = Field(default_factory=list, description="Other social media profiles or handles")
+
+
 class ResumeSummary(BaseModel):
     id: str = Field(description="Unique identifier for the resume")
     name: str = Field(description="Full name of the candidate")
@@ -31,15 +40,6 @@ class ResumeUploadResponse(BaseModel):
     status: Literal["processing", "completed", "error"]
 
 
-class SocialHandles(BaseModel):
-    """Social media and professional profile handles"""
-    linkedin: str | None = Field(default=None, description="LinkedIn profile URL or username")
-    github: str | None = Field(default=None, description="GitHub profile URL or username")
-    twitter: str | None = Field(default=None, description="Twitter/X profile URL or username")
-    portfolio: str | None = Field(default=None, description="Personal website or portfolio URL")
-    other: list[str] = Field(default_factory=list, description="Other social media profiles or handles")
-
-
 class ParsedResumeData(BaseModel):
     """Schema for LLM output parsing - handles partial resume data gracefully"""
     name: str | None = Field(default=None, description="Full name of the candidate. Set to null if not a resume.")
@@ -54,5 +54,55 @@ class ParsedResumeData(BaseModel):
     socialHandles: SocialHandles | None = Field(default=None, description="Social media and professional profile handles")
 
 
+class BatchItemStatus(BaseModel):
+    fileName: str
+    id: str | None = Field(default=None, description="Resume ID once the item has been stored or matched in the cache")
+    status: Literal["processing", "completed", "error"]
+    cached: bool = Field(default=False, description="True if the item matched an already parsed or batch-local resume")
+    errorCode: int | None = Field(default=None, description="HTTP status code the item would have produced on /upload")
+    detail: str | None = Field(default=None, description="Error message for failed items")
+
+
+class BatchUploadResponse(BaseModel):
+    batchId: str
+    uploadDate: datetime
+    status: Literal["processing", "completed"]
+    items: list[BatchItemStatus]
+
+
+class ResumeSearchHit(BaseModel):
+    id: str
+    fileName: str
+    uploadDate: datetime
+    name: str
+    currentRole: str
+    experienceYears: int
+    location: str | None = None
+    skills: list[str]
+
+
+class ResumeSearchResponse(BaseModel):
+    total: int = Field(description="Number of resumes matching the filters")
+    items: list[ResumeSearchHit]
+    nextCursor: str | None = Field(default=None, description="Pass as cursor to fetch the next page; null on the last page")
+
+
+class JobMatchRequest(BaseModel):
+    jobDescription: str = Field(min_length=1, description="Job description text to match resumes against")
+    limit: int = Field(default=20, ge=1, le=100, description="Number of candidates to return")
+
+
+class JobMatchHit(BaseModel):
+    id: str
+    score: float = Field(description="Cosine similarity between the job description and the resume, 0-1")
+    name: str
+    currentRole: str
+
+
+class JobMatchResponse(BaseModel):
+    candidates: int = Field(description="Number of resumes that were ranked")
+    items: list[JobMatchHit]
+
+
 class ErrorResponse(BaseModel):
     detail: str
@@ -0,0 +1,251 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+from app.services.metrics import metrics
+
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_MAX_BYTES = int(os.getenv("ADMISSION_MAX_BYTES", str(128 * 1024 * 1024)))  # 128MB
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+# Uploads one client may have admitted or waiting at once; 0 disables the per-client limit
+ADMISSION_PER_CLIENT = int(os.getenv("ADMISSION_PER_CLIENT", "0"))
+
+# Bounds of the Retry-After hint in seconds
+RETRY_AFTER_MIN = 1
+RETRY_AFTER_MAX = 60
+# Weight of the newest hold time in the moving average behind Retry-After
+HOLD_TIME_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when an upload is shed instead of admitted"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int, reason: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    queued: int = 0
+    shed_queue_full: int = 0
+    shed_timeout: int = 0
+    shed_per_client: int = 0
+    total_wait: float = 0.0
+
+
+@dataclass
+class _Waiter:
+    client: str
+    cost: int
+    future: asyncio.Future
+
+
+class AdmissionPermit:
+    """One admitted upload: holds a slot and its body bytes.
+
+    The bytes are returned when the request finishes. The slot is returned
+    then too, unless the upload queued a parse and took it over with
+    hand_off(); the parse job then releases it when it finishes.
+    """
+
+    def __init__(self, controller: "AdmissionController", client: str, cost: int):
+        self._controller = controller
+        self.client = client
+        self.cost = cost
+        self.admitted_at = time.monotonic()
+        self._bytes_held = True
+        self._slot_held = True
+        self._handed_off = False
+
+    def hand_off(self) -> Callable[[], None]:
+        """Keep the slot past the request; call the returned function once the parse is done"""
+        self._handed_off = True
+        return self._release_slot
+
+    def release(self) -> None:
+        """End of the request: return the bytes, and the slot unless it was handed off"""
+        if self._bytes_held:
+            self._bytes_held = False
+            self._controller._release(self, slot=False)
+        if not self._handed_off:
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        if self._slot_held:
+            self._slot_held = False
+            self._controller._release(self, slot=True)
+
+
+class AdmissionController:
+    """Caps concurrent uploads and their buffered bytes, with a bounded FIFO wait queue.
+
+    An upload counts against the in-flight limit from admission until its parse
+    completes, and against the byte budget until its request finishes. Uploads
+    that cannot be admitted wait up to queue_timeout; once the queue is full,
+    or the wait runs out, they are shed with a Retry-After hint.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_bytes: int = ADMISSION_MAX_BYTES,
+        queue_size: int = ADMISSION_QUEUE_SIZE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        per_client: int = ADMISSION_PER_CLIENT,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_bytes = max(1, max_bytes)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self.per_client = max(0, per_client)
+        self.stats = AdmissionStats()
+        self.in_flight = 0
+        self.bytes_in_use = 0
+        self._clients: dict[str, int] = {}  # client -> admitted or waiting uploads
+        self._waiters: deque[_Waiter] = deque()
+        self._hold_time = 1.0  # moving average of seconds a slot is held
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, client: str, cost: int) -> AdmissionPermit:
+        """Admit an upload of about cost bytes, waiting in the queue if needed; raises AdmissionRejected"""
+        cost = min(max(0, cost), self.max_bytes)
+        if self.per_client and self._clients.get(client, 0) >= self.per_client:
+            self.stats.shed_per_client += 1
+            raise AdmissionRejected(
+                429, "Too many uploads in progress from this client. Please try again shortly.",
+                self.retry_after(), "perClient"
+            )
+
+        if not self._waiters and self._fits(cost):
+            return self._admit(client, cost)
+
+        if len(self._waiters) >= self.queue_size:
+            self.stats.shed_queue_full += 1
+            raise AdmissionRejected(
+                503, "The server is busy processing other resumes. Please try again shortly.",
+                self.retry_after(), "queueFull"
+            )
+
+        waiter = _Waiter(client, cost, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._clients[client] = self._clients.get(client, 0) + 1
+        self.stats.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the wait ran out; give the capacity straight back
+                waiter.future.result().release()
+            else:
+                waiter.future.cancel()
+                self._waiters.remove(waiter)
+                self._forget_client(client)
+                self._wake()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.stats.shed_timeout += 1
+            raise AdmissionRejected(
+                503, "The server is busy processing other resumes. Please try again shortly.",
+                self.retry_after(), "timeout"
+            )
+        finally:
+            self.stats.total_wait += time.monotonic() - started
+        return waiter.future.result()
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead has likely drained, from the average slot hold time"""
+        rounds = (len(self._waiters) + 1) / self.max_in_flight
+        return min(RETRY_AFTER_MAX, max(RETRY_AFTER_MIN, math.ceil(self._hold_time * rounds)))
+
+    def snapshot(self) -> dict:
+        """Current load and admitted, queued and shed counters"""
+        shed = self.stats.shed_queue_full + self.stats.shed_timeout + self.stats.shed_per_client
+        return {
+            "enabled": ADMISSION_ENABLED,
+            "inFlight": self.in_flight,
+            "maxInFlight": self.max_in_flight,
+            "bytesInUse": self.bytes_in_use,
+            "maxBytes": self.max_bytes,
+            "waiting": self.waiting,
+            "queueSize": self.queue_size,
+            "admitted": self.stats.admitted,
+            "queued": self.stats.queued,
+            "avgQueueWaitSeconds": round(self.stats.total_wait / max(1, self.stats.queued), 4),
+            "shed": shed,
+            "shedByReason": {
+                "queueFull": self.stats.shed_queue_full,
+                "timeout": self.stats.shed_timeout,
+                "perClient": self.stats.shed_per_client,
+            },
+            "avgHoldSeconds": round(self._hold_time, 3),
+        }
+
+    def _fits(self, cost: int) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        # A single upload is always let through when nothing else holds bytes
+        return self.bytes_in_use == 0 or self.bytes_in_use + cost <= self.max_bytes
+
+    def _admit(self, client: str, cost: int, counted: bool = False) -> AdmissionPermit:
+        self.in_flight += 1
+        self.bytes_in_use += cost
+        if not counted:
+            self._clients[client] = self._clients.get(client, 0) + 1
+        self.stats.admitted += 1
+        return AdmissionPermit(self, client, cost)
+
+    def _release(self, permit: AdmissionPermit, slot: bool) -> None:
+        if slot:
+            self.in_flight -= 1
+            self._forget_client(permit.client)
+            held = time.monotonic() - permit.admitted_at
+            self._hold_time += HOLD_TIME_ALPHA * (held - self._hold_time)
+        else:
+            self.bytes_in_use -= permit.cost
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit waiters in FIFO order while they fit; a large head-of-line upload is not skipped"""
+        while self._waiters and self._fits(self._waiters[0].cost):
+            waiter = self._waiters.popleft()
+            waiter.future.set_result(self._admit(waiter.client, waiter.cost, counted=True))
+
+    def _forget_client(self, client: str) -> None:
+        remaining = self._clients.get(client, 0) - 1
+        if remaining > 0:
+            self._clients[client] = remaining
+        else:
+            self._clients.pop(client, None)
+
+
+# Singleton instance
+admission = AdmissionController()
+
+metrics.callback("gridrez_admission_in_flight", "Uploads admitted and not yet parsed", lambda: admission.in_flight)
+metrics.callback("gridrez_admission_waiting", "Uploads waiting for admission", lambda: admission.waiting)
+metrics.callback(
+    "gridrez_admission_total", "Upload admission decisions",
+    lambda: {
+        ("admitted",): admission.stats.admitted,
+        ("shed_queue_full",): admission.stats.shed_queue_full,
+        ("shed_timeout",): admission.stats.shed_timeout,
+        ("shed_per_client",): admission.stats.shed_per_client,
+    },
+    ("result",), kind="counter"
+)
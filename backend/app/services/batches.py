@@ -0,0 +1,239 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from app.services.dedup import reuse_near_duplicate
+from app.services.events import progress
+from app.services.extraction import extraction_executor, validate_extracted_text
+from app.services.jobs import ParseJob, classify_parse_error, execute_parse_job, inflight
+from app.services.metrics import cache_lookups, current_file_type, file_type_of, record_error, timed
+from app.services.storage import storage
+
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+# Finished batches are forgotten after this long, oldest first beyond BATCH_MAX_TRACKED
+BATCH_TTL_SECONDS = float(os.getenv("BATCH_TTL_SECONDS", str(24 * 3600)))  # 1 day
+BATCH_MAX_TRACKED = int(os.getenv("BATCH_MAX_TRACKED", "1000"))
+
+SHUTDOWN_DETAIL = "Server shut down before the resume could be processed. Please try again."
+
+
+@dataclass
+class BatchSource:
+    """One file of a batch: either a deferred reader for its bytes (or spooled path) or an upfront error"""
+    file_name: str
+    read: Callable[[], bytes | Path] | None = None
+    error: tuple[int, str] | None = None
+    raw_hash: str | None = None  # known up front for spooled uploads
+
+
+class BatchProcessor:
+    """Extracts, deduplicates and parses batches of resumes with bounded LLM fan-out.
+
+    Finished batches stay available for ttl_seconds, and only the latest
+    max_tracked of them are kept. Batches still processing are never dropped.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = BATCH_CONCURRENCY,
+        ttl_seconds: float = BATCH_TTL_SECONDS,
+        max_tracked: int = BATCH_MAX_TRACKED
+    ):
+        self.concurrency = max(1, concurrency)
+        self.ttl_seconds = ttl_seconds
+        self.max_tracked = max_tracked
+        self._batches: dict[str, dict] = {}
+        self._finished: OrderedDict[str, float] = OrderedDict()  # batch_id -> monotonic time it finished
+        self._tasks: set[asyncio.Task] = set()
+        self._shutting_down = False
+
+    def submit(self, sources: list[BatchSource], on_done: Callable[[], None] | None = None) -> dict:
+        """Register a batch and start processing it in the background; on_done runs once it finishes"""
+        self._evict()
+        batch_id = str(uuid.uuid4())
+        items = []
+        for source in sources:
+            item = {
+                "fileName": source.file_name,
+                "id": None,
+                "status": "processing",
+                "cached": False,
+                "errorCode": None,
+                "detail": None,
+            }
+            if source.error:
+                self._fail(item, *source.error)
+            items.append(item)
+
+        batch = {
+            "batchId": batch_id,
+            "uploadDate": datetime.utcnow(),
+            "status": "processing",
+            "items": items,
+        }
+        self._batches[batch_id] = batch
+
+        task = asyncio.create_task(self._process(batch, sources, on_done), name=f"batch-{batch_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return batch
+
+    def get_batch(self, batch_id: str) -> dict | None:
+        """Get batch by ID"""
+        self._evict()
+        return self._batches.get(batch_id)
+
+    async def shutdown(self, drain_timeout: float = 30) -> None:
+        """Wait for running batches, then cancel whatever is left"""
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=drain_timeout)
+        self._shutting_down = True
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _process(self, batch: dict, sources: list[BatchSource], on_done: Callable[[], None] | None) -> None:
+        extract_slots = asyncio.Semaphore(extraction_executor.workers)
+        parse_slots = asyncio.Semaphore(self.concurrency)
+
+        async def handle(item: dict, source: BatchSource) -> None:
+            file_type = file_type_of(item["fileName"])
+            current_file_type.set(file_type)
+            # Read one member at a time per extraction slot to keep memory bounded
+            async with extract_slots:
+                try:
+                    with timed("read"):
+                        content = await asyncio.to_thread(source.read)
+                    raw_hash = source.raw_hash or storage.compute_raw_hash(content)
+                    cached_resume = storage.get_resume_by_raw_hash(raw_hash)
+                    if cached_resume and cached_resume.get("status") == "completed":
+                        cache_lookups.inc("raw", "hit")
+                        item.update(id=cached_resume["id"], status="completed", cached=True)
+                        return
+                    cache_lookups.inc("raw", "miss")
+                    extracted = await extraction_executor.extract(content, item["fileName"])
+                except Exception as e:
+                    record_error("extract", 400, e)
+                    self._fail(
+                        item, 400,
+                        f"Could not extract text from file: {str(e)}. "
+                        "Please ensure the file is a valid PDF, DOCX, or TXT format."
+                    )
+                    return
+            text_content = extracted.text
+            try:
+                validate_extracted_text(text_content)
+            except ValueError as e:
+                record_error("validate", 400, e)
+                self._fail(item, 400, str(e))
+                return
+
+            with timed("hash"):
+                text_hash = storage.compute_hash(text_content)
+            cached_resume = storage.get_resume_by_hash(text_hash)
+            if cached_resume and cached_resume.get("summary") and cached_resume.get("status") == "completed":
+                cache_lookups.inc("text", "hit")
+                storage.cache_raw_hash(raw_hash, cached_resume["id"])
+                item.update(id=cached_resume["id"], status="completed", cached=True)
+                return
+            cache_lookups.inc("text", "miss")
+
+            resume_id = str(uuid.uuid4())
+            reused = reuse_near_duplicate(resume_id, item["fileName"], text_content, text_hash, raw_hash)
+            if reused:
+                item.update(id=resume_id, status="completed", cached=True)
+                return
+
+            owner = inflight.claim(text_hash, resume_id)
+            if owner:
+                # Same resume is already being parsed (in this batch or another request) - share it
+                owner_id, done = owner
+                item.update(id=owner_id, cached=True)
+                await done.wait()
+                self._sync_item(item)
+                return
+
+            with storage.transaction():
+                storage.store_resume(
+                    resume_id=resume_id,
+                    file_name=item["fileName"],
+                    file_content=text_content,
+                    status="processing"
+                )
+                storage.cache_raw_hash(raw_hash, resume_id)
+            item["id"] = resume_id
+            progress.stage(resume_id, "queued")
+            async with parse_slots:
+                await execute_parse_job(ParseJob(
+                    resume_id=resume_id, text_content=text_content, text_hash=text_hash, file_type=file_type,
+                    page_lines=extracted.page_lines
+                ))
+            self._sync_item(item)
+
+        handled = [(item, source) for item, source in zip(batch["items"], sources) if source.error is None]
+        try:
+            results = await asyncio.gather(*(handle(item, source) for item, source in handled), return_exceptions=True)
+            for (item, _), result in zip(handled, results):
+                if isinstance(result, Exception) and item["status"] == "processing":
+                    status_code, detail = classify_parse_error(result)
+                    record_error("batch", status_code, result)
+                    self._abandon(item, status_code, detail)
+        except asyncio.CancelledError:
+            if self._shutting_down:
+                status_code, detail = 503, SHUTDOWN_DETAIL
+            else:
+                status_code, detail = 500, "Batch processing was cancelled before the resume could be processed."
+            for item in batch["items"]:
+                if item["status"] == "processing":
+                    self._abandon(item, status_code, detail)
+            raise
+        finally:
+            batch["status"] = "completed"
+            self._finished[batch["batchId"]] = time.monotonic()
+            if on_done:
+                on_done()
+
+    def _sync_item(self, item: dict) -> None:
+        """Copy the final parse outcome from storage onto a batch item"""
+        resume_data = storage.get_resume(item["id"])
+        if not resume_data:
+            self._fail(item, 500, "Resume processing failed")
+        elif resume_data["status"] == "error":
+            self._fail(item, resume_data.get("error_code") or 500, resume_data.get("error") or "Resume processing failed")
+        else:
+            item["status"] = resume_data["status"]
+
+    def _abandon(self, item: dict, status_code: int, detail: str) -> None:
+        """Fail an item that stopped early, and the resume it was parsing if that is still processing"""
+        self._fail(item, status_code, detail)
+        # Shared parses (cached items) belong to whoever started them
+        if item["id"] and not item["cached"] and (storage.get_resume(item["id"]) or {}).get("status") == "processing":
+            storage.update_status(item["id"], "error", error=detail, error_code=status_code)
+            progress.stage(item["id"], "error", status=status_code, detail=detail)
+
+    def _evict(self) -> None:
+        """Forget finished batches past the TTL, then the oldest ones beyond max_tracked"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._finished:
+            batch_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff and len(self._finished) <= self.max_tracked:
+                break
+            del self._finished[batch_id]
+            self._batches.pop(batch_id, None)
+
+    @staticmethod
+    def _fail(item: dict, status_code: int, detail: str) -> None:
+        item.update(status="error", errorCode=status_code, detail=detail)
+
+
+# Singleton instance
+batch_processor = BatchProcessor()
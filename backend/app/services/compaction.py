@@ -0,0 +1,215 @@
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+
+from app.services.scheduler import CHARS_PER_TOKEN, estimate_tokens
+
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() == "true"
+LLM_MAX_INPUT_TOKENS = int(os.getenv("LLM_MAX_INPUT_TOKENS", "6000"))
+
+# Short lines among the first/last few lines of a page, repeated there on at least
+# this many pages (and this share of all pages), are treated as page headers/footers
+BOILERPLATE_EDGE_LINES = 3
+BOILERPLATE_MIN_PAGES = 2
+BOILERPLATE_MIN_PAGE_SHARE = 0.5
+BOILERPLATE_MAX_LENGTH = 80
+# Shorter lines (job titles, skills) legitimately repeat and are never deduplicated
+DEDUPE_MIN_LENGTH = 30
+# Share of the token budget kept from the start of the text when truncating;
+# the rest comes from the end, where skills and education usually live
+TRUNCATE_HEAD_SHARE = 0.75
+TRUNCATION_MARKER = "[... content truncated ...]"
+
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_TABLE_SEPARATOR = " | "
+
+
+@dataclass
+class CompactionResult:
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+    truncated: bool = False
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+
+def _normalize_line(line: str) -> str:
+    return _SPACES.sub(" ", line).strip()
+
+
+def _dedupe_key(line: str) -> str:
+    return line.casefold()
+
+
+def _page_edges(page: list[str]) -> set[int]:
+    """Indexes of the first and last few non-blank lines of a page"""
+    filled = [index for index, line in enumerate(page) if line]
+    return set(filled[:BOILERPLATE_EDGE_LINES] + filled[-BOILERPLATE_EDGE_LINES:])
+
+
+def _remove_boilerplate(pages: list[list[str]]) -> list[str]:
+    """Drop page numbers and keep only the first copy of headers/footers repeated across pages.
+
+    Only lines at the top or bottom of a page are candidates, and text without
+    page breaks is left alone: short lines repeated within a resume (job
+    titles, skills) are content.
+    """
+    if len(pages) < 2:
+        return [line for page in pages for line in page]
+
+    edges = [_page_edges(page) for page in pages]
+    counts = Counter()
+    for page, indexes in zip(pages, edges):
+        # Once per page, however often it appears there
+        counts.update({_dedupe_key(page[index]) for index in indexes if len(page[index]) <= BOILERPLATE_MAX_LENGTH})
+    min_pages = max(BOILERPLATE_MIN_PAGES, math.ceil(len(pages) * BOILERPLATE_MIN_PAGE_SHARE))
+    repeated = {key for key, count in counts.items() if count >= min_pages}
+
+    kept, seen_repeated = [], set()
+    for page, indexes in zip(pages, edges):
+        for index, line in enumerate(page):
+            if index in indexes:
+                if _PAGE_NUMBER.match(line):
+                    continue
+                key = _dedupe_key(line)
+                if key in repeated:
+                    if key in seen_repeated:
+                        continue
+                    seen_repeated.add(key)
+            kept.append(line)
+    return kept
+
+
+def _dedupe_lines(lines: list[str]) -> list[str]:
+    """Drop repeated long lines and table rows whose cells all appeared already"""
+    kept, seen = [], set()
+    for line in lines:
+        if not line:
+            # Keep single blank lines as section separators
+            if kept and kept[-1]:
+                kept.append(line)
+            continue
+        key = _dedupe_key(line)
+        if key in seen and len(key) >= DEDUPE_MIN_LENGTH:
+            continue
+        if _TABLE_SEPARATOR in line:
+            cells = [_dedupe_key(cell.strip()) for cell in line.split("|") if cell.strip()]
+            if cells and all(cell in seen for cell in cells):
+                continue
+        seen.add(key)
+        kept.append(line)
+    while kept and not kept[-1]:
+        kept.pop()
+    return kept
+
+
+def _truncate(lines: list[str], max_tokens: int) -> list[str]:
+    """Keep whole lines from the head and tail of the text within the token budget"""
+    budget = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    head_budget = int(budget * TRUNCATE_HEAD_SHARE)
+
+    head, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > head_budget:
+            break
+        head.append(line)
+        used += len(line) + 1
+
+    tail, tail_used = [], 0
+    for line in reversed(lines[len(head):]):
+        if used + tail_used + len(line) + 1 > budget:
+            break
+        tail.append(line)
+        tail_used += len(line) + 1
+    tail.reverse()
+
+    return head + [TRUNCATION_MARKER] + tail
+
+
+def _split_pages(text: str, page_lines: list[int] | None) -> list[str]:
+    """Text of each page, given the number of lines per page; the whole text if they don't add up"""
+    lines = text.split("\n")
+    if not page_lines or sum(page_lines) != len(lines):
+        return [text]
+    pages, start = [], 0
+    for count in page_lines:
+        pages.append("\n".join(lines[start:start + count]))
+        start += count
+    return pages
+
+
+def compact_resume_text(
+    text: str,
+    max_tokens: int = LLM_MAX_INPUT_TOKENS,
+    page_lines: list[int] | None = None
+) -> CompactionResult:
+    """Normalize whitespace, strip page boilerplate and duplicates, and enforce a token ceiling.
+
+    page_lines (lines per PDF page, from extraction) lets headers and footers
+    be told apart from content; without it the text is treated as one page.
+    """
+    original_tokens = estimate_tokens(text)
+
+    pages = [
+        [
+            _normalize_line(line)
+            for line in unicodedata.normalize("NFKC", page).replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        ]
+        for page in _split_pages(text, page_lines)
+    ]
+    lines = _dedupe_lines(_remove_boilerplate(pages))
+
+    truncated = False
+    if max_tokens > 0 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines = _truncate(lines, max_tokens)
+        truncated = True
+
+    compacted = "\n".join(lines)
+    return CompactionResult(
+        text=compacted,
+        original_tokens=original_tokens,
+        compacted_tokens=estimate_tokens(compacted),
+        truncated=truncated,
+    )
+
+
+@dataclass
+class CompactionStats:
+    uploads: int = 0
+    truncated: int = 0
+    original_tokens: int = 0
+    compacted_tokens: int = 0
+    last_saved_tokens: int = 0
+
+    def record(self, result: CompactionResult) -> None:
+        self.uploads += 1
+        self.truncated += int(result.truncated)
+        self.original_tokens += result.original_tokens
+        self.compacted_tokens += result.compacted_tokens
+        self.last_saved_tokens = result.saved_tokens
+
+    def snapshot(self) -> dict:
+        saved = self.original_tokens - self.compacted_tokens
+        return {
+            "enabled": COMPACTION_ENABLED,
+            "uploads": self.uploads,
+            "truncated": self.truncated,
+            "originalTokens": self.original_tokens,
+            "compactedTokens": self.compacted_tokens,
+            "savedTokens": saved,
+            "avgSavedTokens": round(saved / self.uploads, 1) if self.uploads else 0.0,
+            "savedRatio": round(saved / self.original_tokens, 4) if self.original_tokens else 0.0,
+            "lastSavedTokens": self.last_saved_tokens,
+        }
+
+
+# Singleton instance
+compaction_stats = CompactionStats()
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from app.models.schemas import ResumeSummary
+from app.services.rules import mask_contacts, rederive_contacts
+from app.services.storage import storage
+
+
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.95"))
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+if not 0.5 <= NEAR_DUPLICATE_THRESHOLD <= 1:
+    raise ValueError(f"Invalid NEAR_DUPLICATE_THRESHOLD: {NEAR_DUPLICATE_THRESHOLD}. Use a value between 0.5 and 1")
+
+_WORD = re.compile(r"\w+")
+_BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def shingles(text: str) -> set[str]:
+    """Overlapping word 3-grams of normalized text, ignoring contact details"""
+    words = _WORD.findall(mask_contacts(text).casefold())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def simhash(features: set[str]) -> int:
+    """64-bit SimHash: each bit is the majority vote of that bit across feature hashes"""
+    if not features:
+        return 0
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big") for feature in features),
+        dtype=np.uint64, count=len(features)
+    )
+    ones = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).sum(axis=0)
+    bits = ones * 2 > len(features)
+    return int(np.dot(bits.astype(np.uint64), np.uint64(1) << _BIT_SHIFTS))
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class NearDuplicateStats:
+    lookups: int = 0
+    hits: int = 0
+    misses: int = 0
+    rejected: int = 0  # fingerprint candidates that failed text verification or were not accepted
+
+    def snapshot(self) -> dict:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "hitRate": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+        }
+
+
+class NearDuplicateIndex:
+    """SimHash fingerprints of parsed resumes, banded for sub-linear near-duplicate lookup.
+
+    A similarity threshold t allows floor((1 - t) * 64) differing fingerprint
+    bits. The fingerprint is split into one more band than that, so by the
+    pigeonhole principle any fingerprint within the distance shares at least
+    one band exactly. Candidates are then verified by shingle Jaccard
+    similarity against their stored text.
+    """
+
+    def __init__(
+        self,
+        text_source: Callable[[str], str | None] = lambda resume_id: None,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD
+    ):
+        self.text_source = text_source
+        self.threshold = threshold
+        self.max_distance = int((1 - threshold) * FINGERPRINT_BITS)
+        bands = self.max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // bands
+        self._bands = bands
+        self._fingerprints: dict[str, int] = {}
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+        self.stats = NearDuplicateStats()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _band_keys(self, fingerprint: int) -> list[tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        return [(band, (fingerprint >> (band * self._band_bits)) & mask) for band in range(self._bands)]
+
+    def on_summary(self, resume_id: str, summary: ResumeSummary) -> None:
+        text = self.text_source(resume_id)
+        if text:
+            self.add(resume_id, simhash(shingles(text)))
+
+    def on_remove(self, resume_id: str) -> None:
+        fingerprint = self._fingerprints.pop(resume_id, None)
+        if fingerprint is None:
+            return
+        for key in self._band_keys(fingerprint):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(resume_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, resume_id: str, fingerprint: int) -> None:
+        self.on_remove(resume_id)
+        self._fingerprints[resume_id] = fingerprint
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, set()).add(resume_id)
+
+    def rebuild(self, summaries: Iterable[tuple[str, ResumeSummary]]) -> None:
+        """Fingerprint every stored summary, e.g. at startup with a persistent backend"""
+        for resume_id, summary in summaries:
+            self.on_summary(resume_id, summary)
+
+    def find(self, text: str, accept: Callable[[str], bool] = lambda resume_id: True) -> str | None:
+        """ID of the most similar indexed resume at or above the threshold that accept() allows"""
+        self.stats.lookups += 1
+        features = shingles(text)
+        fingerprint = simhash(features)
+
+        candidates = set()
+        for key in self._band_keys(fingerprint):
+            candidates |= self._buckets.get(key, set())
+        close = sorted(
+            (bin(fingerprint ^ self._fingerprints[resume_id]).count("1"), resume_id)
+            for resume_id in candidates
+        )
+
+        for distance, resume_id in close:
+            if distance > self.max_distance:
+                break
+            candidate_text = self.text_source(resume_id)
+            if (
+                candidate_text
+                and jaccard(features, shingles(candidate_text)) >= self.threshold
+                and accept(resume_id)
+            ):
+                self.stats.hits += 1
+                return resume_id
+            self.stats.rejected += 1
+
+        self.stats.misses += 1
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": NEAR_DUPLICATE_ENABLED,
+            "threshold": self.threshold,
+            "entries": len(self._fingerprints),
+            **self.stats.snapshot(),
+        }
+
+
+# Singleton instance
+near_duplicates = NearDuplicateIndex(text_source=storage.get_raw_text)
+storage.add_listener(near_duplicates)
+
+
+def reuse_near_duplicate(
+    resume_id: str,
+    file_name: str,
+    text_content: str,
+    text_hash: str,
+    raw_hash: str
+) -> dict | None:
+    """Store a new completed resume from a near-duplicate's summary, with contact fields re-derived.
+
+    Returns the stored record, or None when there is no usable near duplicate.
+    """
+    if not NEAR_DUPLICATE_ENABLED:
+        return None
+
+    folded_text = " ".join(text_content.split()).casefold()
+
+    def accept(match_id: str) -> bool:
+        cached = storage.get_resume(match_id)
+        if not cached or cached.get("status") != "completed" or not cached.get("summary"):
+            return False
+        # Same template but a different person is not a duplicate
+        return " ".join(cached["summary"].name.split()).casefold() in folded_text
+
+    match_id = near_duplicates.find(text_content, accept)
+    if match_id is None:
+        return None
+
+    match = storage.get_resume(match_id)
+    summary: ResumeSummary = match["summary"]
+    fields = summary.model_dump()
+    fields.update(rederive_contacts(fields, text_content), id=resume_id)
+
+    with storage.transaction():
+        storage.store_resume(
+            resume_id=resume_id,
+            file_name=file_name,
+            file_content=text_content,
+            status="processing"
+        )
+        # Copies keep the match's parse version, so the re-parse job upgrades outdated ones too
+        stored = storage.update_summary(resume_id, ResumeSummary(**fields), parse_version=match["parseVersion"])
+        storage.cache_resume_hash(text_hash, resume_id)
+        storage.cache_raw_hash(raw_hash, resume_id)
+    return stored
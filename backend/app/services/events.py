@@ -0,0 +1,87 @@
+import asyncio
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Literal
+
+
+Stage = Literal["extracting", "queued", "llm", "completed", "error"]
+
+# Per-resume progress kept for late subscribers; oldest entries are dropped first
+MAX_TRACKED_RESUMES = 1000
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Set in background work (e.g. re-parsing completed resumes) that must not publish progress
+progress_muted: ContextVar[bool] = ContextVar("progress_muted", default=False)
+
+
+class ProgressBroker:
+    """In-process pub/sub of parse progress (stage changes and partial fields) per resume"""
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_RESUMES):
+        self.max_tracked = max_tracked
+        self._state: OrderedDict[str, dict] = OrderedDict()  # resume_id -> {"stage", "fields"}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    def has_subscribers(self, resume_id: str) -> bool:
+        return bool(self._subscribers.get(resume_id))
+
+    def state(self, resume_id: str) -> dict | None:
+        """Latest stage and partial fields published for a resume"""
+        return self._state.get(resume_id)
+
+    def stage(self, resume_id: str, stage: Stage, **data) -> None:
+        """Publish a stage transition"""
+        if progress_muted.get():
+            return
+        state = self._track(resume_id)
+        state["stage"] = stage
+        self._publish(resume_id, "stage", {"stage": stage, **data})
+        if stage in ("completed", "error"):
+            # Terminal - storage holds the result from here on
+            self._state.pop(resume_id, None)
+
+    def forget(self, resume_id: str, stage: Stage | None = None) -> None:
+        """Drop the progress kept for a resume (only if it is still at stage, when given) without publishing"""
+        state = self._state.get(resume_id)
+        if state is not None and (stage is None or state["stage"] == stage):
+            del self._state[resume_id]
+
+    def partial(self, resume_id: str, fields: dict) -> None:
+        """Publish fields of ParsedResumeData that the LLM has finished producing"""
+        if progress_muted.get():
+            return
+        state = self._track(resume_id)
+        state["fields"].update(fields)
+        self._publish(resume_id, "partial", fields)
+
+    def subscribe(self, resume_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(resume_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, resume_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(resume_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[resume_id]
+
+    def _track(self, resume_id: str) -> dict:
+        state = self._state.get(resume_id)
+        if state is None:
+            state = self._state[resume_id] = {"stage": None, "fields": {}}
+            while len(self._state) > self.max_tracked:
+                self._state.popitem(last=False)
+        return state
+
+    def _publish(self, resume_id: str, event: str, data: dict) -> None:
+        for queue in self._subscribers.get(resume_id, ()):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Slow consumer - it will still get the terminal state from storage
+                pass
+
+
+# Singleton instance
+progress = ProgressBroker()
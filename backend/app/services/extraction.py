@@ -0,0 +1,210 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal
+
+from app.services.extractors import (
+    EXTRACTION_TARGET_CHARS, PDF_BACKEND, PDF_MAX_PAGES, PDF_PAGES_PER_TASK,
+    ExtractionResult, extract_document, extract_pdf_pages, require_pdf_text
+)
+from app.services.metrics import file_type_of, timed
+
+
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "process")
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "30"))
+# Split the rest of a PDF into parallel page ranges only if it is estimated to take longer than this
+PDF_PARALLEL_MIN_SECONDS = float(os.getenv("PDF_PARALLEL_MIN_SECONDS", "0.25"))
+
+
+class ExtractionTimeoutError(ValueError):
+    """Raised when a file exceeds its extraction time budget"""
+
+
+def validate_extracted_text(text_content: str) -> None:
+    """Reject extracted text that is empty or too short to be a resume"""
+    if not text_content.strip():
+        raise ValueError("Could not extract text from file. The file may be corrupted or empty.")
+
+    # Check if extracted text is too short (likely not a resume)
+    if len(text_content.strip()) < 50:
+        raise ValueError(
+            "The extracted text is too short to be a valid resume. Please upload a complete resume document."
+        )
+
+
+@dataclass
+class ExtractionStats:
+    files: int = 0
+    parallel_files: int = 0  # PDFs split into page ranges across the pool
+    pages: int = 0
+    pages_read: int = 0
+    pages_failed: int = 0
+    pages_skipped: int = 0   # beyond PDF_MAX_PAGES or after the target length was reached
+    stopped_early: int = 0
+    timed_out: int = 0
+    page_seconds: float = 0.0
+    max_page_seconds: float = 0.0
+
+    def record(self, result: ExtractionResult, parallel: bool = False) -> None:
+        self.files += 1
+        self.parallel_files += parallel
+        self.pages += result.pages
+        self.pages_read += result.pages_read
+        self.pages_failed += result.pages_failed
+        self.pages_skipped += result.pages - result.pages_read
+        self.stopped_early += result.stopped_early
+        self.page_seconds += sum(result.page_seconds)
+        self.max_page_seconds = max(self.max_page_seconds, *result.page_seconds, 0.0)
+
+    def snapshot(self) -> dict:
+        return {
+            "files": self.files,
+            "parallelFiles": self.parallel_files,
+            "pages": self.pages,
+            "pagesRead": self.pages_read,
+            "pagesFailed": self.pages_failed,
+            "pagesSkipped": self.pages_skipped,
+            "stoppedEarly": self.stopped_early,
+            "timedOut": self.timed_out,
+            "avgPageMs": round(self.page_seconds * 1000 / self.pages_read, 2) if self.pages_read else 0.0,
+            "maxPageMs": round(self.max_page_seconds * 1000, 2),
+        }
+
+
+class ExtractionExecutor:
+    """Runs CPU-bound text extraction in a process or thread pool, off the event loop"""
+
+    def __init__(
+        self,
+        mode: Literal["process", "thread"] = EXTRACTION_MODE,
+        workers: int = EXTRACTION_WORKERS,
+        timeout: float = EXTRACTION_TIMEOUT,
+    ):
+        if mode not in ("process", "thread"):
+            raise ValueError(f"Invalid extraction mode: {mode}. Use 'process' or 'thread'")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._pool: Executor | None = None
+        self.stats = ExtractionStats()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract")
+        return self._pool
+
+    def _recycle(self) -> None:
+        """Tear down the pool, killing worker processes stuck on an over-budget file"""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if isinstance(pool, ProcessPoolExecutor):
+            for process in list(getattr(pool, "_processes", {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, file_content: bytes | Path, file_name: str) -> ExtractionResult:
+        """Extract text (and PDF page boundaries) from a file within the configured time budget.
+
+        Given a path, each worker reads the file itself, so the bytes are never
+        pickled across the process pool.
+        """
+        with timed("extract", file_type_of(file_name)):
+            try:
+                result, parallel = await self._extract_within_budget(file_content, file_name)
+            except BrokenProcessPool:
+                # The pool was recycled under us by another file's timeout - retry once
+                self._recycle()
+                result, parallel = await self._extract_within_budget(file_content, file_name)
+        self.stats.record(result, parallel)
+        return result
+
+    async def _extract_within_budget(self, file_content: bytes | Path, file_name: str) -> tuple[ExtractionResult, bool]:
+        try:
+            if self._splits_pages(file_name):
+                return await asyncio.wait_for(self._extract_pdf_parallel(file_content), timeout=self.timeout), True
+            return await asyncio.wait_for(self._run(extract_document, file_content, file_name), timeout=self.timeout), False
+        except asyncio.TimeoutError:
+            self.stats.timed_out += 1
+            # Threads can't be interrupted; a process pool is recycled to reclaim the CPU
+            if self.mode == "process":
+                self._recycle()
+            raise ExtractionTimeoutError(f"Extraction exceeded the {self.timeout:g}s time limit")
+
+    def _splits_pages(self, file_name: str) -> bool:
+        """Page ranges only run in parallel across processes; threads would serialize on the GIL"""
+        return self.mode == "process" and self.workers > 1 and file_name.lower().endswith(".pdf")
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), func, *args)
+
+    async def _extract_pdf_parallel(self, file_content: bytes | Path) -> ExtractionResult:
+        """Extract the first page range, then the remaining ranges in waves of one range per worker.
+
+        The first range also reports the page count and per-page cost, so short
+        or cheap PDFs take one or two tasks. Later waves are skipped once the
+        target length is reached.
+        """
+        stop = PDF_MAX_PAGES if PDF_MAX_PAGES > 0 else None
+        first_stop = PDF_PAGES_PER_TASK if stop is None else min(PDF_PAGES_PER_TASK, stop)
+        first = await self._run(extract_pdf_pages, file_content, 0, first_stop, EXTRACTION_TARGET_CHARS, PDF_BACKEND)
+        parts = [first]
+        chars = len(first.text)
+
+        last = first.pages if stop is None else min(first.pages, stop)
+        step = PDF_PAGES_PER_TASK
+        if first.pages_read and sum(first.page_seconds) / first.pages_read * (last - first_stop) < PDF_PARALLEL_MIN_SECONDS:
+            # Cheap pages: another process round trip per range would cost more than it saves
+            step = max(last - first_stop, 1)
+        ranges = [(start, min(start + step, last)) for start in range(first_stop, last, step)]
+        stopped_early = first.stopped_early
+        while ranges and not stopped_early:
+            if EXTRACTION_TARGET_CHARS > 0 and chars >= EXTRACTION_TARGET_CHARS:
+                stopped_early = True
+                break
+            wave, ranges = ranges[:self.workers], ranges[self.workers:]
+            remaining = EXTRACTION_TARGET_CHARS - chars if EXTRACTION_TARGET_CHARS > 0 else 0
+            results = await asyncio.gather(*(
+                self._run(extract_pdf_pages, file_content, start, end, remaining, PDF_BACKEND) for start, end in wave
+            ))
+            parts += results
+            chars += sum(len(result.text) for result in results)
+            stopped_early = any(result.stopped_early for result in results)
+
+        return require_pdf_text(ExtractionResult(
+            text="\n".join(part.text for part in parts if part.text),
+            backend=first.backend,
+            pages=first.pages,
+            page_lines=[lines for part in parts for lines in part.page_lines],
+            pages_read=sum(part.pages_read for part in parts),
+            pages_failed=sum(part.pages_failed for part in parts),
+            page_seconds=[seconds for part in parts for seconds in part.page_seconds],
+            stopped_early=stopped_early,
+        ))
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "pdfBackend": PDF_BACKEND,
+            "maxPages": PDF_MAX_PAGES,
+            **self.stats.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        """Release the pool, cancelling extractions that have not started"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# Singleton instance
+extraction_executor = ExtractionExecutor()
@@ -0,0 +1,242 @@
+import importlib.util
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Protocol
+
+
+PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf2")
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+EXTRACTION_TARGET_CHARS = int(os.getenv("EXTRACTION_TARGET_CHARS", "120000"))
+
+if PDF_PAGES_PER_TASK < 1:
+    raise ValueError(f"Invalid PDF_PAGES_PER_TASK: {PDF_PAGES_PER_TASK}. Use at least 1")
+
+
+@dataclass
+class ExtractionResult:
+    """Extracted text plus per-page counters; picklable so it can cross the process pool"""
+    text: str
+    backend: str
+    pages: int = 0         # pages in the document (0 for formats without pages)
+    page_lines: list[int] = field(default_factory=list)  # lines of text per extracted page, in order (PDFs only)
+    pages_read: int = 0
+    pages_failed: int = 0
+    page_seconds: list[float] = field(default_factory=list)
+    stopped_early: bool = False  # target length reached before the last requested page
+
+
+class PdfBackend(Protocol):
+    name: str
+
+    def open(self, file_content: bytes) -> Any: ...
+
+    def page_count(self, document: Any) -> int: ...
+
+    def page_text(self, document: Any, index: int) -> str: ...
+
+
+class PyPDF2Backend:
+    name = "pypdf2"
+
+    def open(self, file_content: bytes) -> Any:
+        from PyPDF2 import PdfReader
+        return PdfReader(io.BytesIO(file_content))
+
+    def page_count(self, document: Any) -> int:
+        return len(document.pages)
+
+    def page_text(self, document: Any, index: int) -> str:
+        return document.pages[index].extract_text() or ""
+
+
+class PyMuPDFBackend:
+    """Faster MuPDF-based extraction; only registered when PyMuPDF is installed"""
+    name = "pymupdf"
+
+    def open(self, file_content: bytes) -> Any:
+        import fitz
+        return fitz.open(stream=file_content, filetype="pdf")
+
+    def page_count(self, document: Any) -> int:
+        return document.page_count
+
+    def page_text(self, document: Any, index: int) -> str:
+        return document.load_page(index).get_text()
+
+
+Extractor = Callable[[bytes], ExtractionResult]
+
+
+class ExtractorRegistry:
+    """Maps file extensions to text extractors and names to PDF backends"""
+
+    def __init__(self):
+        self._extractors: dict[str, Extractor] = {}
+        self._pdf_backends: dict[str, PdfBackend] = {}
+
+    def register(self, extension: str, extractor: Extractor) -> None:
+        self._extractors[extension.lower()] = extractor
+
+    def register_pdf_backend(self, backend: PdfBackend) -> None:
+        self._pdf_backends[backend.name] = backend
+
+    def pdf_backend(self, name: str = PDF_BACKEND) -> PdfBackend:
+        backend = self._pdf_backends.get(name)
+        if backend is None:
+            raise ValueError(f"Unknown PDF backend: {name}. Available: {', '.join(sorted(self._pdf_backends))}")
+        return backend
+
+    @property
+    def pdf_backends(self) -> list[str]:
+        return sorted(self._pdf_backends)
+
+    def get(self, file_name: str) -> Extractor:
+        """Extractor for the file's extension; raises ValueError for unsupported types"""
+        extension = os.path.splitext(file_name.lower())[1]
+        extractor = self._extractors.get(extension)
+        if extractor is None:
+            supported = ", ".join(ext.lstrip(".").upper() for ext in self._extractors)
+            raise ValueError(f"Unsupported file type: {file_name}. Supported types: {supported}")
+        return extractor
+
+
+def load_source(source: bytes | Path) -> bytes:
+    """File bytes, read from disk when given the path of a spooled upload"""
+    return source.read_bytes() if isinstance(source, Path) else source
+
+
+def extract_pdf_pages(
+    file_content: bytes | Path,
+    start: int = 0,
+    stop: int | None = None,
+    target_chars: int = EXTRACTION_TARGET_CHARS,
+    backend_name: str = PDF_BACKEND
+) -> ExtractionResult:
+    """Extract pages [start, stop) in order, stopping early once target_chars have been gathered.
+
+    Page failures are counted and skipped. The page cap is applied by callers
+    through stop.
+    """
+    backend = extractors.pdf_backend(backend_name)
+    try:
+        document = backend.open(load_source(file_content))
+        pages = backend.page_count(document)
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+
+    stop = pages if stop is None else min(stop, pages)
+    result = ExtractionResult(text="", backend=backend.name, pages=pages)
+    text_parts = []
+    chars = 0
+    for index in range(start, stop):
+        if target_chars > 0 and chars >= target_chars:
+            result.stopped_early = True
+            break
+        started = time.perf_counter()
+        try:
+            text = backend.page_text(document, index)
+        except Exception:
+            # Continue with other pages if one fails
+            text = ""
+            result.pages_failed += 1
+        result.page_seconds.append(time.perf_counter() - started)
+        result.pages_read += 1
+        if text:
+            text_parts.append(text)
+            chars += len(text)
+    # Page boundaries travel beside the text, so the stored and hashed text is plain
+    result.text = "\n".join(text_parts)
+    result.page_lines = [part.count("\n") + 1 for part in text_parts]
+    return result
+
+
+def extract_text_from_pdf(file_content: bytes) -> ExtractionResult:
+    """Extract text from the first PDF_MAX_PAGES pages of a PDF"""
+    return require_pdf_text(extract_pdf_pages(file_content, stop=PDF_MAX_PAGES if PDF_MAX_PAGES > 0 else None))
+
+
+def require_pdf_text(result: ExtractionResult) -> ExtractionResult:
+    """Fail the file if no page produced text"""
+    if result.pages_failed:
+        print(f"Warning: Failed to extract text from {result.pages_failed} of {result.pages_read} PDF pages")
+    if not result.text:
+        raise ValueError("Failed to extract text from PDF: No text could be extracted from the PDF file")
+    return result
+
+
+def extract_text_from_txt(file_content: bytes) -> ExtractionResult:
+    """Extract text content from TXT bytes"""
+    try:
+        text = file_content.decode("utf-8")
+    except UnicodeDecodeError:
+        # Try with error handling for non-UTF-8 files
+        try:
+            text = file_content.decode("utf-8", errors="replace")
+        except Exception as e:
+            raise ValueError(f"Failed to decode text file: {str(e)}")
+    return ExtractionResult(text=text, backend="txt")
+
+
+def extract_text_from_docx(file_content: bytes) -> ExtractionResult:
+    """Extract text content from DOCX bytes"""
+    from docx import Document
+
+    try:
+        docx_file = io.BytesIO(file_content)
+        doc = Document(docx_file)
+
+        text_parts = []
+        try:
+            for paragraph in doc.paragraphs:
+                if paragraph.text.strip():
+                    text_parts.append(paragraph.text)
+        except Exception as e:
+            print(f"Warning: Failed to extract some paragraphs: {str(e)}")
+
+        # Also extract text from tables
+        try:
+            for table in doc.tables:
+                for row in table.rows:
+                    row_text = []
+                    for cell in row.cells:
+                        if cell.text.strip():
+                            row_text.append(cell.text.strip())
+                    if row_text:
+                        text_parts.append(" | ".join(row_text))
+        except Exception as e:
+            print(f"Warning: Failed to extract some table data: {str(e)}")
+
+        if not text_parts:
+            raise ValueError("No text could be extracted from the DOCX file")
+
+        return ExtractionResult(text="\n".join(text_parts), backend="docx")
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+
+
+def extract_document(file_content: bytes | Path, file_name: str) -> ExtractionResult:
+    """Extract text and page counters with the extractor registered for the file type"""
+    extractor = extractors.get(file_name)
+    return extractor(load_source(file_content))
+
+
+def extract_text(file_content: bytes, file_name: str) -> str:
+    """Extract text based on file type"""
+    return extract_document(file_content, file_name).text
+
+
+# Singleton instance
+extractors = ExtractorRegistry()
+extractors.register(".pdf", extract_text_from_pdf)
+extractors.register(".txt", extract_text_from_txt)
+extractors.register(".docx", extract_text_from_docx)
+extractors.register_pdf_backend(PyPDF2Backend())
+if importlib.util.find_spec("fitz") is not None:
+    extractors.register_pdf_backend(PyMuPDFBackend())
+
+if PDF_BACKEND not in extractors.pdf_backends:
+    raise ValueError(f"Invalid PDF_BACKEND: {PDF_BACKEND}. Available: {', '.join(extractors.pdf_backends)}")
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import time
+
+from app.services.metrics import metrics
+from app.services.storage import storage
+
+
+# Seconds between polls of the shared change log; 0 turns the catch-up off
+INDEX_SYNC_INTERVAL = float(os.getenv("INDEX_SYNC_INTERVAL", "2"))
+
+
+class IndexSync:
+    """Keeps the in-process indexes in step with summaries other workers write.
+
+    Search, ranking and near-duplicate indexes are built from storage at
+    startup and then follow this process's own writes. When the storage is
+    shared (SQLite behind several workers), this polls the storage change
+    log and replays other workers' updates and removals to the same
+    listeners, so every worker sees them within about one interval.
+    """
+
+    def __init__(self, interval: float = INDEX_SYNC_INTERVAL):
+        self.interval = interval
+        self.cursor = 0
+        self.replayed = 0
+        self.errors = 0
+        self._last_sync: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark(self) -> None:
+        """Remember the log position; call before the indexes are rebuilt from storage"""
+        self.cursor = storage.change_cursor()
+
+    def start(self) -> None:
+        if self.interval > 0 and not self.running:
+            self._task = asyncio.create_task(self._run(), name="index-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def sync_once(self) -> int:
+        """Replay changes logged since the last sync; returns how many were applied"""
+        self.cursor, changes = await asyncio.to_thread(storage.changes_since, self.cursor)
+        for resume_id, summary in changes:
+            storage.replay(resume_id, summary)
+        self.replayed += len(changes)
+        self._last_sync = time.monotonic()
+        return len(changes)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": storage.shared and self.interval > 0,
+            "running": self.running,
+            "intervalSeconds": self.interval,
+            "cursor": self.cursor,
+            "replayed": self.replayed,
+            "errors": self.errors,
+            "secondsSinceSync": round(time.monotonic() - self._last_sync, 3) if self._last_sync else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Warning: Index sync failed: {str(e)}")
+
+
+# Singleton instance
+index_sync = IndexSync()
+
+metrics.callback("gridrez_index_sync_replayed_total", "Summary changes from other workers applied to the indexes",
+                 lambda: index_sync.replayed, kind="counter")
@@ -0,0 +1,90 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+
+
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", str(64 * 1024)))
+# Where accepted uploads are spooled until extraction; the system temp directory by default
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR") or None
+
+# Leading bytes each file type must start with; PDFs may have a little junk before the header
+FILE_SIGNATURES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",
+    ".zip": b"PK\x03\x04",
+}
+PDF_HEADER_WINDOW = 1024
+
+
+class FileContentError(ValueError):
+    """Raised when an upload is empty, too large, or does not match its file type"""
+
+
+@dataclass
+class IngestedFile:
+    """An accepted upload spooled to disk; extract from path, then discard() it"""
+    path: Path
+    size: int
+    raw_hash: str  # same digest as storage.compute_raw_hash
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def check_signature(head: bytes, file_name: str) -> None:
+    """Reject content whose leading bytes do not match the file extension"""
+    extension = os.path.splitext(file_name.lower())[1]
+    if extension == ".txt":
+        if b"\x00" in head:
+            raise FileContentError("File content does not look like a text file")
+        return
+    signature = FILE_SIGNATURES.get(extension)
+    if signature is None:
+        return
+    window = head[:PDF_HEADER_WINDOW] if extension == ".pdf" else head[:len(signature)]
+    if signature not in window:
+        raise FileContentError(f"File content does not match its {extension} extension")
+
+
+def check_size(size: int, max_bytes: int, label: str = "File") -> None:
+    if size > max_bytes:
+        raise FileContentError(f"{label} size exceeds {max_bytes // (1024 * 1024)}MB limit")
+
+
+async def read_upload(file: UploadFile, max_bytes: int, label: str = "File") -> IngestedFile:
+    """Copy an upload to its own temporary file in chunks, hashing as it goes.
+
+    Starlette has already spooled the multipart body by the time a route
+    runs, so a bad upload is stopped mid-stream by UploadCheckMiddleware, not
+    here; these checks are the backstop. The copy never holds the file in
+    memory, and the extraction pool is handed its path instead of the bytes.
+    """
+    return await asyncio.to_thread(_spool, file.file, file.filename or "", max_bytes, label)
+
+
+def _spool(source: BinaryIO, file_name: str, max_bytes: int, label: str) -> IngestedFile:
+    digest = hashlib.md5()
+    size = 0
+    spool = tempfile.NamedTemporaryFile(prefix="gridrez-", dir=INGEST_SPOOL_DIR, delete=False)
+    path = Path(spool.name)
+    try:
+        with spool:
+            while chunk := source.read(INGEST_CHUNK_SIZE):
+                if not size:
+                    check_signature(chunk, file_name)
+                size += len(chunk)
+                check_size(size, max_bytes, label)
+                digest.update(chunk)
+                spool.write(chunk)
+        if not size:
+            raise FileContentError(f"{label} is empty")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return IngestedFile(path=path, size=size, raw_hash=digest.hexdigest())
@@ -0,0 +1,274 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+from app.services.compaction import COMPACTION_ENABLED, LLM_MAX_INPUT_TOKENS, compact_resume_text, compaction_stats
+from app.services.events import progress
+from app.services.long_resume import LONG_DOCUMENT_ENABLED, LONG_DOCUMENT_MAX_TOKENS
+from app.services.metrics import current_file_type, metrics, record_error, timed
+from app.services.scheduler import is_rate_limit
+from app.services.storage import storage
+
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "4"))
+PARSE_QUEUE_SIZE = int(os.getenv("PARSE_QUEUE_SIZE", "100"))
+PARSE_JOB_TIMEOUT = float(os.getenv("PARSE_JOB_TIMEOUT", "120"))
+PARSE_DRAIN_TIMEOUT = float(os.getenv("PARSE_DRAIN_TIMEOUT", "30"))
+
+
+class QueueFullError(Exception):
+    """Raised when the parse queue cannot accept more jobs"""
+
+
+@dataclass
+class ParseJob:
+    resume_id: str
+    text_content: str
+    text_hash: str
+    file_type: str = "unknown"  # metrics label, e.g. "pdf"
+    page_lines: list[int] | None = None  # lines per PDF page, for header and footer removal
+    on_done: Callable[[], None] | None = None  # called once the job finished, failed or was dropped
+
+
+@dataclass
+class JobStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+
+
+class InflightRegistry:
+    """Single-flight registry: at most one parse per content hash is in progress"""
+
+    def __init__(self):
+        self._inflight: dict[str, tuple[str, asyncio.Event]] = {}
+
+    def claim(self, text_hash: str, resume_id: str) -> tuple[str, asyncio.Event] | None:
+        """Register resume_id as the owner of text_hash, or return the current owner and its done event"""
+        owner = self._inflight.get(text_hash)
+        if owner:
+            return owner
+        self._inflight[text_hash] = (resume_id, asyncio.Event())
+        return None
+
+    def release(self, text_hash: str) -> None:
+        """Wake everyone waiting on text_hash and forget it"""
+        owner = self._inflight.pop(text_hash, None)
+        if owner:
+            owner[1].set()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+def classify_parse_error(error: Exception) -> tuple[int, str]:
+    """Map an exception raised while parsing to an HTTP status code and message"""
+    if isinstance(error, ValueError):
+        # Validation errors (e.g., non-resume files, partial data issues)
+        return 400, str(error)
+
+    if isinstance(error, KeyError):
+        # Missing required fields in parsed data
+        return 400, (
+            "The resume appears to be incomplete or missing required information. "
+            "Please ensure the file contains a person's name and professional details."
+        )
+
+    if isinstance(error, asyncio.TimeoutError):
+        return 504, "Resume processing timed out. Please try again."
+
+    if is_rate_limit(error):
+        return 503, "The AI service is currently overloaded. Please try again in a few minutes."
+
+    # Check if it's a parsing error
+    error_str = str(error).lower()
+    if any(keyword in error_str for keyword in [
+        "parsedresumedata", "output parsing", "validation error",
+        "pydantic", "validation", "parse", "schema"
+    ]):
+        return 400, (
+            "The uploaded file does not appear to be a resume or CV, or the format is not recognized. "
+            "Please upload a document containing a person's professional background, work experience, skills, and education."
+        )
+
+    # For other errors, provide a generic but helpful message
+    return 500, (
+        "An unexpected error occurred while processing the resume. "
+        "Please try again or contact support if the issue persists."
+    )
+
+
+async def prepare_llm_text(text_content: str, page_lines: list[int] | None = None) -> str:
+    """Resume text as it is sent to the LLM"""
+    if not COMPACTION_ENABLED:
+        return text_content
+    # Trim boilerplate and duplicates so the prompt only carries what the LLM needs
+    # Long resumes are parsed in section chunks, so only truncate past the chunked ceiling
+    max_tokens = LONG_DOCUMENT_MAX_TOKENS if LONG_DOCUMENT_ENABLED else LLM_MAX_INPUT_TOKENS
+    with timed("compaction"):
+        compacted = await asyncio.to_thread(compact_resume_text, text_content, max_tokens, page_lines)
+    compaction_stats.record(compacted)
+    return compacted.text
+
+
+async def _compact_and_parse(job: ParseJob):
+    """Compact the text, then run the LLM parse"""
+    from app.services.parser import parse_resume
+
+    llm_text = await prepare_llm_text(job.text_content, job.page_lines)
+    with timed("parse"):
+        return await parse_resume(llm_text, job.resume_id)
+
+
+async def execute_parse_job(job: ParseJob, timeout: float = PARSE_JOB_TIMEOUT) -> Exception | None:
+    """Parse one resume and record the outcome in storage; returns the error, if any"""
+    # Loads the LLM stack on first use, unless the startup warmup already has
+    from app.services.parser import PARSE_VERSION
+
+    current_file_type.set(job.file_type)
+    try:
+        # The timeout covers compaction too, so a pathological document cannot hold the worker
+        summary = await asyncio.wait_for(_compact_and_parse(job), timeout=timeout)
+    except asyncio.CancelledError:
+        inflight.release(job.text_hash)
+        raise
+    except Exception as e:
+        status_code, detail = classify_parse_error(e)
+        record_error("parse", status_code, e)
+        storage.update_status(job.resume_id, "error", error=detail, error_code=status_code)
+        progress.stage(job.resume_id, "error", status=status_code, detail=detail)
+        inflight.release(job.text_hash)
+        return e
+
+    # Update storage with summary and cache the hash
+    with storage.transaction():
+        storage.update_summary(job.resume_id, summary, status="completed", parse_version=PARSE_VERSION)
+        storage.cache_resume_hash(job.text_hash, job.resume_id)
+    progress.stage(job.resume_id, "completed")
+    inflight.release(job.text_hash)
+    return None
+
+
+class ParseJobQueue:
+    """Bounded queue of resume parse jobs drained by a pool of async workers"""
+
+    def __init__(
+        self,
+        workers: int = PARSE_WORKERS,
+        max_size: int = PARSE_QUEUE_SIZE,
+        job_timeout: float = PARSE_JOB_TIMEOUT,
+    ):
+        self.workers = max(1, workers)
+        self.max_size = max_size
+        self.job_timeout = job_timeout
+        self.stats = JobStats()
+        self._queue: asyncio.Queue[ParseJob] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._accepting = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting to be picked up by a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        """Spawn the worker pool on the running event loop"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"parse-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._accepting = True
+
+    def submit(self, job: ParseJob) -> None:
+        """Enqueue a job without waiting; raises QueueFullError when saturated"""
+        if not self._accepting or self._queue is None:
+            self.stats.rejected += 1
+            raise QueueFullError("Parse queue is not accepting jobs")
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise QueueFullError("Parse queue is full")
+        self.stats.submitted += 1
+        progress.stage(job.resume_id, "queued")
+
+    async def shutdown(self, drain_timeout: float = PARSE_DRAIN_TIMEOUT) -> None:
+        """Stop accepting jobs, let queued jobs finish, then cancel the workers"""
+        self._accepting = False
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                print(f"Warning: Parse queue drain timed out with {self.depth} job(s) pending")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Anything still queued will never run - surface it as an error
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            detail = "Server shut down before the resume could be processed. Please try again."
+            storage.update_status(job.resume_id, "error", error=detail, error_code=503)
+            progress.stage(job.resume_id, "error", status=503, detail=detail)
+            inflight.release(job.text_hash)
+            if job.on_done:
+                job.on_done()
+            self._queue.task_done()
+
+    def snapshot(self) -> dict:
+        """Current queue depth and counters"""
+        return {
+            "workers": len(self._tasks),
+            "depth": self.depth,
+            "maxSize": self.max_size,
+            "inFlight": self.stats.in_flight,
+            "submitted": self.stats.submitted,
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "timedOut": self.stats.timed_out,
+            "rejected": self.stats.rejected,
+            "inflightHashes": len(inflight),
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            self.stats.in_flight += 1
+            try:
+                await self._run(job)
+            finally:
+                self.stats.in_flight -= 1
+                if job.on_done:
+                    job.on_done()
+                self._queue.task_done()
+
+    async def _run(self, job: ParseJob) -> None:
+        error = await execute_parse_job(job, self.job_timeout)
+        if error is None:
+            self.stats.completed += 1
+            return
+        if isinstance(error, asyncio.TimeoutError):
+            self.stats.timed_out += 1
+        self.stats.failed += 1
+
+
+# Singleton instances
+inflight = InflightRegistry()
+job_queue = ParseJobQueue()
+
+metrics.callback("gridrez_parse_queue_depth", "Parse jobs waiting for a worker", lambda: job_queue.depth)
+metrics.callback("gridrez_parse_jobs_in_flight", "Parse jobs currently running", lambda: job_queue.stats.in_flight)
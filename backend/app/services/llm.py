@@ -0,0 +1,144 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    # httpx and langchain are loaded on first use (or by the startup warmup), not when the app is imported
+    import httpx
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import Runnable
+    from langchain_openai import ChatOpenAI
+
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "90"))
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "2"))
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", "10"))
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+ChainFactory = Callable[["ChatOpenAI"], "Runnable"]
+
+
+class ChainRegistry:
+    """Builds LLM chains once and shares one keep-alive HTTP connection pool between them"""
+
+    def __init__(
+        self,
+        model: str = LLM_MODEL,
+        temperature: float = LLM_TEMPERATURE,
+        pool_size: int = LLM_POOL_SIZE,
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.pool_size = max(1, pool_size)
+        self._factories: dict[str, tuple[ChainFactory, str | None]] = {}
+        self._chains: dict[str, "Runnable"] = {}
+        self._http_client: "httpx.AsyncClient | None" = None
+        self._llms: dict[str, "ChatOpenAI"] = {}
+        self._override: "BaseChatModel | None" = None
+        self.warmed_up = False
+        self.warmup_error: str | None = None  # why startup() could not build the chains or pre-open connections
+
+    def register(self, name: str, factory: ChainFactory, model: str | None = None) -> None:
+        """Register a chain factory; it is called with the shared chat model (or the given model)"""
+        self._factories[name] = (factory, model)
+        self._chains.pop(name, None)
+
+    def get(self, name: str) -> "Runnable":
+        """Get a built chain, building it on first use if startup() has not run"""
+        chain = self._chains.get(name)
+        if chain is None:
+            factory, model = self._factories[name]
+            chain = factory(self.chat_model(model))
+            self._chains[name] = chain
+        return chain
+
+    @property
+    def llm(self) -> "ChatOpenAI":
+        return self.chat_model()
+
+    def override_chat_model(self, llm: "BaseChatModel | None") -> None:
+        """Build every chain with the given model instead of ChatOpenAI, e.g. a local stand-in for benchmarks"""
+        self._override = llm
+        self._chains.clear()
+
+    def chat_model(self, model: str | None = None) -> "ChatOpenAI":
+        """Chat model for the given model name, sharing the pooled HTTP client"""
+        if self._override is not None:
+            return self._override
+        model = model or self.model
+        if model not in self._llms:
+            import httpx
+            from langchain_openai import ChatOpenAI
+
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT),
+                )
+            self._llms[model] = ChatOpenAI(
+                model=model,
+                temperature=self.temperature,
+                http_async_client=self._http_client,
+                # Report token usage on streamed responses too
+                stream_usage=True,
+                # Retries and backoff are handled by the LLM scheduler
+                max_retries=0,
+            )
+        return self._llms[model]
+
+    async def startup(self) -> None:
+        """Build every registered chain and pre-open connections to the LLM endpoint"""
+        try:
+            for name in self._factories:
+                self.get(name)
+        except Exception as e:
+            # e.g. missing OPENAI_API_KEY - chains will be built (and fail) on first use
+            print(f"Warning: Failed to build LLM chains at startup: {str(e)}")
+            self.warmup_error = f"LLM chains not built: {str(e)}"
+            return
+        await self.warmup()
+
+    async def warmup(self, connections: int = LLM_WARMUP_CONNECTIONS) -> None:
+        """Open keep-alive connections (DNS + TLS) so the first parse doesn't pay for them"""
+        llm = self._llms.get(self.model)
+        if self._http_client is None or llm is None:
+            return
+        api_base = (llm.openai_api_base or DEFAULT_API_BASE).rstrip("/")
+        api_key = llm.openai_api_key.get_secret_value() if llm.openai_api_key else ""
+        headers = {"Authorization": f"Bearer {api_key}"}
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(
+                    self._http_client.get(f"{api_base}/models", headers=headers)
+                    for _ in range(max(0, min(connections, self.pool_size)))
+                )),
+                timeout=LLM_WARMUP_TIMEOUT,
+            )
+            self.warmed_up = True
+            self.warmup_error = None
+        except Exception as e:
+            print(f"Warning: LLM connection warmup failed: {str(e)}")
+            self.warmup_error = f"LLM connection warmup failed: {str(e)}"
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._llms.clear()
+        self._chains.clear()
+        self.warmed_up = False
+        self.warmup_error = None
+
+
+# Singleton instance
+chains = ChainRegistry()
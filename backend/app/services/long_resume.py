@@ -0,0 +1,225 @@
+import os
+from dataclasses import dataclass
+
+from app.models.schemas import Education, ParsedResumeData, SocialHandles
+from app.services.compaction import LLM_MAX_INPUT_TOKENS
+from app.services.rules import HEADER_LINES, section_heading
+from app.services.scheduler import CHARS_PER_TOKEN, estimate_tokens
+from app.services.search import normalize_skill
+
+
+LONG_DOCUMENT_ENABLED = os.getenv("LONG_DOCUMENT_ENABLED", "true").lower() == "true"
+LONG_DOCUMENT_CHUNK_TOKENS = int(os.getenv("LONG_DOCUMENT_CHUNK_TOKENS", "3000"))
+LONG_DOCUMENT_MAX_CHUNKS = int(os.getenv("LONG_DOCUMENT_MAX_CHUNKS", "8"))
+
+if LONG_DOCUMENT_CHUNK_TOKENS < 500:
+    raise ValueError(f"Invalid LONG_DOCUMENT_CHUNK_TOKENS: {LONG_DOCUMENT_CHUNK_TOKENS}. Use at least 500")
+if LONG_DOCUMENT_MAX_CHUNKS < 2:
+    raise ValueError(f"Invalid LONG_DOCUMENT_MAX_CHUNKS: {LONG_DOCUMENT_MAX_CHUNKS}. Use at least 2")
+
+# Text above the single-call ceiling is split into section chunks instead of truncated;
+# beyond this many tokens even the chunked path keeps only head and tail
+LONG_DOCUMENT_MAX_TOKENS = LONG_DOCUMENT_CHUNK_TOKENS * LONG_DOCUMENT_MAX_CHUNKS
+
+# The header repeated in every chunk takes at most this share of the chunk budget
+CONTEXT_MAX_SHARE = 0.25
+CONTEXT_SEPARATOR = "\n...\n"
+
+
+def is_long_document(text: str) -> bool:
+    """True if the text is too long for one LLM call and should be parsed in section chunks"""
+    return LONG_DOCUMENT_ENABLED and estimate_tokens(text) > LLM_MAX_INPUT_TOKENS
+
+
+@dataclass
+class ResumeChunk:
+    sections: list[str]  # section names in the chunk, in document order
+    text: str            # chunk text, prefixed with the resume header when it does not contain it
+
+
+def _blocks(text: str) -> list[tuple[str, list[str]]]:
+    """Consecutive (section, lines) runs; lines before the first heading form the "header" block"""
+    blocks: list[tuple[str, list[str]]] = [("header", [])]
+    for line in text.split("\n"):
+        section = section_heading(line)
+        if section:
+            blocks.append((section, [line]))
+        elif line.strip():
+            blocks[-1][1].append(line)
+    return [(section, lines) for section, lines in blocks if lines]
+
+
+def _split_line(line: str, budget: int) -> list[str]:
+    """Split a line longer than budget tokens at spaces, and words longer than that at characters"""
+    # Longest text whose estimate_tokens() + 1 stays within budget
+    width = max(1, (budget - 2) * CHARS_PER_TOKEN)
+    if len(line) <= width:
+        return [line]
+    parts: list[str] = []
+    current = ""
+    for word in line.split(" "):
+        while len(word) > width:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(word[:width])
+            word = word[width:]
+        if current and len(current) + 1 + len(word) > width:
+            parts.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _split_block(lines: list[str], budget: int) -> list[list[str]]:
+    """Split a block at line boundaries into pieces of at most budget tokens, cutting up longer lines"""
+    pieces: list[list[str]] = [[]]
+    used = 0
+    for line in (part for line in lines for part in _split_line(line, budget)):
+        tokens = estimate_tokens(line) + 1
+        if pieces[-1] and used + tokens > budget:
+            pieces.append([])
+            used = 0
+        pieces[-1].append(line)
+        used += tokens
+    return pieces
+
+
+def split_long_resume(
+    text: str,
+    chunk_tokens: int = LONG_DOCUMENT_CHUNK_TOKENS,
+    max_chunks: int = LONG_DOCUMENT_MAX_CHUNKS
+) -> list[ResumeChunk]:
+    """Pack section blocks into chunks of at most chunk_tokens, in document order.
+
+    Oversized sections are split at line boundaries, and lines too long for a
+    chunk at spaces. Sections outside the extracted fields (publications,
+    projects, ...) keep only their first piece, and chunks beyond max_chunks
+    are dropped from the end. Every chunk that does not start with the resume
+    header gets the header lines prepended (cut to CONTEXT_MAX_SHARE of the
+    chunk), so the model sees the candidate's name and contacts in each call.
+    """
+    blocks = _blocks(text)
+    header = blocks[0][1][:HEADER_LINES] if blocks and blocks[0][0] == "header" else []
+    context = "\n".join(header)[:int(chunk_tokens * CONTEXT_MAX_SHARE) * CHARS_PER_TOKEN]
+    budget = chunk_tokens - estimate_tokens(context + CONTEXT_SEPARATOR) if context else chunk_tokens
+
+    pieces: list[tuple[str, list[str]]] = []
+    for section, lines in blocks:
+        split = _split_block(lines, budget)
+        if section == "other":
+            split = split[:1]
+        pieces += [(section, piece) for piece in split]
+
+    chunks: list[tuple[list[str], list[str]]] = []
+    used = budget
+    for section, lines in pieces:
+        tokens = estimate_tokens("\n".join(lines)) + 1
+        if used + tokens > budget:
+            chunks.append(([], []))
+            used = 0
+        if section not in chunks[-1][0]:
+            chunks[-1][0].append(section)
+        chunks[-1][1].extend(lines)
+        used += tokens
+
+    result = []
+    for index, (sections, lines) in enumerate(chunks[:max_chunks]):
+        body = "\n".join(lines)
+        if index > 0 and context:
+            body = f"{context}{CONTEXT_SEPARATOR}{body}"
+        result.append(ResumeChunk(sections=sections, text=body))
+    return result
+
+
+def _first(values):
+    return next((value for value in values if value not in (None, "", "Not specified", "No summary available")), None)
+
+
+def _preferred(chunks: list[ResumeChunk], parts: list[ParsedResumeData], section: str) -> list[ParsedResumeData]:
+    """Results of chunks containing the section first, then the rest, each in document order"""
+    return [part for chunk, part in zip(chunks, parts) if section in chunk.sections] + \
+        [part for chunk, part in zip(chunks, parts) if section not in chunk.sections]
+
+
+def merge_chunk_results(chunks: list[ResumeChunk], parts: list[ParsedResumeData]) -> ParsedResumeData:
+    """Merge per-chunk parses into one result, independent of the order the calls finished in.
+
+    Scalars come from the first chunk that has them, preferring the chunk
+    holding the relevant section (the header for contacts, the first
+    experience chunk for the current role); experience years take the maximum;
+    skills and education are unioned in document order without duplicates.
+    """
+    skills: list[str] = []
+    seen_skills: set[str] = set()
+    education: list[Education] = []
+    seen_education: set[tuple[str, str]] = set()
+    for part in parts:
+        for skill in part.skills:
+            key = normalize_skill(skill)
+            if key and key not in seen_skills:
+                seen_skills.add(key)
+                skills.append(skill.strip())
+        for entry in part.education:
+            key = (entry.degree.strip().casefold(), entry.institution.strip().casefold())
+            if key not in seen_education:
+                seen_education.add(key)
+                education.append(entry)
+
+    by_header = _preferred(chunks, parts, "header")
+    handles = [part.socialHandles for part in by_header if part.socialHandles]
+    social_handles = None
+    if handles:
+        other: list[str] = []
+        for handle in handles:
+            other += [value for value in handle.other if value not in other]
+        social_handles = SocialHandles(
+            linkedin=_first(handle.linkedin for handle in handles),
+            github=_first(handle.github for handle in handles),
+            twitter=_first(handle.twitter for handle in handles),
+            portfolio=_first(handle.portfolio for handle in handles),
+            other=other,
+        )
+
+    years = [part.experienceYears for part in parts if part.experienceYears is not None]
+    by_summary = _preferred(chunks, parts, "summary")
+    return ParsedResumeData(
+        name=_first(part.name for part in by_header),
+        currentRole=_first(part.currentRole for part in _preferred(chunks, parts, "experience")),
+        experienceYears=max(years) if years else None,
+        skills=skills,
+        education=education,
+        summary=_first(part.summary for part in by_summary),
+        email=_first(part.email for part in by_header),
+        phone=_first(part.phone for part in by_header),
+        location=_first(part.location for part in by_header),
+        socialHandles=social_handles,
+    )
+
+
+@dataclass
+class LongDocumentStats:
+    documents: int = 0
+    chunks: int = 0
+
+    def record(self, chunks: int) -> None:
+        self.documents += 1
+        self.chunks += chunks
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": LONG_DOCUMENT_ENABLED,
+            "thresholdTokens": LLM_MAX_INPUT_TOKENS,
+            "chunkTokens": LONG_DOCUMENT_CHUNK_TOKENS,
+            "maxChunks": LONG_DOCUMENT_MAX_CHUNKS,
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "avgChunks": round(self.chunks / self.documents, 2) if self.documents else 0.0,
+        }
+
+
+# Singleton instance
+long_document_stats = LongDocumentStats()
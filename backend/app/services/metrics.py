@@ -0,0 +1,194 @@
+import bisect
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Upper bounds in seconds; spans sub-millisecond hashing up to a slow LLM round trip
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # the response adds the charset
+
+# File type of the upload being handled, so deep stages (LLM call, summary) can be labeled by it
+current_file_type: ContextVar[str] = ContextVar("current_file_type", default="unknown")
+
+Labels = tuple[str, ...]
+
+
+def file_type_of(file_name: str | None) -> str:
+    """Lowercase extension without the dot, e.g. "pdf" """
+    extension = os.path.splitext((file_name or "").lower())[1].lstrip(".")
+    return extension or "unknown"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if METRICS_ENABLED:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def lines(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = STAGE_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Per label set: a count per bucket plus +Inf, then the sum and the total count
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def lines(self) -> Iterator[str]:
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+
+
+class CallbackMetric:
+    """Gauge or counter whose values are read from existing service state at scrape time"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], float | dict[Labels, float]],
+        labelnames: tuple[str, ...] = (),
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.labelnames = labelnames
+        self.kind = kind
+
+    def lines(self) -> Iterator[str]:
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"Warning: Failed to collect metric {self.name}: {str(e)}")
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Histogram:
+        return self._add(Histogram(name, help, labelnames))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], float | dict[Labels, float]],
+        labelnames: tuple[str, ...] = (),
+        kind: str = "gauge"
+    ) -> CallbackMetric:
+        return self._add(CallbackMetric(name, help, collect, labelnames, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "gridrez_stage_seconds", "Time spent in each upload and parse stage", ("stage", "file_type")
+)
+cache_lookups = metrics.counter(
+    "gridrez_cache_lookups_total", "Resume cache lookups by cache (raw bytes or text) and result", ("cache", "result")
+)
+errors = metrics.counter(
+    "gridrez_errors_total", "Failed uploads and parses by stage, HTTP status and exception class",
+    ("stage", "status", "error")
+)
+
+
+def observe_stage(stage: str, seconds: float, file_type: str | None = None) -> None:
+    """Record a stage duration, labeled with the current upload's file type unless one is given"""
+    stage_seconds.observe(seconds, stage, file_type or current_file_type.get())
+
+
+@contextmanager
+def timed(stage: str, file_type: str | None = None) -> Iterator[None]:
+    """Observe the block's duration under the stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, file_type)
+
+
+def record_error(stage: str, status: int, error: BaseException) -> None:
+    errors.inc(stage, str(status), type(error).__name__)
@@ -0,0 +1,62 @@
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from app.services.metrics import metrics
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage
+
+
+# "format_instructions" puts the JSON schema in the prompt and parses free text;
+# "function_calling" / "json_schema" bind the schema natively and drop it from the prompt
+OUTPUT_MODES = ("format_instructions", "function_calling", "json_schema")
+LLM_OUTPUT_MODE = os.getenv("LLM_OUTPUT_MODE", "format_instructions")
+
+if LLM_OUTPUT_MODE not in OUTPUT_MODES:
+    raise ValueError(f"Invalid LLM_OUTPUT_MODE: {LLM_OUTPUT_MODE}. Use one of: {', '.join(OUTPUT_MODES)}")
+
+
+@dataclass
+class OutputStats:
+    """Token use, latency and repair counters of resume parsing calls"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency: float = 0.0
+    invalid_outputs: int = 0
+    local_repairs: int = 0
+    llm_repairs: int = 0
+    failures: int = 0
+
+    def record_call(self, latency: float, message: "AIMessage") -> None:
+        self.calls += 1
+        self.total_latency += latency
+        usage = message.usage_metadata or {}
+        self.prompt_tokens += usage.get("input_tokens", 0)
+        self.completion_tokens += usage.get("output_tokens", 0)
+
+    def snapshot(self) -> dict:
+        calls = self.calls or 1
+        return {
+            "mode": LLM_OUTPUT_MODE,
+            "calls": self.calls,
+            "avgPromptTokens": round(self.prompt_tokens / calls, 1),
+            "avgCompletionTokens": round(self.completion_tokens / calls, 1),
+            "avgLatencySeconds": round(self.total_latency / calls, 3),
+            "invalidOutputs": self.invalid_outputs,
+            "localRepairs": self.local_repairs,
+            "llmRepairs": self.llm_repairs,
+            "failures": self.failures,
+            "failureRate": round(self.failures / calls, 4),
+        }
+
+
+# Singleton instance
+output_stats = OutputStats()
+
+metrics.callback(
+    "gridrez_llm_tokens_total", "LLM tokens used by resume parsing calls, as reported by the API",
+    lambda: {("prompt",): output_stats.prompt_tokens, ("completion",): output_stats.completion_tokens},
+    labelnames=("kind",), kind="counter"
+)
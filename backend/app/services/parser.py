@@ -1,105 +1,34 @@
-import io
-from PyPDF2 import PdfReader
-from docx import Document
+import asyncio
+import hashlib
+import json
+import os
+import time
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_function
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
 from app.models.schemas import ParsedResumeData, ResumeSummary, Education, SocialHandles
+from app.services.llm import chains
+from app.services.scheduler import llm_scheduler, estimate_tokens
+from app.services.output_stats import LLM_OUTPUT_MODE, output_stats
+from app.services.structured_output import raw_payload, repair_output
+from app.services.events import progress
+from app.services.rules import RULES_ENABLED, RULES_SKIP_LLM, RuleExtraction, extract_fields, rule_stats
+from app.services.long_resume import is_long_document, long_document_stats, merge_chunk_results, split_long_resume
+from app.services.metrics import observe_stage, timed
 
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text content from PDF bytes"""
-    try:
-        pdf_file = io.BytesIO(file_content)
-        reader = PdfReader(pdf_file)
-
-        text_parts = []
-        for page in reader.pages:
-            try:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            except Exception as e:
-                # Continue with other pages if one fails
-                print(f"Warning: Failed to extract text from a PDF page: {str(e)}")
-                continue
-
-        if not text_parts:
-            raise ValueError("No text could be extracted from the PDF file")
-        
-        return "\n".join(text_parts)
-    except Exception as e:
-        raise ValueError(f"Failed to extract text from PDF: {str(e)}")
+RESUME_PARSER_CHAIN = "resume_parser"
 
+resume_output_parser = PydanticOutputParser(pydantic_object=ParsedResumeData)
 
-def extract_text_from_txt(file_content: bytes) -> str:
-    """Extract text content from TXT bytes"""
-    try:
-        return file_content.decode("utf-8")
-    except UnicodeDecodeError:
-        # Try with error handling for non-UTF-8 files
-        try:
-            return file_content.decode("utf-8", errors="replace")
-        except Exception as e:
-            raise ValueError(f"Failed to decode text file: {str(e)}")
-
-
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text content from DOCX bytes"""
-    try:
-        docx_file = io.BytesIO(file_content)
-        doc = Document(docx_file)
-        
-        text_parts = []
-        try:
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-        except Exception as e:
-            print(f"Warning: Failed to extract some paragraphs: {str(e)}")
-        
-        # Also extract text from tables
-        try:
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            row_text.append(cell.text.strip())
-                    if row_text:
-                        text_parts.append(" | ".join(row_text))
-        except Exception as e:
-            print(f"Warning: Failed to extract some table data: {str(e)}")
-        
-        if not text_parts:
-            raise ValueError("No text could be extracted from the DOCX file")
-        
-        return "\n".join(text_parts)
-    except Exception as e:
-        raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
-
-
-def extract_text(file_content: bytes, file_name: str) -> str:
-    """Extract text based on file type"""
-    file_name_lower = file_name.lower()
-    if file_name_lower.endswith(".pdf"):
-        return extract_text_from_pdf(file_content)
-    elif file_name_lower.endswith(".txt"):
-        return extract_text_from_txt(file_content)
-    elif file_name_lower.endswith(".docx"):
-        return extract_text_from_docx(file_content)
-    else:
-        raise ValueError(f"Unsupported file type: {file_name}. Supported types: PDF, TXT, DOCX")
-
-
-async def parse_resume(resume_text: str, resume_id: str) -> ResumeSummary:
-    """Parse resume text using LangChain and GPT-4"""
-
-    parser = PydanticOutputParser(pydantic_object=ParsedResumeData)
-
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are an expert resume parser. Analyze the provided text and extract structured information from a resume/CV.
+RESUME_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert resume parser. Analyze the provided text and extract structured information from a resume/CV.
 
 IMPORTANT RULES:
 1. Only parse if the text is clearly a resume or CV. A resume should contain:
@@ -127,7 +56,7 @@ IMPORTANT RULES:
 6. Always return valid data - never leave required fields as null unless the document is clearly not a resume.
 
 {format_instructions}"""),
-        ("user", """Please parse the following text and extract the requested information. 
+    ("user", """Please parse the following text and extract the requested information. 
 
 If this is NOT a resume or CV, set the name field to null.
 If this IS a resume but some information is missing, use the default values specified in the instructions.
@@ -136,18 +65,204 @@ If this IS a resume but some information is missing, use the default values spec
 {resume_text}
 ---
 
-Extract all relevant information following the specified format. Handle missing data gracefully.""")
-    ])
+Extract all relevant information following the specified format. Handle missing data gracefully.{known_fields}""")
+])
 
-    llm = ChatOpenAI(model="gpt-4", temperature=0)
 
-    chain = prompt | llm | parser
+def _format_instructions() -> str:
+    """Schema text for the prompt; empty when the schema is bound natively"""
+    if LLM_OUTPUT_MODE == "format_instructions":
+        return resume_output_parser.get_format_instructions()
+    return ""
 
-    try:
-        parsed_data: ParsedResumeData = await chain.ainvoke({
-            "resume_text": resume_text,
-            "format_instructions": parser.get_format_instructions()
+
+def build_resume_chain(llm: ChatOpenAI) -> Runnable:
+    """Build the resume parsing chain with the format instructions rendered once.
+
+    The chain yields the raw AIMessage in every mode so it can be streamed;
+    _parse_message() turns it into ParsedResumeData.
+    """
+    prompt = RESUME_PROMPT.partial(format_instructions=_format_instructions())
+    if LLM_OUTPUT_MODE == "function_calling":
+        return prompt | llm.bind_tools([ParsedResumeData], tool_choice=RESUME_SCHEMA["name"])
+    if LLM_OUTPUT_MODE == "json_schema":
+        return prompt | llm.bind(response_format={
+            "type": "json_schema",
+            "json_schema": {"name": RESUME_SCHEMA["name"], "schema": RESUME_SCHEMA["parameters"]},
         })
+    return prompt | llm
+
+
+RESUME_SCHEMA = convert_to_openai_function(ParsedResumeData)
+
+chains.register(RESUME_PARSER_CHAIN, build_resume_chain)
+
+# Prompt tokens outside the resume text, plus room for the JSON answer
+RESUME_PROMPT_TOKENS = estimate_tokens(
+    RESUME_PROMPT.format(resume_text="", format_instructions=_format_instructions(), known_fields="")
+)
+RESUME_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "600"))
+
+# Bump to re-parse everything after a change the fingerprint cannot see, e.g. to the post-processing
+PARSE_VERSION_SALT = os.getenv("PARSE_VERSION_SALT", "")
+
+
+def parse_fingerprint(model: str) -> str:
+    """Digest of everything that shapes a parse: prompt template, output mode, schema and model"""
+    prompt = [(type(message).__name__, message.prompt.template) for message in RESUME_PROMPT.messages]
+    parts = [prompt, _format_instructions(), LLM_OUTPUT_MODE, ParsedResumeData.model_json_schema(), model, PARSE_VERSION_SALT]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+# Recorded with every stored summary; summaries from other versions are upgraded in the background
+PARSE_VERSION = parse_fingerprint(chains.model)
+
+# Re-parse the partial answer for progress events after this many new characters
+PARTIAL_MIN_CHARS = 40
+
+
+def _known_fields_note(fields: set[str]) -> str:
+    """Prompt note asking the model not to produce fields the rules already filled"""
+    if not fields:
+        return ""
+    return (
+        "\n\nThese fields were already extracted; return them as null (or an empty list) "
+        f"and do not repeat their contents: {', '.join(sorted(fields))}"
+    )
+
+
+def _parse_message(message: AIMessage) -> ParsedResumeData:
+    """Parse the model's answer for the configured output mode; raises OutputParserException"""
+    if LLM_OUTPUT_MODE == "format_instructions":
+        return resume_output_parser.invoke(message)
+    try:
+        if LLM_OUTPUT_MODE == "function_calling":
+            if not message.tool_calls:
+                raise OutputParserException("Model did not return a tool call", llm_output=raw_payload(message))
+            return ParsedResumeData.model_validate(message.tool_calls[0]["args"])
+        return ParsedResumeData.model_validate_json(message.content)
+    except ValidationError as e:
+        raise OutputParserException(f"Failed to parse ParsedResumeData: {str(e)}", llm_output=raw_payload(message))
+
+
+def _partial_payload(message: AIMessageChunk) -> str:
+    """JSON produced so far, from tool call chunks or text content"""
+    if message.tool_call_chunks:
+        return message.tool_call_chunks[0].get("args") or ""
+    return message.content if isinstance(message.content, str) else ""
+
+
+def _publish_partial_fields(resume_id: str, payload: str, published: set[str]) -> None:
+    """Publish top-level fields that are complete, i.e. followed by another key"""
+    start = payload.find("{")
+    if start == -1:
+        return
+    data = parse_partial_json(payload[start:])
+    if not isinstance(data, dict):
+        return
+    # The last key may still be streaming
+    finished = {key: data[key] for key in list(data)[:-1] if key not in published}
+    if finished:
+        published.update(finished)
+        progress.partial(resume_id, finished)
+
+
+async def _stream_resume_chain(
+    chain: Runnable,
+    resume_text: str,
+    resume_id: str,
+    skip_fields: set[str] = frozenset(),
+    publish_partial: bool = True
+) -> AIMessageChunk:
+    """Stream the answer, publishing finished fields to progress subscribers as they arrive"""
+    progress.stage(resume_id, "llm")
+    message: AIMessageChunk | None = None
+    # Fields filled by rules were published already and come back as null
+    published: set[str] = set(skip_fields)
+    parsed_len = 0
+    with timed("llm"):
+        async for chunk in chain.astream({"resume_text": resume_text, "known_fields": _known_fields_note(skip_fields)}):
+            message = chunk if message is None else message + chunk
+            if publish_partial and progress.has_subscribers(resume_id):
+                payload = _partial_payload(message)
+                if len(payload) - parsed_len >= PARTIAL_MIN_CHARS:
+                    parsed_len = len(payload)
+                    _publish_partial_fields(resume_id, payload, published)
+    if message is None:
+        raise OutputParserException("Model returned no output")
+    return message
+
+
+async def _invoke_resume_chain(
+    resume_text: str,
+    resume_id: str,
+    skip_fields: set[str] = frozenset(),
+    publish_partial: bool = True
+) -> ParsedResumeData:
+    """Run the resume chain, repairing invalid output instead of failing the whole parse"""
+    chain = chains.get(RESUME_PARSER_CHAIN)
+    started = time.monotonic()
+    message = await llm_scheduler.run(
+        lambda: _stream_resume_chain(chain, resume_text, resume_id, skip_fields, publish_partial),
+        tokens=RESUME_PROMPT_TOKENS + estimate_tokens(resume_text) + RESUME_COMPLETION_TOKENS
+    )
+    output_stats.record_call(time.monotonic() - started, message)
+
+    try:
+        return _parse_message(message)
+    except OutputParserException as e:
+        return await repair_output(message, e)
+
+
+async def _map_reduce_resume(
+    resume_text: str,
+    resume_id: str,
+    skip_fields: set[str] = frozenset()
+) -> ParsedResumeData:
+    """Parse a long resume as concurrent section chunks and merge the results in document order.
+
+    Partial progress events are not published per chunk since chunks may disagree.
+    """
+    chunks = split_long_resume(resume_text)
+    long_document_stats.record(len(chunks))
+    results = await asyncio.gather(
+        *(_invoke_resume_chain(chunk.text, resume_id, skip_fields, publish_partial=False) for chunk in chunks),
+        return_exceptions=True
+    )
+
+    parsed = [(chunk, result) for chunk, result in zip(chunks, results) if not isinstance(result, BaseException)]
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+    if not parsed:
+        raise results[0]
+    if len(parsed) < len(chunks):
+        print(f"Warning: {len(chunks) - len(parsed)} of {len(chunks)} chunks failed to parse for resume {resume_id}")
+    return merge_chunk_results([chunk for chunk, _ in parsed], [result for _, result in parsed])
+
+
+async def parse_resume(resume_text: str, resume_id: str) -> ResumeSummary:
+    """Parse resume text using LangChain and GPT-4"""
+    with timed("rules"):
+        rules = extract_fields(resume_text) if RULES_ENABLED else RuleExtraction()
+    known = rules.confident()
+
+    try:
+        if RULES_SKIP_LLM and rules.covers_all():
+            # Every field was found with high confidence - no LLM call needed
+            parsed_data = ParsedResumeData(**rules.values)
+            rule_stats.record(known, skipped_llm=True)
+        else:
+            # The LLM still reads the name, which doubles as its is-this-a-resume check
+            filled = known - {"name"}
+            if filled:
+                progress.partial(resume_id, ParsedResumeData(**rules.values).model_dump(mode="json", include=filled))
+            if is_long_document(resume_text):
+                parsed_data = await _map_reduce_resume(resume_text, resume_id, filled)
+            else:
+                parsed_data = await _invoke_resume_chain(resume_text, resume_id, filled)
+            parsed_data = parsed_data.model_copy(update={field: rules.values[field] for field in filled})
+            rule_stats.record(filled, skipped_llm=False)
     except OutputParserException as e:
         # Check if the error is due to null name (indicating non-resume)
         error_str = str(e)
@@ -170,6 +285,7 @@ Extract all relevant information following the specified format. Handle missing
             "Please upload a valid resume document."
         )
 
+    summary_started = time.perf_counter()
     # Handle partial data gracefully - provide defaults for missing fields
     name = parsed_data.name.strip() if parsed_data.name else "Name not provided"
     current_role = parsed_data.currentRole.strip() if parsed_data.currentRole else "Not specified"
@@ -246,4 +362,5 @@ Extract all relevant information following the specified format. Handle missing
                 "Please ensure the resume contains valid information."
             )
 
+    observe_stage("summary", time.perf_counter() - summary_started)
     return summary
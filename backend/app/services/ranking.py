@@ -0,0 +1,354 @@
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from app.models.schemas import ResumeSummary
+from app.services.search import normalize_skill
+from app.services.storage import storage
+
+
+RANKING_HASH_BITS = int(os.getenv("RANKING_HASH_BITS", "18"))
+RANKING_MAX_TEXT_CHARS = int(os.getenv("RANKING_MAX_TEXT_CHARS", "20000"))
+
+# Field weights applied to term counts before sublinear scaling
+SKILL_WEIGHT = 3.0
+ROLE_WEIGHT = 2.0
+# Query terms found in more than this share of resumes carry little signal and are skipped
+MAX_DF_RATIO = 0.5
+MIN_DOCS_FOR_DF_CUTOFF = 50
+# Fresh rows are folded into the column-sorted segment once they exceed this share of it
+RESEAL_RATIO = 0.1
+RESEAL_MIN_ROWS = 1000
+# Deleted rows are dropped from the arrays once they make up this share of them
+COMPACT_DEAD_RATIO = 0.25
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to was we were "
+    "will with you your".split()
+)
+# Keeps "c++", "c#", "node.js" and "ci/cd"-style parts intact, without trailing dots
+_WORD = re.compile(r"[a-z0-9](?:[a-z0-9+#.]*[a-z0-9+#])?")
+
+
+def _words(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return [word for word in _WORD.findall(text.casefold()) if word not in STOP_WORDS]
+
+
+def document_terms(summary: ResumeSummary, raw_text: str | None) -> Counter:
+    """Weighted term counts of a parsed resume: skills, role, summary and extracted text"""
+    counts: Counter = Counter()
+    for skill in summary.skills:
+        # Whole-skill features let "machine learning" match as a phrase, not just as two words
+        counts["skill:" + normalize_skill(skill)] += SKILL_WEIGHT
+        for word in _words(skill):
+            counts[word] += SKILL_WEIGHT
+    for word in _words(summary.currentRole):
+        counts[word] += ROLE_WEIGHT
+    counts.update(_words(summary.summary))
+    counts.update(_words((raw_text or "")[:RANKING_MAX_TEXT_CHARS]))
+    return counts
+
+
+def query_terms(text: str) -> Counter:
+    """Term counts of a job description, with single words and word pairs as candidate skills"""
+    words = _words(text[:RANKING_MAX_TEXT_CHARS])
+    counts = Counter(words)
+    for word in words:
+        counts["skill:" + normalize_skill(word)] += 1
+    for first, second in zip(words, words[1:]):
+        counts["skill:" + normalize_skill(f"{first} {second}")] += 1
+    return counts
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Return array with room for at least size items, doubling to amortize appends"""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+@dataclass
+class RankResult:
+    ids: list[str]
+    scores: list[float]
+    candidates: int
+
+
+class RankingIndex:
+    """Hashed-feature TF-IDF matrix over parsed resumes for job-description matching.
+
+    Rows are appended in CSR form as summaries are stored. Rows up to
+    _sealed_rows are also kept column-sorted (CSC), so ranking only touches
+    the postings of the query's terms; rows added since are scored with one
+    vectorized pass and folded in once there are enough of them. IDF is
+    applied at query time from live document frequencies.
+
+    Storage listeners run on the event loop, so they only queue changes
+    (deque appends need no lock). rank() applies them under the lock in its
+    worker thread, and the event loop never waits on a reseal.
+    """
+
+    def __init__(
+        self,
+        text_source: Callable[[str], str | None] = lambda resume_id: None,
+        hash_bits: int = RANKING_HASH_BITS
+    ):
+        self.text_source = text_source
+        self.n_features = 1 << hash_bits
+        self._mask = self.n_features - 1
+        self._lock = threading.RLock()
+        self._df = np.zeros(self.n_features, dtype=np.int32)
+
+        # Row-major store: row i owns _cols/_vals[_indptr[i]:_indptr[i + 1]]
+        self._indptr = np.zeros(1025, dtype=np.int64)
+        self._cols = np.zeros(1 << 16, dtype=np.int32)
+        self._vals = np.zeros(1 << 16, dtype=np.float32)
+        self._alive = np.zeros(1024, dtype=bool)
+        self._norms = np.ones(1024, dtype=np.float32)
+        self._row_ids: list[str] = []
+        self._rows: dict[str, int] = {}  # resume_id -> live row
+        self._dead = 0
+        # Changes not applied yet: (resume_id, cols, vals), with cols None for a removal
+        self._pending: deque[tuple[str, np.ndarray | None, np.ndarray | None]] = deque()
+        self._last_snapshot: dict = {}
+
+        # Column-sorted copy of rows [0, _sealed_rows)
+        self._sealed_rows = 0
+        self._csc_indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        self._csc_rows = np.zeros(0, dtype=np.int32)
+        self._csc_vals = np.zeros(0, dtype=np.float32)
+
+        self.queries = 0
+        self.total_query_seconds = 0.0
+        self.reseals = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def vectorize(self, counts: Counter) -> tuple[np.ndarray, np.ndarray]:
+        """Hash weighted term counts into (feature, sublinear tf) arrays"""
+        hashes = np.fromiter(
+            (zlib.crc32(term.encode("utf-8")) for term in counts), dtype=np.uint32, count=len(counts)
+        )
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        # Terms that collide on a feature add up
+        cols, inverse = np.unique((hashes & self._mask).astype(np.int32), return_inverse=True)
+        vals = 1 + np.log(np.bincount(inverse, weights=weights))
+        return cols, vals.astype(np.float32)
+
+    def on_summary(self, resume_id: str, summary: ResumeSummary) -> None:
+        """Queue the row of a completed summary, replacing any previous one"""
+        cols, vals = self.vectorize(document_terms(summary, self.text_source(resume_id)))
+        self.add(resume_id, cols, vals)
+
+    def on_remove(self, resume_id: str) -> None:
+        """Queue the removal of a resume's row"""
+        self._pending.append((resume_id, None, None))
+
+    def add(self, resume_id: str, cols: np.ndarray, vals: np.ndarray) -> None:
+        """Queue a vectorized document as a new row"""
+        self._pending.append((resume_id, cols, vals))
+
+    def rebuild(self, summaries: Iterable[tuple[str, ResumeSummary]]) -> None:
+        """Index every stored summary, e.g. at startup with a persistent backend"""
+        for resume_id, summary in summaries:
+            self.on_summary(resume_id, summary)
+        with self._lock:
+            self._apply_pending()
+            self._reseal()
+
+    def flush(self) -> None:
+        """Apply queued changes now instead of on the next rank()"""
+        with self._lock:
+            self._apply_pending()
+
+    def _apply_pending(self) -> None:
+        while self._pending:
+            resume_id, cols, vals = self._pending.popleft()
+            self._remove_row(resume_id)
+            if cols is not None:
+                self._append_row(resume_id, cols, vals)
+
+    def _remove_row(self, resume_id: str) -> None:
+        row = self._rows.pop(resume_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        self._df[self._cols[self._indptr[row]:self._indptr[row + 1]]] -= 1
+        self._dead += 1
+        if self._dead >= RESEAL_MIN_ROWS and self._dead > COMPACT_DEAD_RATIO * len(self._row_ids):
+            self._compact()
+
+    def _append_row(self, resume_id: str, cols: np.ndarray, vals: np.ndarray) -> None:
+        row = len(self._row_ids)
+        start = int(self._indptr[row])
+        end = start + len(cols)
+
+        self._indptr = _grow(self._indptr, row + 2)
+        self._cols = _grow(self._cols, end)
+        self._vals = _grow(self._vals, end)
+        self._alive = _grow(self._alive, row + 1)
+        self._norms = _grow(self._norms, row + 1)
+
+        self._cols[start:end] = cols
+        self._vals[start:end] = vals
+        self._indptr[row + 1] = end
+        self._df[cols] += 1
+        self._alive[row] = True
+        self._row_ids.append(resume_id)
+        self._rows[resume_id] = row
+
+    def rank(self, text: str, limit: int = 20) -> RankResult:
+        """Top resumes by cosine similarity of TF-IDF vectors with the given text"""
+        started = time.perf_counter()
+        cols, vals = self.vectorize(query_terms(text))
+
+        with self._lock:
+            self._apply_pending()
+            n_rows = len(self._row_ids)
+            fresh = n_rows - self._sealed_rows
+            if fresh > max(RESEAL_MIN_ROWS, RESEAL_RATIO * self._sealed_rows):
+                self._reseal()
+
+            n_docs = len(self._rows)
+            df = self._df[cols]
+            keep = df > 0
+            if n_docs >= MIN_DOCS_FOR_DF_CUTOFF:
+                keep &= df <= MAX_DF_RATIO * n_docs
+            cols = cols[keep]
+            if not n_docs or not len(cols):
+                return RankResult(ids=[], scores=[], candidates=n_docs)
+
+            idf = self._idf(cols)
+            weights = vals[keep] * idf
+            # Query weight times document idf, so a dot product with tf rows gives tf-idf . tf-idf
+            weights = (weights / np.linalg.norm(weights) * idf).astype(np.float32)
+
+            scores = self._score_sealed(cols, weights, n_rows) + self._score_fresh(cols, weights, n_rows)
+            scores /= self._norms[:n_rows]
+            scores[~self._alive[:n_rows]] = 0
+
+            matched = int(np.count_nonzero(scores))
+            k = min(limit, matched)
+            top = np.argpartition(-scores, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            ids = [self._row_ids[row] for row in top]
+            result = RankResult(ids=ids, scores=[round(float(scores[row]), 4) for row in top], candidates=n_docs)
+
+            self.queries += 1
+            self.total_query_seconds += time.perf_counter() - started
+            return result
+
+    def _idf(self, cols: np.ndarray) -> np.ndarray:
+        n_docs = len(self._rows)
+        return (np.log((1 + n_docs) / (1 + self._df[cols])) + 1).astype(np.float32)
+
+    def _score_sealed(self, cols: np.ndarray, weights: np.ndarray, n_rows: int) -> np.ndarray:
+        """Sparse dot product over the postings of the query's columns only"""
+        starts = self._csc_indptr[cols]
+        lengths = self._csc_indptr[cols + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(n_rows, dtype=np.float32)
+        # Concatenate the column ranges [start, start + length) without a Python loop
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+        contributions = self._csc_vals[positions] * np.repeat(weights, lengths)
+        return np.bincount(self._csc_rows[positions], weights=contributions, minlength=n_rows).astype(np.float32)
+
+    def _score_fresh(self, cols: np.ndarray, weights: np.ndarray, n_rows: int) -> np.ndarray:
+        """Dot product of the not-yet-sealed rows with the query, one pass over their entries"""
+        start, end = int(self._indptr[self._sealed_rows]), int(self._indptr[n_rows])
+        if start == end:
+            return np.zeros(n_rows, dtype=np.float32)
+        order = np.argsort(cols)
+        sorted_cols, sorted_weights = cols[order], weights[order]
+        row_cols = self._cols[start:end]
+        positions = np.minimum(np.searchsorted(sorted_cols, row_cols), len(sorted_cols) - 1)
+        contributions = np.where(sorted_cols[positions] == row_cols, sorted_weights[positions], 0) * self._vals[start:end]
+        rows = np.repeat(
+            np.arange(self._sealed_rows, n_rows), np.diff(self._indptr[self._sealed_rows:n_rows + 1])
+        )
+        # IDF moves a lot while the index is small, so fresh norms are always taken from current counts
+        norms = np.sqrt(np.bincount(rows, weights=(self._vals[start:end] * self._idf(row_cols)) ** 2, minlength=n_rows))
+        norms = norms[self._sealed_rows:]
+        norms[norms == 0] = 1.0
+        self._norms[self._sealed_rows:n_rows] = norms
+        return np.bincount(rows, weights=contributions, minlength=n_rows).astype(np.float32)
+
+    def _reseal(self) -> None:
+        """Rebuild the column-sorted segment from every live row and refresh the norms"""
+        n_rows = len(self._row_ids)
+        nnz = int(self._indptr[n_rows])
+        rows = np.repeat(np.arange(n_rows, dtype=np.int32), np.diff(self._indptr[:n_rows + 1]))
+        cols, vals = self._cols[:nnz], self._vals[:nnz]
+        live = self._alive[rows]
+        rows, cols, vals = rows[live], cols[live], vals[live]
+
+        order = np.argsort(cols, kind="stable")
+        self._csc_rows = rows[order]
+        self._csc_vals = vals[order]
+        self._csc_indptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=self.n_features), out=self._csc_indptr[1:])
+
+        # Document frequencies have moved since rows were added; recompute norms with current IDF
+        norms = np.sqrt(np.bincount(rows, weights=(vals * self._idf(cols)) ** 2, minlength=n_rows))
+        norms[norms == 0] = 1.0
+        self._norms[:n_rows] = norms
+        self._sealed_rows = n_rows
+        self.reseals += 1
+
+    def _compact(self) -> None:
+        """Drop deleted rows from the row-major arrays and renumber the live ones"""
+        n_rows = len(self._row_ids)
+        live_rows = np.flatnonzero(self._alive[:n_rows])
+        lengths = (self._indptr[live_rows + 1] - self._indptr[live_rows])
+        starts = self._indptr[live_rows]
+        total = int(lengths.sum())
+        positions = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+
+        self._cols = self._cols[positions].copy()
+        self._vals = self._vals[positions].copy()
+        self._indptr = np.zeros(len(live_rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._indptr[1:])
+        self._norms = self._norms[live_rows].copy()
+        self._alive = np.ones(len(live_rows), dtype=bool)
+        self._row_ids = [self._row_ids[row] for row in live_rows]
+        self._rows = {resume_id: row for row, resume_id in enumerate(self._row_ids)}
+        self._dead = 0
+        self._reseal()
+
+    def snapshot(self) -> dict:
+        """Index stats; while a query holds the lock, the last ones taken (called from the event loop)"""
+        if self._lock.acquire(blocking=False):
+            try:
+                n_rows = len(self._row_ids)
+                self._last_snapshot = {
+                    "documents": len(self._rows),
+                    "features": self.n_features,
+                    "nonZeros": int(self._indptr[n_rows]),
+                    "sealedRows": self._sealed_rows,
+                    "freshRows": n_rows - self._sealed_rows,
+                    "deadRows": self._dead,
+                    "reseals": self.reseals,
+                    "queries": self.queries,
+                    "avgQueryMs": round(self.total_query_seconds * 1000 / self.queries, 3) if self.queries else 0.0,
+                }
+            finally:
+                self._lock.release()
+        return {**self._last_snapshot, "pendingChanges": len(self._pending)}
+
+
+# Singleton instance
+ranking_index = RankingIndex(text_source=storage.get_raw_text)
+storage.add_listener(ranking_index)
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+
+from app.services.events import progress_muted
+from app.services.jobs import PARSE_JOB_TIMEOUT, classify_parse_error, job_queue, prepare_llm_text
+from app.services.long_resume import is_long_document, split_long_resume
+from app.services.metrics import current_file_type, file_type_of, metrics, record_error, timed
+from app.services.scheduler import estimate_tokens
+from app.services.storage import storage
+
+
+REPARSE_ENABLED = os.getenv("REPARSE_ENABLED", "false").lower() == "true"
+REPARSE_TOKENS_PER_HOUR = int(os.getenv("REPARSE_TOKENS_PER_HOUR", "200000"))
+REPARSE_INTERVAL = float(os.getenv("REPARSE_INTERVAL", "2"))
+REPARSE_MAX_ATTEMPTS = int(os.getenv("REPARSE_MAX_ATTEMPTS", "3"))
+# How long a worker holds a resume it is re-parsing; must cover compaction plus PARSE_JOB_TIMEOUT
+REPARSE_LEASE_SECONDS = float(os.getenv("REPARSE_LEASE_SECONDS", "300"))
+
+# Seconds to wait before looking again when nothing is outdated or uploads are queued
+REPARSE_IDLE_SECONDS = 30
+REPARSE_BUSY_SECONDS = 1
+BUDGET_WINDOW_SECONDS = 3600
+
+
+@dataclass
+class ReparseStats:
+    outdated: int = 0
+    upgraded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    gave_up: int = 0
+    tokens: int = 0
+    budget_waits: int = 0
+
+
+class SpendWindow:
+    """Estimated LLM tokens spent over the last hour, for a hard hourly cap.
+
+    The spend is kept in storage, so workers sharing a SQLite database share one cap;
+    the cap itself is applied here.
+    """
+
+    def __init__(self, tokens_per_hour: int, window: float = BUDGET_WINDOW_SECONDS):
+        self.tokens_per_hour = max(1, tokens_per_hour)
+        self.window = window
+
+    @property
+    def spent(self) -> int:
+        return storage.reparse_tokens_spent(self.window)
+
+    def reserve(self, tokens: int) -> float:
+        """Record tokens if they fit under the cap, otherwise return seconds until they do"""
+        return storage.reserve_reparse_tokens(
+            tokens, self.window, lambda spent, now: self.wait_time(spent, tokens, now)
+        )
+
+    def wait_time(self, spent: list[tuple[float, int]], tokens: int, now: float) -> float:
+        """Seconds until tokens fit under the cap, given the (time, tokens) spent in the window, oldest first.
+
+        A lone spend larger than the cap fits once the window is empty.
+        """
+        excess = sum(amount for _, amount in spent) + tokens - self.tokens_per_hour
+        if excess <= 0 or not spent:
+            return 0.0
+        freed = 0
+        for spent_at, amount in spent:
+            freed += amount
+            if freed >= excess:
+                return max(0.0, spent_at + self.window - now)
+        return max(0.0, spent[-1][0] + self.window - now)
+
+
+class ReparseJob:
+    """Background upgrade of summaries produced by an older parse version.
+
+    Outdated summaries keep being served until their replacement is stored.
+    Resumes are re-parsed oldest first, one at a time, spaced by interval,
+    only while no uploads are waiting for a parse worker, and within an
+    hourly budget of estimated LLM tokens. Progress lives in storage (each
+    summary records its parse version), so after a restart the job resumes
+    with whatever is still outdated. Workers sharing a SQLite database
+    lease each resume before re-parsing it and share the token budget and
+    the failure counts, so every resume is re-parsed once.
+    """
+
+    def __init__(
+        self,
+        parse_version: str | None = None,
+        tokens_per_hour: int = REPARSE_TOKENS_PER_HOUR,
+        interval: float = REPARSE_INTERVAL,
+        max_attempts: int = REPARSE_MAX_ATTEMPTS,
+    ):
+        self._parse_version = parse_version
+        self.interval = interval
+        self.max_attempts = max(1, max_attempts)
+        self.budget = SpendWindow(tokens_per_hour)
+        self.stats = ReparseStats()
+        self.paused = False
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"  # lease holder name of this worker
+        self._task: asyncio.Task | None = None
+
+    @property
+    def parse_version(self) -> str:
+        """Version to upgrade to, by default the current one (importing the parser loads the LLM stack)"""
+        if self._parse_version is None:
+            from app.services.parser import PARSE_VERSION
+            self._parse_version = PARSE_VERSION
+        return self._parse_version
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="reparse")
+
+    async def stop(self) -> None:
+        """Cancel the job; a re-parse in progress is dropped and redone after a restart"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def outdated(self) -> list[str]:
+        """Ids still to upgrade, excluding those that failed too often"""
+        return list(storage.iter_outdated(self.parse_version, self.max_attempts))
+
+    async def upgrade(self, resume_id: str) -> bool:
+        """Re-parse one resume and store the new summary; returns True if it was upgraded"""
+        from app.services.parser import parse_resume
+
+        record = storage.get_resume(resume_id)
+        if not record or record["status"] != "completed" or record["parseVersion"] == self.parse_version:
+            self.stats.skipped += 1
+            return False
+        if not self._claim(resume_id):
+            # Another worker is on it
+            return False
+
+        failed_version = None
+        try:
+            text_content = storage.get_raw_text(resume_id)
+            if not text_content:
+                self.stats.skipped += 1
+                return False
+            current_file_type.set(file_type_of(record["fileName"]))
+            llm_text = await asyncio.wait_for(prepare_llm_text(text_content), timeout=PARSE_JOB_TIMEOUT)
+            tokens = self._estimate_tokens(llm_text)
+            while True:
+                wait = self.budget.reserve(tokens)
+                if wait <= 0:
+                    break
+                self.stats.budget_waits += 1
+                # Don't sit on the lease through the wait
+                storage.release_reparse(resume_id, self.owner)
+                await asyncio.sleep(wait)
+                if not self._claim(resume_id):
+                    return False
+            self.stats.tokens += tokens
+
+            try:
+                with timed("reparse"):
+                    summary = await asyncio.wait_for(parse_resume(llm_text, resume_id), timeout=PARSE_JOB_TIMEOUT)
+            except Exception as e:
+                status_code, _ = classify_parse_error(e)
+                record_error("reparse", status_code, e)
+                self.stats.failed += 1
+                failed_version = self.parse_version
+                return False
+
+            # The resume may have been deleted or replaced by a new upload while the LLM was busy
+            current = storage.get_resume(resume_id)
+            if not current or current["status"] != "completed" or current["uploadDate"] != record["uploadDate"]:
+                self.stats.skipped += 1
+                return False
+            storage.update_summary(resume_id, summary, status="completed", parse_version=self.parse_version)
+            self.stats.upgraded += 1
+            return True
+        except Exception:
+            failed_version = self.parse_version
+            raise
+        finally:
+            failures = storage.release_reparse(resume_id, self.owner, failed_version)
+            if failed_version is not None and failures >= self.max_attempts:
+                self.stats.gave_up += 1
+                print(f"Warning: Giving up re-parsing resume {resume_id} after {failures} failed attempts")
+
+    def snapshot(self) -> dict:
+        """Progress of the upgrade to the current parse version"""
+        return {
+            "enabled": REPARSE_ENABLED,
+            "running": self.running,
+            "paused": self.paused,
+            "parseVersion": self._parse_version,
+            "outdated": self.stats.outdated,
+            "upgraded": self.stats.upgraded,
+            "failed": self.stats.failed,
+            "skipped": self.stats.skipped,
+            "gaveUp": self.stats.gave_up,
+            "tokensSpent": self.stats.tokens,
+            "tokensLastHour": self.budget.spent,
+            "tokensPerHour": self.budget.tokens_per_hour,
+            "budgetWaits": self.stats.budget_waits,
+        }
+
+    def _claim(self, resume_id: str) -> bool:
+        return storage.claim_reparse(
+            resume_id, self.parse_version, self.owner, REPARSE_LEASE_SECONDS, max_failures=self.max_attempts
+        )
+
+    def _estimate_tokens(self, llm_text: str) -> int:
+        """Same estimate the LLM scheduler budgets with, once per chunk for long resumes"""
+        from app.services.parser import RESUME_COMPLETION_TOKENS, RESUME_PROMPT_TOKENS
+
+        calls = len(split_long_resume(llm_text)) if is_long_document(llm_text) else 1
+        return estimate_tokens(llm_text) + calls * (RESUME_PROMPT_TOKENS + RESUME_COMPLETION_TOKENS)
+
+    async def _run(self) -> None:
+        # Summaries change in place; nobody is following their progress
+        progress_muted.set(True)
+        while True:
+            pending = self.outdated()
+            self.stats.outdated = len(pending)
+            if not pending:
+                await asyncio.sleep(REPARSE_IDLE_SECONDS)
+                continue
+            for resume_id in pending:
+                # Uploads waiting for a parse worker come first
+                while self.paused or job_queue.depth > 0:
+                    await asyncio.sleep(REPARSE_BUSY_SECONDS)
+                try:
+                    await self.upgrade(resume_id)
+                except Exception as e:
+                    print(f"Warning: Re-parse of resume {resume_id} failed: {str(e)}")
+                self.stats.outdated = max(0, self.stats.outdated - 1)
+                await asyncio.sleep(self.interval)
+
+
+# Singleton instance
+reparse_job = ReparseJob()
+
+metrics.callback("gridrez_reparse_outdated", "Summaries still produced by an older parse version",
+                 lambda: reparse_job.stats.outdated)
+metrics.callback(
+    "gridrez_reparse_total", "Background re-parses by result",
+    lambda: {
+        ("upgraded",): reparse_job.stats.upgraded,
+        ("failed",): reparse_job.stats.failed,
+        ("skipped",): reparse_job.stats.skipped,
+    },
+    ("result",), kind="counter"
+)
+metrics.callback("gridrez_reparse_tokens_total", "Estimated LLM tokens spent on re-parses",
+                 lambda: reparse_job.stats.tokens, kind="counter")
@@ -0,0 +1,363 @@
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+
+from app.models.schemas import Education, ParsedResumeData, SocialHandles
+
+
+RULES_ENABLED = os.getenv("RULES_ENABLED", "true").lower() == "true"
+RULES_MIN_CONFIDENCE = float(os.getenv("RULES_MIN_CONFIDENCE", "0.85"))
+RULES_SKIP_LLM = os.getenv("RULES_SKIP_LLM", "false").lower() == "true"
+
+# Fields rules find reliably; role, experience years, skills, summary, education and location
+# are heuristic guesses and only replace the LLM's answer when listed in RULES_FIELDS
+DETERMINISTIC_FIELDS = ("name", "email", "phone", "socialHandles")
+RULES_FIELDS = frozenset(
+    name.strip() for name in os.getenv("RULES_FIELDS", ",".join(DETERMINISTIC_FIELDS)).split(",") if name.strip()
+)
+
+_unknown_fields = RULES_FIELDS - set(ParsedResumeData.model_fields)
+if _unknown_fields:
+    raise ValueError(
+        f"Invalid RULES_FIELDS: {', '.join(sorted(_unknown_fields))}. "
+        f"Use fields of the summary: {', '.join(ParsedResumeData.model_fields)}"
+    )
+
+
+EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+# 8-15 digits with the usual separators, optionally with a leading + or (
+PHONE = re.compile(r"(?<![\w+])(?:\+|\()?\d[\d \t().-]{6,18}\d(?!\w)")
+LINKEDIN = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/(?:in|pub)/[\w%-]+/?", re.IGNORECASE)
+GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})/?(?![\w/])", re.IGNORECASE)
+TWITTER = re.compile(r"(?:https?://)?(?:www\.)?(?:twitter|x)\.com/\w{1,15}/?(?![\w/])", re.IGNORECASE)
+_YEAR_RANGE = re.compile(r"\d{4}\s*[-–]\s*\d{4}")
+
+
+def find_email(text: str) -> str | None:
+    match = EMAIL.search(text)
+    return match.group(0) if match else None
+
+
+def _is_phone(candidate: str) -> bool:
+    digits = sum(char.isdigit() for char in candidate)
+    # Skip date ranges such as 2019 - 2021
+    return 8 <= digits <= 15 and not _YEAR_RANGE.fullmatch(candidate.strip())
+
+
+def find_phone(text: str) -> str | None:
+    for match in PHONE.finditer(text):
+        if _is_phone(match.group(0)):
+            return match.group(0).strip()
+    return None
+
+
+def _find_url(pattern: re.Pattern, text: str) -> str | None:
+    match = pattern.search(text)
+    return match.group(0).rstrip("/") if match else None
+
+
+def mask_contacts(text: str) -> str:
+    """Text with emails, phone numbers and profile links replaced by a placeholder"""
+    for pattern in (LINKEDIN, GITHUB, TWITTER, EMAIL):
+        text = pattern.sub(" contact ", text)
+    return PHONE.sub(lambda match: " contact " if _is_phone(match.group(0)) else match.group(0), text)
+
+
+def extract_contacts(text: str) -> dict:
+    """Email, phone and social profile links found in resume text"""
+    return {
+        "email": find_email(text),
+        "phone": find_phone(text),
+        "linkedin": _find_url(LINKEDIN, text),
+        "github": _find_url(GITHUB, text),
+        "twitter": _find_url(TWITTER, text),
+    }
+
+
+def rederive_contacts(summary_fields: dict, text: str) -> dict:
+    """Contact fields of a summary refreshed from new text.
+
+    A value found in the text wins; otherwise the previous value is kept only
+    if it still appears in the text.
+    """
+    found = extract_contacts(text)
+    folded = text.casefold()
+
+    def pick(new: str | None, old: str | None) -> str | None:
+        if new:
+            return new
+        return old if old and old.casefold() in folded else None
+
+    handles = summary_fields.get("socialHandles") or {}
+    social = SocialHandles(
+        linkedin=pick(found["linkedin"], handles.get("linkedin")),
+        github=pick(found["github"], handles.get("github")),
+        twitter=pick(found["twitter"], handles.get("twitter")),
+        portfolio=pick(None, handles.get("portfolio")),
+        other=[handle for handle in handles.get("other") or [] if handle.casefold() in folded],
+    )
+    return {
+        "email": pick(found["email"], summary_fields.get("email")),
+        "phone": pick(found["phone"], summary_fields.get("phone")),
+        "socialHandles": social if any(social.model_dump().values()) else None,
+    }
+
+
+# --- Tier-0 field extraction -------------------------------------------------
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "about", "about me",
+                "objective", "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "career history"),
+    "education": ("education", "academic background", "education and training", "qualifications"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "technologies", "tech stack", "skills and technologies"),
+    "other": ("projects", "certifications", "certificates", "languages", "interests", "hobbies", "awards",
+              "publications", "references", "volunteering", "courses", "achievements"),
+}
+_HEADINGS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+ROLE_WORDS = frozenset(
+    "engineer developer manager scientist designer analyst consultant architect lead director administrator "
+    "specialist officer programmer researcher intern head vp president accountant coordinator executive "
+    "technician nurse teacher lecturer professor owner founder cto ceo cfo".split()
+)
+DEGREE = re.compile(
+    r"\b(?:bachelor|master|doctor|ph\.?\s?d|mba|b\.?\s?sc|m\.?\s?sc|b\.?\s?s|m\.?\s?s|b\.?\s?a|m\.?\s?a|"
+    r"b\.?\s?eng|m\.?\s?eng|b\.?\s?tech|m\.?\s?tech|diploma|associate|abitur|licen[cs]e)\b",
+    re.IGNORECASE
+)
+INSTITUTION = re.compile(r"\b(?:university|universit[äa]t|college|institute|school|academy|polytechnic|hochschule|tu|eth)\b", re.IGNORECASE)
+YEAR = re.compile(r"\b(19[5-9]\d|20\d{2})\b")
+DATE_RANGE = re.compile(
+    r"\b(19[5-9]\d|20\d{2})\b[^\n\d]{0,12}?[-–—to]+\s*(?:[A-Za-z]{3,9}\.?\s+)?(19[5-9]\d|20\d{2}|present|current|now|today)\b",
+    re.IGNORECASE
+)
+NAME = re.compile(r"^(?:[A-Z][a-zA-Z'’-]+|[A-Z]\.)(?:\s+(?:[A-Z][a-zA-Z'’-]+|[A-Z]\.)){1,3}$")
+LOCATION = re.compile(r"^[A-Z][A-Za-zÀ-ÿ .'-]+,\s*[A-Z][A-Za-zÀ-ÿ .'-]+(?:,\s*[A-Z][A-Za-zÀ-ÿ .'-]+)?$")
+URL = re.compile(r"(?:https?://|www\.)[^\s|,;]+", re.IGNORECASE)
+_ITEM_SEPARATORS = re.compile(r"[,;|•·▪●]")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Header lines scanned for name, role, location and contact details
+HEADER_LINES = 8
+
+
+@dataclass
+class RuleExtraction:
+    """Field values pulled out by rules, each with a confidence between 0 and 1"""
+    values: dict = field(default_factory=dict)
+    confidence: dict[str, float] = field(default_factory=dict)
+
+    def add(self, name: str, value, confidence: float) -> None:
+        self.values[name] = value
+        self.confidence[name] = confidence
+
+    def confident(
+        self,
+        min_confidence: float = RULES_MIN_CONFIDENCE,
+        fields: frozenset[str] = RULES_FIELDS
+    ) -> set[str]:
+        """Fields allowed to be filled by rules whose confidence reaches min_confidence"""
+        return {name for name, score in self.confidence.items() if name in fields and score >= min_confidence}
+
+    def covers_all(self, min_confidence: float = RULES_MIN_CONFIDENCE, fields: frozenset[str] = RULES_FIELDS) -> bool:
+        """True if every ParsedResumeData field is confidently known"""
+        return set(ParsedResumeData.model_fields) <= self.confident(min_confidence, fields)
+
+
+def section_heading(line: str) -> str | None:
+    """Section name (summary, experience, education, skills or other) if the line is a section heading"""
+    line = line.strip()
+    key = re.sub(r"[^a-z ]", "", line.casefold()).strip()
+    if len(line) > 40 or not key:
+        return None
+    return _HEADINGS.get(key)
+
+
+def split_sections(lines: list[str]) -> dict[str, list[str]]:
+    """Group non-empty lines under their section heading; lines before the first heading go to "header\""""
+    sections: dict[str, list[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        section = section_heading(line)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        elif line:
+            sections.setdefault(current, []).append(line)
+    return sections
+
+
+def _header_parts(header: list[str]) -> list[str]:
+    """Header lines split at the usual contact-line separators"""
+    return [part.strip() for line in header[:HEADER_LINES] for part in re.split(r"\s[|•·]\s|\t", line) if part.strip()]
+
+
+def _extract_name(parts: list[str], email: str | None, result: RuleExtraction) -> None:
+    for index, part in enumerate(parts[:3]):
+        candidate = part.title() if part.isupper() else part
+        words = candidate.split()
+        if NAME.match(candidate) and not section_heading(candidate) and not ROLE_WORDS & {w.casefold() for w in words}:
+            confidence = 0.9 if index == 0 else 0.8
+            local_part = (email or "").split("@")[0].casefold()
+            if any(len(word) > 2 and word.casefold() in local_part for word in words):
+                confidence = 0.95
+            result.add("name", candidate, confidence)
+            return
+
+
+def _role_part(line: str) -> str | None:
+    """The part of a line that reads like a job title"""
+    for part in re.split(r"\s+(?:at|@)\s+|\s[-–—|,]\s|,\s", line):
+        words = {word.casefold().strip(".,()") for word in part.split()}
+        if ROLE_WORDS & words and len(part) <= 60 and not YEAR.search(part):
+            return part.strip()
+    return None
+
+
+def _extract_role(parts: list[str], experience: list[str], result: RuleExtraction) -> None:
+    for part in parts[1:4]:
+        role = _role_part(part)
+        if role:
+            result.add("currentRole", role, 0.85)
+            return
+    for line in experience[:3]:
+        role = _role_part(line)
+        if role:
+            result.add("currentRole", role, 0.85)
+            return
+
+
+def _extract_experience_years(experience: list[str], result: RuleExtraction) -> None:
+    today = date.today().year
+    starts, ends = [], []
+    for match in DATE_RANGE.finditer("\n".join(experience)):
+        start, end = match.group(1), match.group(2)
+        starts.append(int(start))
+        ends.append(int(end) if end.isdigit() else today)
+    if starts:
+        years = max(0, min(max(ends), today) - min(starts))
+        result.add("experienceYears", years, 0.85 if len(starts) > 1 else 0.75)
+
+
+def _extract_skills(skills: list[str], result: RuleExtraction) -> None:
+    items: list[str] = []
+    for line in skills:
+        # "Languages: Python, Go" - drop the label
+        if ":" in line and len(line.split(":", 1)[0]) <= 30:
+            line = line.split(":", 1)[1]
+        items += [item.strip(" .-*") for item in _ITEM_SEPARATORS.split(line)]
+    unique = list(dict.fromkeys(item for item in items if 0 < len(item) <= 40))
+    if unique:
+        result.add("skills", unique, 0.9 if len(unique) >= 3 else 0.7)
+
+
+def _extract_summary(summary: list[str], result: RuleExtraction) -> None:
+    text = " ".join(summary).strip()
+    if len(text) >= 40:
+        sentences = _SENTENCE_END.split(text)
+        result.add("summary", " ".join(sentences[:3]), 0.9)
+
+
+def _extract_education(education: list[str], result: RuleExtraction) -> None:
+    entries, complete = [], True
+    for index, line in enumerate(education):
+        if not DEGREE.search(line):
+            continue
+        parts = [part.strip() for part in re.split(r"\s[-–—|]\s|,\s|\s+at\s+", line) if part.strip()]
+        degree = next((part for part in parts if DEGREE.search(part)), line)
+        institution = next((part for part in parts if INSTITUTION.search(part)), None)
+        following = education[index + 1] if index + 1 < len(education) else ""
+        if institution is None and INSTITUTION.search(following) and not DEGREE.search(following):
+            institution = YEAR.sub("", following).strip(" ,-–|")
+        years = YEAR.findall(line) or YEAR.findall(following)
+        if institution is None:
+            complete = False
+            continue
+        entries.append(Education(
+            degree=YEAR.sub("", degree).strip(" ,-–|()"),
+            institution=YEAR.sub("", institution).strip(" ,-–|()"),
+            graduationYear=int(years[-1]) if years else None
+        ))
+    if entries:
+        result.add("education", entries, 0.85 if complete else 0.6)
+
+
+def _extract_location(parts: list[str], name: str | None, result: RuleExtraction) -> None:
+    for part in parts[1:]:
+        if part != name and LOCATION.match(part) and len(part) <= 50 and not _role_part(part):
+            result.add("location", part, 0.85)
+            return
+
+
+def _extract_social(text: str, contacts: dict, result: RuleExtraction) -> None:
+    profiles = {key: contacts[key] for key in ("linkedin", "github", "twitter") if contacts[key]}
+    other_urls = [
+        url.rstrip("/.") for url in URL.findall(text)
+        if not any(domain in url.casefold() for domain in ("linkedin.com", "github.com", "twitter.com", "x.com"))
+    ]
+    portfolio = other_urls[0] if len(other_urls) == 1 else None
+    handles = SocialHandles(**profiles, portfolio=portfolio)
+    if not profiles and not other_urls:
+        # No links at all; an @handle may still be a Twitter account
+        result.add("socialHandles", None, 0.5 if re.search(r"(?<!\w)@\w{2,15}\b", text) else 0.9)
+    else:
+        result.add("socialHandles", handles, 0.9 if len(other_urls) <= 1 else 0.6)
+
+
+def extract_fields(text: str) -> RuleExtraction:
+    """Pull contact details, name, role, sections and education out of resume text with rules"""
+    lines = [line.strip() for line in text.replace("\r", "\n").split("\n")]
+    sections = split_sections(lines)
+    parts = _header_parts(sections["header"])
+    result = RuleExtraction()
+
+    contacts = extract_contacts(text)
+    emails = set(EMAIL.findall(text))
+    result.add("email", contacts["email"], 0.99 if len(emails) == 1 else (0.95 if not emails else 0.7))
+    if contacts["phone"]:
+        header_text = "\n".join(sections["header"][:HEADER_LINES])
+        result.add("phone", contacts["phone"], 0.95 if contacts["phone"] in header_text else 0.75)
+    else:
+        result.add("phone", None, 0.9)
+    _extract_social(text, contacts, result)
+
+    _extract_name(parts, contacts["email"], result)
+    _extract_role(parts, sections.get("experience", []), result)
+    _extract_location(parts, result.values.get("name"), result)
+    _extract_experience_years(sections.get("experience", []), result)
+    _extract_skills(sections.get("skills", []), result)
+    _extract_summary(sections.get("summary", []), result)
+    if "education" in sections:
+        _extract_education(sections["education"], result)
+    return result
+
+
+@dataclass
+class RuleStats:
+    parses: int = 0
+    llm_skipped: int = 0
+    filled: Counter = field(default_factory=Counter)
+
+    def record(self, filled: set[str], skipped_llm: bool) -> None:
+        self.parses += 1
+        self.llm_skipped += int(skipped_llm)
+        self.filled.update(filled)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": RULES_ENABLED,
+            "minConfidence": RULES_MIN_CONFIDENCE,
+            "skipLlm": RULES_SKIP_LLM,
+            "parses": self.parses,
+            "llmSkipped": self.llm_skipped,
+            "filledFields": dict(self.filled),
+        }
+
+
+# Singleton instance
+rule_stats = RuleStats()
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass
+from functools import cache
+from typing import Awaitable, Callable, Literal, TypeVar
+
+
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "40000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+
+# Rough heuristic for English text with the GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+
+@cache
+def retryable_errors() -> tuple[type[Exception], ...]:
+    """OpenAI errors worth retrying; the openai package is only loaded once a call has failed"""
+    import openai
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    import openai
+    return isinstance(error, openai.RateLimitError)
+
+
+T = TypeVar("T")
+Outcome = Literal["success", "throttled", "error"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for TPM budgeting"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate; waiters are served in FIFO order"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> bool:
+        """Take amount tokens, waiting for the refill if needed; returns True if it had to wait"""
+        amount = min(amount, self.capacity)
+        waited = False
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                waited = True
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit: halve on rate limiting or slow calls, grow slowly on healthy ones"""
+
+    def __init__(
+        self,
+        max_limit: int = LLM_MAX_CONCURRENCY,
+        min_limit: int = LLM_MIN_CONCURRENCY,
+        latency_target: float = LLM_LATENCY_TARGET,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_target = latency_target
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < max(self.min_limit, int(self.limit)))
+            self.in_flight += 1
+
+    async def release(self, outcome: Outcome, latency: float) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif outcome == "success":
+                if latency > self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+@dataclass
+class SchedulerStats:
+    calls: int = 0
+    waiting: int = 0
+    rpm_throttled: int = 0
+    tpm_throttled: int = 0
+    rate_limited: int = 0
+    retries: int = 0
+    failures: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class LLMScheduler:
+    """Gates LLM calls behind RPM/TPM budgets and an adaptive concurrency limit, retrying transient errors"""
+
+    def __init__(
+        self,
+        rpm: float = LLM_RPM,
+        tpm: float = LLM_TPM,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        limiter: AdaptiveConcurrencyLimiter | None = None,
+    ):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = SchedulerStats()
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Run call once budgets allow, retrying rate limits and transient failures with jittered backoff"""
+        attempt = 0
+        while True:
+            await self._admit(tokens)
+            started = time.monotonic()
+            outcome: Outcome = "error"
+            try:
+                result = await call()
+                outcome = "success"
+                return result
+            except Exception as e:
+                if not isinstance(e, retryable_errors()):
+                    raise
+                error = e
+                if is_rate_limit(e):
+                    outcome = "throttled"
+                    self.stats.rate_limited += 1
+                if attempt >= self.max_retries:
+                    self.stats.failures += 1
+                    raise
+            finally:
+                await self.limiter.release(outcome, time.monotonic() - started)
+
+            attempt += 1
+            self.stats.retries += 1
+            await asyncio.sleep(self._backoff(attempt, error))
+
+    async def _admit(self, tokens: int) -> None:
+        queued_at = time.monotonic()
+        self.stats.waiting += 1
+        try:
+            if await self.requests.acquire(1):
+                self.stats.rpm_throttled += 1
+            if await self.tokens.acquire(tokens):
+                self.stats.tpm_throttled += 1
+            await self.limiter.acquire()
+        finally:
+            self.stats.waiting -= 1
+        wait = time.monotonic() - queued_at
+        self.stats.calls += 1
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the provider's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        return min(delay, self.backoff_max)
+
+    def snapshot(self) -> dict:
+        """Current limits, queue wait times and throttling counters"""
+        stats = self.stats
+        return {
+            "concurrencyLimit": round(self.limiter.limit, 2),
+            "inFlight": self.limiter.in_flight,
+            "waiting": stats.waiting,
+            "calls": stats.calls,
+            "avgQueueWaitSeconds": round(stats.total_wait / stats.calls, 4) if stats.calls else 0.0,
+            "maxQueueWaitSeconds": round(stats.max_wait, 4),
+            "rpmThrottled": stats.rpm_throttled,
+            "tpmThrottled": stats.tpm_throttled,
+            "rateLimited": stats.rate_limited,
+            "retries": stats.retries,
+            "failures": stats.failures,
+        }
+
+
+# Singleton instance
+llm_scheduler = LLMScheduler()
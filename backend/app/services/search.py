@@ -0,0 +1,206 @@
+import base64
+import heapq
+import itertools
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from app.models.schemas import ResumeSummary
+from app.services.storage import storage
+
+
+_TOKEN = re.compile(r"[\w+#.]+")
+_SPACES = re.compile(r"\s+")
+
+# Common spellings folded into one skill term
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "postgres": "postgresql",
+    "react.js": "react",
+    "reactjs": "react",
+    "py": "python",
+}
+
+
+def normalize_skill(skill: str) -> str:
+    """Case- and whitespace-insensitive skill key, with common aliases folded together"""
+    key = _SPACES.sub(" ", skill).strip().casefold()
+    return SKILL_ALIASES.get(key, key)
+
+
+def tokenize(text: str | None) -> set[str]:
+    """Lowercase word tokens of a role or location, trailing dots stripped"""
+    if not text:
+        return set()
+    return {token.rstrip(".") for token in _TOKEN.findall(text.casefold()) if token.rstrip(".")}
+
+
+@dataclass
+class ResumeQuery:
+    """Boolean filters; all given filters must match"""
+    all_skills: list[str] = field(default_factory=list)
+    any_skills: list[str] = field(default_factory=list)
+    not_skills: list[str] = field(default_factory=list)
+    role: str | None = None
+    location: str | None = None
+    min_years: int | None = None
+    max_years: int | None = None
+
+
+@dataclass
+class SearchPage:
+    ids: list[str]
+    total: int
+    next_cursor: str | None
+
+
+def encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(str(seq).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raises ValueError for malformed cursors"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class ResumeIndex:
+    """In-process inverted index over completed resume summaries.
+
+    Postings map normalized skills, currentRole tokens and location tokens to
+    resume IDs, and experience years to resumes with exactly that many years.
+    The index is updated incrementally as storage reports summary changes.
+    Results are ordered newest-indexed first and paged with an opaque cursor.
+    """
+
+    def __init__(self):
+        self._skills: dict[str, set[str]] = {}
+        self._roles: dict[str, set[str]] = {}
+        self._locations: dict[str, set[str]] = {}
+        self._years: dict[int, set[str]] = {}
+        self._docs: dict[str, tuple[set[str], set[str], set[str], int]] = {}  # id -> indexed terms
+        self._years_by_id: dict[str, int] = {}
+        self._seq: dict[str, int] = {}  # id -> insertion sequence, used for ordering and cursors
+        self._counter = itertools.count(1)
+        self.queries = 0
+        self.total_query_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def on_summary(self, resume_id: str, summary: ResumeSummary) -> None:
+        """Index (or re-index) a completed summary"""
+        self.on_remove(resume_id)
+        skills = {normalize_skill(skill) for skill in summary.skills if skill.strip()}
+        roles = tokenize(summary.currentRole)
+        locations = tokenize(summary.location)
+        years = summary.experienceYears or 0
+        for postings, terms in ((self._skills, skills), (self._roles, roles), (self._locations, locations)):
+            for term in terms:
+                postings.setdefault(term, set()).add(resume_id)
+        self._years.setdefault(years, set()).add(resume_id)
+        self._docs[resume_id] = (skills, roles, locations, years)
+        self._years_by_id[resume_id] = years
+        self._seq[resume_id] = next(self._counter)
+
+    def on_remove(self, resume_id: str) -> None:
+        doc = self._docs.pop(resume_id, None)
+        if doc is None:
+            return
+        skills, roles, locations, years = doc
+        for postings, terms in (
+            (self._skills, skills), (self._roles, roles), (self._locations, locations), (self._years, {years})
+        ):
+            for term in terms:
+                ids = postings.get(term)
+                if ids is not None:
+                    ids.discard(resume_id)
+                    if not ids:
+                        del postings[term]
+        self._years_by_id.pop(resume_id, None)
+        self._seq.pop(resume_id, None)
+
+    def rebuild(self, summaries: Iterable[tuple[str, ResumeSummary]]) -> None:
+        """Index every stored summary, e.g. at startup with a persistent backend"""
+        for resume_id, summary in summaries:
+            self.on_summary(resume_id, summary)
+
+    def search(self, query: ResumeQuery, limit: int = 20, cursor: str | None = None) -> SearchPage:
+        """IDs matching the query, newest first; raises ValueError for a bad cursor"""
+        started = time.perf_counter()
+        after = decode_cursor(cursor) if cursor else None
+
+        matches = self._match(query)
+        total = len(matches)
+        seq = self._seq
+        candidates = matches if after is None else [resume_id for resume_id in matches if seq[resume_id] < after]
+        # One extra hit tells whether there is a next page
+        page = heapq.nlargest(limit + 1, candidates, key=seq.__getitem__)
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        self.queries += 1
+        self.total_query_seconds += time.perf_counter() - started
+        return SearchPage(
+            ids=page,
+            total=total,
+            next_cursor=encode_cursor(seq[page[-1]]) if has_more else None,
+        )
+
+    def _match(self, query: ResumeQuery) -> set[str]:
+        """Intersect the posting lists of every filter, smallest first"""
+        required: list[set[str]] = []
+        required += [self._skills.get(normalize_skill(skill), set()) for skill in query.all_skills]
+        required += [self._roles.get(token, set()) for token in tokenize(query.role)]
+        required += [self._locations.get(token, set()) for token in tokenize(query.location)]
+        if query.any_skills:
+            required.append(set().union(*(self._skills.get(normalize_skill(skill), set()) for skill in query.any_skills)))
+
+        has_years = query.min_years is not None or query.max_years is not None
+        if required:
+            required.sort(key=len)
+            matches = required[0].intersection(*required[1:])
+            if has_years:
+                low = query.min_years if query.min_years is not None else 0
+                high = query.max_years if query.max_years is not None else float("inf")
+                years = self._years_by_id
+                matches = {resume_id for resume_id in matches if low <= years[resume_id] <= high}
+        elif has_years:
+            matches = set().union(*(ids for years, ids in self._years.items() if self._years_match(years, query)))
+        else:
+            matches = set(self._docs)
+
+        for skill in query.not_skills:
+            matches -= self._skills.get(normalize_skill(skill), set())
+        return matches
+
+    @staticmethod
+    def _years_match(years: int, query: ResumeQuery) -> bool:
+        if query.min_years is not None and years < query.min_years:
+            return False
+        if query.max_years is not None and years > query.max_years:
+            return False
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            "documents": len(self._docs),
+            "skillTerms": len(self._skills),
+            "roleTerms": len(self._roles),
+            "locationTerms": len(self._locations),
+            "queries": self.queries,
+            "avgQueryMs": round(self.total_query_seconds * 1000 / self.queries, 3) if self.queries else 0.0,
+        }
+
+
+# Singleton instance
+resume_index = ResumeIndex()
+storage.add_listener(resume_index)
@@ -0,0 +1,464 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from app.models.schemas import ResumeSummary
+from app.services.storage import BaseResumeStorage, ResumeStatus, SerializedSummary, SpendPolicy, summary_body
+
+
+RESUMES_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    raw_text BLOB NOT NULL,  -- zlib-compressed extracted text
+    upload_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    summary TEXT,
+    summary_etag TEXT,  -- SerializedSummary.etag, computed when the summary is stored
+    parse_version TEXT,
+    error TEXT,
+    error_code INTEGER,
+    reparse_owner TEXT,
+    reparse_lease_until REAL,
+    reparse_failed_version TEXT,
+    reparse_failures INTEGER NOT NULL DEFAULT 0
+)"""
+RESUME_COLUMNS = (
+    "id, file_name, raw_text, upload_date, status, summary, summary_etag, parse_version, error, error_code, "
+    "reparse_owner, reparse_lease_until, reparse_failed_version, reparse_failures"
+)
+RESUMES_INDEX = "CREATE INDEX IF NOT EXISTS idx_resumes_status ON resumes (status)"
+
+SCHEMA = f"""
+{RESUMES_TABLE.format(name="resumes")};
+{RESUMES_INDEX};
+
+CREATE TABLE IF NOT EXISTS text_hashes (
+    hash TEXT PRIMARY KEY,
+    resume_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_text_hashes_resume_id ON text_hashes (resume_id);
+
+CREATE TABLE IF NOT EXISTS raw_hashes (
+    hash TEXT PRIMARY KEY,
+    resume_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_raw_hashes_resume_id ON raw_hashes (resume_id);
+
+-- Tokens spent by background re-parses, shared by every worker for one hourly cap
+CREATE TABLE IF NOT EXISTS reparse_spend (
+    spent_at REAL NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reparse_spend_spent_at ON reparse_spend (spent_at);
+
+-- Summary updates and removals in commit order, so every worker can keep its in-memory indexes in step
+CREATE TABLE IF NOT EXISTS resume_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    resume_id TEXT NOT NULL,
+    origin TEXT NOT NULL
+);
+"""
+
+# Everything but the raw text, which is only loaded by get_raw_text()
+RECORD_COLUMNS = "r.id, r.file_name, r.upload_date, r.status, r.summary, r.parse_version, r.error, r.error_code"
+
+# Entries kept in the change log; a worker further behind than this would miss changes
+CHANGE_LOG_KEEP = 100000
+CHANGE_LOG_PRUNE_EVERY = 1000
+
+# /health and every metrics scrape read stats(); the COUNT(*) scans run at most this often
+STATS_CACHE_SECONDS = 5.0
+
+# Columns added after the first release, created on databases that predate them.
+# Databases from before raw_text also have the uncompressed file_content column, which is dropped
+MIGRATIONS = {
+    "parse_version": "ALTER TABLE resumes ADD COLUMN parse_version TEXT",
+    "raw_text": "ALTER TABLE resumes ADD COLUMN raw_text BLOB",
+    "summary_etag": "ALTER TABLE resumes ADD COLUMN summary_etag TEXT",
+    "reparse_owner": "ALTER TABLE resumes ADD COLUMN reparse_owner TEXT",
+    "reparse_lease_until": "ALTER TABLE resumes ADD COLUMN reparse_lease_until REAL",
+    "reparse_failed_version": "ALTER TABLE resumes ADD COLUMN reparse_failed_version TEXT",
+    "reparse_failures": "ALTER TABLE resumes ADD COLUMN reparse_failures INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class SQLiteResumeStorage(BaseResumeStorage):
+    """SQLite-backed storage shared by all worker processes on a host.
+
+    The database runs in WAL mode so readers in one process never block the
+    writer in another. Each thread gets its own connection; writes issued
+    inside transaction() are committed together. Calls are synchronous and
+    most run on the event loop, so a writer waits at most busy_timeout_ms for
+    another process's write lock before failing with "database is locked";
+    keep it short so one slow writer cannot stall every request. Summary changes are also
+    appended to a change log that other workers poll with changes_since().
+    """
+
+    shared = True
+
+    def __init__(self, path: str, busy_timeout_ms: int = 250):
+        super().__init__()
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._instance = uuid.uuid4().hex[:8]
+        self._stats: tuple[float, dict] | None = None  # (monotonic time taken, stats)
+        self._connection().executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add missing columns, move the text into raw_text and compute summary ETags of rows written before them"""
+        with self.transaction():
+            conn = self._connection()
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(resumes)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+            if "file_content" in columns:
+                rows = conn.execute("SELECT id, file_content FROM resumes WHERE raw_text IS NULL").fetchall()
+                for row in rows:
+                    conn.execute(
+                        "UPDATE resumes SET raw_text = ? WHERE id = ?",
+                        (zlib.compress(row["file_content"].encode("utf-8")), row["id"])
+                    )
+                # Rebuild the table without file_content (works on SQLite versions without DROP COLUMN)
+                conn.execute(RESUMES_TABLE.format(name="resumes_migrated"))
+                conn.execute(f"INSERT INTO resumes_migrated ({RESUME_COLUMNS}) SELECT {RESUME_COLUMNS} FROM resumes")
+                conn.execute("DROP TABLE resumes")
+                conn.execute("ALTER TABLE resumes_migrated RENAME TO resumes")
+                conn.execute(RESUMES_INDEX)
+            rows = conn.execute(
+                "SELECT id, summary, raw_text FROM resumes WHERE summary IS NOT NULL AND summary_etag IS NULL"
+            ).fetchall()
+            for row in rows:
+                # Also drops rawText from summaries stored before it was left out
+                serialized = SerializedSummary.from_body(
+                    summary_body(ResumeSummary.model_validate_json(row["summary"])), row["raw_text"]
+                )
+                conn.execute(
+                    "UPDATE resumes SET summary = ?, summary_etag = ? WHERE id = ?",
+                    (serialized.body.decode("utf-8"), serialized.etag, row["id"])
+                )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode - transactions are managed explicitly in transaction()
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several writes into one IMMEDIATE transaction (nested calls join the outer one)"""
+        conn = self._connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    @property
+    def origin(self) -> str:
+        """Writer name in the change log; includes the pid, so forked workers differ"""
+        return f"{os.getpid()}-{self._instance}"
+
+    def _log_change(self, resume_id: str) -> None:
+        """Append to the change log; call inside a transaction so the entry commits with the change"""
+        conn = self._connection()
+        seq = conn.execute(
+            "INSERT INTO resume_changes (resume_id, origin) VALUES (?, ?)", (resume_id, self.origin)
+        ).lastrowid
+        if seq % CHANGE_LOG_PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM resume_changes WHERE seq <= ?", (seq - CHANGE_LOG_KEEP,))
+
+    def change_cursor(self) -> int:
+        """Current position in the change log shared with other processes"""
+        return self._connection().execute("SELECT COALESCE(MAX(seq), 0) FROM resume_changes").fetchone()[0]
+
+    def changes_since(self, cursor: int) -> tuple[int, list[tuple[str, ResumeSummary | None]]]:
+        """Summaries changed by other processes after cursor, as (new cursor, [(resume_id, summary or None)])"""
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT seq, resume_id, origin FROM resume_changes WHERE seq > ? ORDER BY seq", (cursor,)
+        ).fetchall()
+        if not rows:
+            return cursor, []
+        origin = self.origin
+        # Latest state of each resume changed elsewhere, in the order of its last change
+        changed = list(dict.fromkeys(row["resume_id"] for row in reversed(rows) if row["origin"] != origin))
+        changed.reverse()
+        changes = []
+        for resume_id in changed:
+            row = conn.execute(
+                "SELECT summary FROM resumes WHERE id = ? AND status = 'completed' AND summary IS NOT NULL",
+                (resume_id,)
+            ).fetchone()
+            changes.append((resume_id, ResumeSummary.model_validate_json(row["summary"]) if row else None))
+        return rows[-1]["seq"], changes
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        with self.transaction():
+            return self._connection().execute(sql, params).rowcount
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "fileName": row["file_name"],
+            "uploadDate": datetime.fromisoformat(row["upload_date"]),
+            "status": row["status"],
+            "summary": ResumeSummary.model_validate_json(row["summary"]) if row["summary"] else None,
+            "parseVersion": row["parse_version"],
+            "error": row["error"],
+            "error_code": row["error_code"],
+        }
+
+    def _get_by_hash(self, table: str, hash_value: str) -> dict | None:
+        row = self._connection().execute(
+            f"SELECT {RECORD_COLUMNS} FROM {table} h JOIN resumes r ON r.id = h.resume_id WHERE h.hash = ?",
+            (hash_value,)
+        ).fetchone()
+        return self._to_record(row) if row else None
+
+    def get_resume_by_raw_hash(self, raw_hash: str) -> dict | None:
+        """Get resume by MD5 hash of the uploaded file bytes if cached"""
+        return self._get_by_hash("raw_hashes", raw_hash)
+
+    def cache_raw_hash(self, raw_hash: str, resume_id: str) -> None:
+        """Cache the raw file MD5 hash to resume_id mapping"""
+        self._write("INSERT OR REPLACE INTO raw_hashes (hash, resume_id) VALUES (?, ?)", (raw_hash, resume_id))
+
+    def get_resume_by_hash(self, text_hash: str) -> dict | None:
+        """Get resume by MD5 hash if cached"""
+        return self._get_by_hash("text_hashes", text_hash)
+
+    def store_resume(
+        self,
+        resume_id: str,
+        file_name: str,
+        file_content: str,
+        status: ResumeStatus = "processing"
+    ) -> dict:
+        """Store a new resume"""
+        upload_date = datetime.utcnow()
+        # Replacing an existing row drops its summary
+        self._notify_remove(resume_id)
+        with self.transaction():
+            self._connection().execute(
+                "INSERT OR REPLACE INTO resumes (id, file_name, raw_text, upload_date, status) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (resume_id, file_name, zlib.compress(file_content.encode("utf-8")), upload_date.isoformat(), status)
+            )
+            self._log_change(resume_id)
+        return {
+            "id": resume_id,
+            "fileName": file_name,
+            "uploadDate": upload_date,
+            "status": status,
+            "summary": None,
+            "parseVersion": None,
+            "error": None,
+            "error_code": None
+        }
+
+    def cache_resume_hash(self, text_hash: str, resume_id: str) -> None:
+        """Cache the MD5 hash to resume_id mapping"""
+        self._write("INSERT OR REPLACE INTO text_hashes (hash, resume_id) VALUES (?, ?)", (text_hash, resume_id))
+
+    def get_resume(self, resume_id: str) -> dict | None:
+        """Get resume by ID"""
+        row = self._connection().execute(
+            f"SELECT {RECORD_COLUMNS} FROM resumes r WHERE r.id = ?", (resume_id,)
+        ).fetchone()
+        return self._to_record(row) if row else None
+
+    def get_raw_text(self, resume_id: str) -> str | None:
+        """Get the extracted text of a resume, decompressing it on demand"""
+        row = self._connection().execute("SELECT raw_text FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return zlib.decompress(row["raw_text"]).decode("utf-8") if row else None
+
+    def get_summary_json(self, resume_id: str) -> SerializedSummary | None:
+        """Get the summary as JSON bytes serialized when it was stored, with the ETag computed then"""
+        row = self._connection().execute(
+            "SELECT summary, summary_etag FROM resumes WHERE id = ? AND summary IS NOT NULL", (resume_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return SerializedSummary(body=row["summary"].encode("utf-8"), etag=row["summary_etag"])
+
+    def update_summary(
+        self,
+        resume_id: str,
+        summary: ResumeSummary,
+        status: ResumeStatus = "completed",
+        parse_version: str | None = None
+    ) -> dict | None:
+        """Update resume with parsed summary and the parse version that produced it"""
+        with self.transaction():
+            conn = self._connection()
+            row = conn.execute("SELECT raw_text FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+            if row is None:
+                return None
+            serialized = SerializedSummary.from_body(summary_body(summary), row["raw_text"])
+            conn.execute(
+                "UPDATE resumes SET summary = ?, summary_etag = ?, status = ?, parse_version = ? WHERE id = ?",
+                (serialized.body.decode("utf-8"), serialized.etag, status, parse_version, resume_id)
+            )
+            self._log_change(resume_id)
+        self._notify_summary(resume_id, summary)
+        return self.get_resume(resume_id)
+
+    def update_status(
+        self,
+        resume_id: str,
+        status: ResumeStatus,
+        error: str | None = None,
+        error_code: int | None = None
+    ) -> dict | None:
+        """Update resume status, recording the failure reason for errors"""
+        updated = self._write(
+            "UPDATE resumes SET status = ?, error = ?, error_code = ? WHERE id = ?",
+            (status, error, error_code, resume_id)
+        )
+        return self.get_resume(resume_id) if updated else None
+
+    def delete_resume(self, resume_id: str) -> None:
+        """Remove a resume and any hash mappings pointing at it"""
+        with self.transaction():
+            conn = self._connection()
+            conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+            conn.execute("DELETE FROM text_hashes WHERE resume_id = ?", (resume_id,))
+            conn.execute("DELETE FROM raw_hashes WHERE resume_id = ?", (resume_id,))
+            self._log_change(resume_id)
+        self._notify_remove(resume_id)
+
+    def iter_summaries(self) -> Iterator[tuple[str, ResumeSummary]]:
+        """Yield (resume_id, summary) for every completed resume"""
+        rows = self._connection().execute(
+            "SELECT id, summary FROM resumes WHERE status = 'completed' AND summary IS NOT NULL ORDER BY upload_date"
+        )
+        for row in rows:
+            yield row["id"], ResumeSummary.model_validate_json(row["summary"])
+
+    def iter_outdated(self, parse_version: str, max_failures: int | None = None) -> Iterator[str]:
+        """Yield ids of completed resumes parsed with another (or an unknown) parse version, oldest first"""
+        sql = (
+            "SELECT id FROM resumes WHERE status = 'completed' AND summary IS NOT NULL "
+            "AND (parse_version IS NULL OR parse_version != ?)"
+        )
+        params: tuple = (parse_version,)
+        if max_failures is not None:
+            sql += " AND (reparse_failed_version IS NULL OR reparse_failed_version != ? OR reparse_failures < ?)"
+            params += (parse_version, max_failures)
+        rows = self._connection().execute(sql + " ORDER BY upload_date", params).fetchall()
+        for row in rows:
+            yield row["id"]
+
+    def claim_reparse(
+        self,
+        resume_id: str,
+        parse_version: str,
+        owner: str,
+        lease_seconds: float,
+        max_failures: int | None = None
+    ) -> bool:
+        """Lease an outdated resume to one re-parse worker; a single conditional UPDATE, so one worker wins"""
+        now = time.time()
+        sql = (
+            "UPDATE resumes SET reparse_owner = ?, reparse_lease_until = ? "
+            "WHERE id = ? AND status = 'completed' AND summary IS NOT NULL "
+            "AND (parse_version IS NULL OR parse_version != ?) "
+            "AND (reparse_owner IS NULL OR reparse_owner = ? OR reparse_lease_until < ?)"
+        )
+        params: tuple = (owner, now + lease_seconds, resume_id, parse_version, owner, now)
+        if max_failures is not None:
+            sql += " AND (reparse_failed_version IS NULL OR reparse_failed_version != ? OR reparse_failures < ?)"
+            params += (parse_version, max_failures)
+        return self._write(sql, params) == 1
+
+    def release_reparse(self, resume_id: str, owner: str, failed_version: str | None = None) -> int:
+        """Drop owner's lease, counting a failed re-parse to failed_version if given; returns the failures so far"""
+        with self.transaction():
+            conn = self._connection()
+            if failed_version is None:
+                conn.execute(
+                    "UPDATE resumes SET reparse_owner = NULL, reparse_lease_until = NULL "
+                    "WHERE id = ? AND reparse_owner = ?",
+                    (resume_id, owner)
+                )
+                return 0
+            updated = conn.execute(
+                "UPDATE resumes SET reparse_owner = NULL, reparse_lease_until = NULL, "
+                "reparse_failures = CASE WHEN reparse_failed_version = ? THEN reparse_failures + 1 ELSE 1 END, "
+                "reparse_failed_version = ? WHERE id = ? AND reparse_owner = ?",
+                (failed_version, failed_version, resume_id, owner)
+            ).rowcount
+            if not updated:
+                return 0
+            return conn.execute("SELECT reparse_failures FROM resumes WHERE id = ?", (resume_id,)).fetchone()[0]
+
+    def reserve_reparse_tokens(self, tokens: int, window: float, wait_time: SpendPolicy) -> float:
+        """Record tokens spent now unless wait_time asks to wait; returns that wait"""
+        now = time.time()
+        # IMMEDIATE transaction: workers check and record their spend one at a time
+        with self.transaction():
+            conn = self._connection()
+            conn.execute("DELETE FROM reparse_spend WHERE spent_at <= ?", (now - window,))
+            spent = conn.execute("SELECT spent_at, tokens FROM reparse_spend ORDER BY spent_at").fetchall()
+            wait = wait_time([(row["spent_at"], row["tokens"]) for row in spent], now)
+            if wait <= 0:
+                conn.execute("INSERT INTO reparse_spend (spent_at, tokens) VALUES (?, ?)", (now, tokens))
+        return wait
+
+    def reparse_tokens_spent(self, window: float) -> int:
+        """Re-parse tokens recorded over the last window seconds"""
+        row = self._connection().execute(
+            "SELECT COALESCE(SUM(tokens), 0) FROM reparse_spend WHERE spent_at > ?", (time.time() - window,)
+        ).fetchone()
+        return row[0]
+
+    def stats(self) -> dict:
+        """Row counts and on-disk size of the database, at most STATS_CACHE_SECONDS old"""
+        cached = self._stats
+        now = time.monotonic()
+        if cached is not None and now - cached[0] < STATS_CACHE_SECONDS:
+            return cached[1]
+        conn = self._connection()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        stats = {
+            "backend": "sqlite",
+            "entries": conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0],
+            "bytes": page_count * page_size,
+            "hashEntries": conn.execute("SELECT COUNT(*) FROM text_hashes").fetchone()[0],
+            "rawHashEntries": conn.execute("SELECT COUNT(*) FROM raw_hashes").fetchone()[0],
+        }
+        self._stats = (now, stats)
+        return stats
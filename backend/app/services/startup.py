@@ -0,0 +1,105 @@
+import asyncio
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+
+from app.services.metrics import metrics
+
+
+# "background" takes traffic at once and loads the LLM stack behind /ready;
+# "blocking" finishes the warmup before the app starts; "off" loads everything on first use
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background")
+WARMUP_MODES = ("background", "blocking", "off")
+
+if STARTUP_WARMUP not in WARMUP_MODES:
+    raise ValueError(f"Invalid STARTUP_WARMUP: {STARTUP_WARMUP}. Use one of: {', '.join(WARMUP_MODES)}")
+
+# Backoff between warmup attempts when an import fails; /ready stays 503 until one succeeds
+WARMUP_RETRY_SECONDS = 1.0
+WARMUP_RETRY_MAX_SECONDS = 60.0
+
+# Heavy modules kept out of the import of app.main; the parser pulls in langchain and openai
+WARMUP_MODULES = ("PyPDF2", "docx", "app.services.parser")
+
+
+@dataclass
+class StartupPhase:
+    name: str
+    kind: str  # "import" or "init"
+    seconds: float
+    modules: int  # modules first loaded during the phase
+
+
+class StartupProfile:
+    """Where startup time goes: the import of the app, then each lifespan and warmup phase.
+
+    Import phases also count the modules they loaded; for a per-module
+    breakdown of the cold import run benchmarks/startup_report.py.
+    """
+
+    def __init__(self):
+        self.phases: list[StartupPhase] = []
+        self.ready = False
+        self.error: str | None = None
+        self.degraded: str | None = None  # non-fatal warmup failure; the app is ready but pays for it on first use
+        self.failed_attempts = 0
+        self._created = time.perf_counter()
+        self._ready_at: float | None = None
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "init") -> Iterator[None]:
+        modules = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(StartupPhase(name, kind, time.perf_counter() - started, len(sys.modules) - modules))
+
+    def imported(self, name: str, started: float, modules: int) -> None:
+        """Record an import that ran before the profile could time it with phase()"""
+        self.phases.append(StartupPhase(name, "import", time.perf_counter() - started, len(sys.modules) - modules))
+
+    async def import_module(self, name: str) -> None:
+        """Import a module off the event loop, timing it as an import phase"""
+        with self.phase(name, kind="import"):
+            await asyncio.to_thread(importlib.import_module, name)
+
+    def mark_failed(self, error: Exception) -> None:
+        """Record a failed warmup attempt that will be retried"""
+        self.failed_attempts += 1
+        self.error = str(error)
+
+    def mark_ready(self, degraded: str | None = None) -> None:
+        self.ready = True
+        self.error = None
+        self.degraded = degraded
+        self._ready_at = time.perf_counter()
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": STARTUP_WARMUP,
+            "ready": self.ready,
+            "error": self.error,
+            "degraded": self.degraded,
+            "failedAttempts": self.failed_attempts,
+            "secondsToReady": round(self._ready_at - self._created, 3) if self._ready_at else None,
+            "phases": [
+                {"name": p.name, "kind": p.kind, "seconds": round(p.seconds, 4), "modules": p.modules}
+                for p in self.phases
+            ],
+        }
+
+
+# Singleton instance
+startup_profile = StartupProfile()
+
+metrics.callback("gridrez_ready", "1 once the startup warmup has finished", lambda: int(startup_profile.ready))
+metrics.callback(
+    "gridrez_startup_phase_seconds", "Time spent in each startup phase",
+    lambda: {(p.name,): p.seconds for p in startup_profile.phases},
+    ("phase",)
+)
@@ -1,15 +1,103 @@
 import hashlib
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Literal
+from typing import Callable, Iterator, Literal, Protocol
 from app.models.schemas import ResumeSummary
+from app.services.metrics import metrics
 
 
-class ResumeStorage:
-    """In-memory storage for resume data with MD5 caching"""
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+STORAGE_PATH = os.getenv("STORAGE_PATH", "gridrez.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "250"))
+STORAGE_MAX_ENTRIES = int(os.getenv("STORAGE_MAX_ENTRIES", "10000"))
+STORAGE_MAX_BYTES = int(os.getenv("STORAGE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
+STORAGE_TTL_SECONDS = float(os.getenv("STORAGE_TTL_SECONDS", str(7 * 24 * 3600)))  # 7 days
+
+# Rough per-entry cost of the record dict, keys and bookkeeping
+ENTRY_OVERHEAD_BYTES = 1024
+
+ResumeStatus = Literal["processing", "completed", "error"]
+
+
+@dataclass(frozen=True)
+class SerializedSummary:
+    body: bytes  # summary JSON without rawText, which is appended on demand
+    etag: str    # digest of the body and the raw text, stable while the resume is unchanged
+
+    @classmethod
+    def from_body(cls, body: bytes, raw_text: bytes) -> "SerializedSummary":
+        """raw_text is the stored text in whatever stable encoding the backend keeps it"""
+        digest = hashlib.md5(body)
+        digest.update(raw_text)
+        return cls(body=body, etag=digest.hexdigest())
+
+
+# Given the (time, tokens) spent over the budget window, oldest first, and the current time:
+# seconds to wait before spending, or 0 when the new spend fits
+SpendPolicy = Callable[[list[tuple[float, int]], float], float]
+
+
+def summary_body(summary: ResumeSummary) -> bytes:
+    """Summary JSON as served, without rawText"""
+    return summary.model_dump_json(exclude={"rawText"}).encode("utf-8")
+
+
+class StorageListener(Protocol):
+    """Receives summary changes, e.g. to keep a search index in sync with storage"""
+
+    def on_summary(self, resume_id: str, summary: ResumeSummary) -> None: ...
+
+    def on_remove(self, resume_id: str) -> None: ...
+
+
+class BaseResumeStorage(ABC):
+    """Storage interface for resume records and their MD5 caches.
+
+    Records are dicts with id, fileName, uploadDate, status, summary
+    (ResumeSummary or None), parseVersion (fingerprint of the prompt, model
+    and schema that produced the summary, None if unknown), error and
+    error_code keys. The extracted text is fetched separately with
+    get_raw_text().
+    """
+
+    # Whether other processes can write to this storage, so in-process indexes need to catch up with them
+    shared = False
 
     def __init__(self):
-        self._storage: dict[str, dict] = {}
-        self._hash_cache: dict[str, str] = {}  # MD5 hash -> resume_id mapping
+        self._listeners: list[StorageListener] = []
+
+    def add_listener(self, listener: StorageListener) -> None:
+        """Notify listener of every summary update and removal from now on"""
+        self._listeners.append(listener)
+
+    def _notify_summary(self, resume_id: str, summary: ResumeSummary) -> None:
+        for listener in self._listeners:
+            listener.on_summary(resume_id, summary)
+
+    def _notify_remove(self, resume_id: str) -> None:
+        for listener in self._listeners:
+            listener.on_remove(resume_id)
+
+    def replay(self, resume_id: str, summary: ResumeSummary | None) -> None:
+        """Notify listeners of a change another process made: a new summary, or None for a removal"""
+        if summary is None:
+            self._notify_remove(resume_id)
+        else:
+            self._notify_summary(resume_id, summary)
+
+    def change_cursor(self) -> int:
+        """Current position in the change log shared with other processes"""
+        return 0
+
+    def changes_since(self, cursor: int) -> tuple[int, list[tuple[str, ResumeSummary | None]]]:
+        """Summaries changed by other processes after cursor, as (new cursor, [(resume_id, summary or None)])"""
+        return cursor, []
 
     def compute_hash(self, text_content: str) -> str:
         """Compute MD5 hash of normalized text content"""
@@ -17,6 +105,170 @@ class ResumeStorage:
         normalized = text_content.strip().lower()
         return hashlib.md5(normalized.encode('utf-8')).hexdigest()
 
+    def compute_raw_hash(self, file_content: bytes) -> str:
+        """Compute MD5 hash of the uploaded file bytes, before any extraction"""
+        return hashlib.md5(file_content).hexdigest()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several writes so they are applied together"""
+        yield
+
+    @abstractmethod
+    def get_resume_by_raw_hash(self, raw_hash: str) -> dict | None:
+        """Get resume by MD5 hash of the uploaded file bytes if cached"""
+
+    @abstractmethod
+    def cache_raw_hash(self, raw_hash: str, resume_id: str) -> None:
+        """Cache the raw file MD5 hash to resume_id mapping"""
+
+    @abstractmethod
+    def get_resume_by_hash(self, text_hash: str) -> dict | None:
+        """Get resume by MD5 hash if cached"""
+
+    @abstractmethod
+    def store_resume(
+        self,
+        resume_id: str,
+        file_name: str,
+        file_content: str,
+        status: ResumeStatus = "processing"
+    ) -> dict:
+        """Store a new resume"""
+
+    @abstractmethod
+    def cache_resume_hash(self, text_hash: str, resume_id: str) -> None:
+        """Cache the MD5 hash to resume_id mapping"""
+
+    @abstractmethod
+    def get_resume(self, resume_id: str) -> dict | None:
+        """Get resume by ID"""
+
+    @abstractmethod
+    def get_raw_text(self, resume_id: str) -> str | None:
+        """Get the extracted text of a resume"""
+
+    @abstractmethod
+    def get_summary_json(self, resume_id: str) -> SerializedSummary | None:
+        """Get the summary as JSON bytes serialized when it was stored"""
+
+    @abstractmethod
+    def update_summary(
+        self,
+        resume_id: str,
+        summary: ResumeSummary,
+        status: ResumeStatus = "completed",
+        parse_version: str | None = None
+    ) -> dict | None:
+        """Update resume with parsed summary and the parse version that produced it"""
+
+    @abstractmethod
+    def update_status(
+        self,
+        resume_id: str,
+        status: ResumeStatus,
+        error: str | None = None,
+        error_code: int | None = None
+    ) -> dict | None:
+        """Update resume status, recording the failure reason for errors"""
+
+    @abstractmethod
+    def delete_resume(self, resume_id: str) -> None:
+        """Remove a resume and any hash mappings pointing at it"""
+
+    @abstractmethod
+    def iter_summaries(self) -> Iterator[tuple[str, ResumeSummary]]:
+        """Yield (resume_id, summary) for every completed resume"""
+
+    @abstractmethod
+    def iter_outdated(self, parse_version: str, max_failures: int | None = None) -> Iterator[str]:
+        """Yield ids of completed resumes parsed with another (or an unknown) parse version, oldest first.
+
+        With max_failures, resumes that failed that many re-parses to parse_version are left out.
+        """
+
+    @abstractmethod
+    def claim_reparse(
+        self,
+        resume_id: str,
+        parse_version: str,
+        owner: str,
+        lease_seconds: float,
+        max_failures: int | None = None
+    ) -> bool:
+        """Lease an outdated resume to one re-parse worker.
+
+        False if another worker holds the lease, the resume is up to date, or
+        it already failed max_failures re-parses to parse_version.
+        """
+
+    @abstractmethod
+    def release_reparse(self, resume_id: str, owner: str, failed_version: str | None = None) -> int:
+        """Drop owner's lease, counting a failed re-parse to failed_version if given; returns the failures so far"""
+
+    @abstractmethod
+    def reserve_reparse_tokens(self, tokens: int, window: float, wait_time: SpendPolicy) -> float:
+        """Record tokens spent now unless wait_time asks to wait; returns that wait.
+
+        Spend older than window is dropped first. The check and the write are
+        atomic, so workers sharing the storage never overspend together.
+        """
+
+    @abstractmethod
+    def reparse_tokens_spent(self, window: float) -> int:
+        """Re-parse tokens recorded over the last window seconds"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Report the current storage footprint"""
+
+
+class ResumeStorage(BaseResumeStorage):
+    """In-memory storage for resume data with MD5 caching.
+
+    Memory is bounded: entries are kept in LRU order and evicted once
+    max_entries or max_bytes is exceeded or once they sit idle longer than
+    ttl_seconds. Resumes still processing are never evicted. Raw text is
+    kept zlib-compressed and only inflated by get_raw_text().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = STORAGE_MAX_ENTRIES,
+        max_bytes: int = STORAGE_MAX_BYTES,
+        ttl_seconds: float = STORAGE_TTL_SECONDS
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._storage: OrderedDict[str, dict] = OrderedDict()  # resume_id -> record, least recently used first
+        self._raw_text: dict[str, bytes] = {}  # resume_id -> zlib-compressed extracted text
+        self._summary_json: dict[str, SerializedSummary] = {}  # resume_id -> summary serialized at update time
+        self._sizes: dict[str, int] = {}  # resume_id -> estimated footprint in bytes
+        self._last_access: dict[str, float] = {}  # resume_id -> monotonic time of last access
+        self._hash_cache: dict[str, str] = {}  # MD5 hash -> resume_id mapping
+        self._raw_hash_cache: dict[str, str] = {}  # MD5 of uploaded bytes -> resume_id mapping
+        self._hash_keys: dict[str, set[str]] = {}  # resume_id -> text/raw hashes pointing at it
+        self._reparse_leases: dict[str, tuple[str, float]] = {}  # resume_id -> (owner, lease expiry)
+        self._reparse_failures: dict[str, tuple[str, int]] = {}  # resume_id -> (target parse version, failures)
+        self._reparse_spend: deque[tuple[float, int]] = deque()  # (time, tokens) of re-parses, oldest first
+        self._total_bytes = 0
+        self._evictions = {"lru": 0, "ttl": 0}
+
+    def get_resume_by_raw_hash(self, raw_hash: str) -> dict | None:
+        """Get resume by MD5 hash of the uploaded file bytes if cached"""
+        resume_id = self._raw_hash_cache.get(raw_hash)
+        if resume_id:
+            return self.get_resume(resume_id)
+        return None
+
+    def cache_raw_hash(self, raw_hash: str, resume_id: str) -> None:
+        """Cache the raw file MD5 hash to resume_id mapping"""
+        if resume_id in self._storage:
+            self._raw_hash_cache[raw_hash] = resume_id
+            self._hash_keys[resume_id].add(raw_hash)
+
     def get_resume_by_hash(self, text_hash: str) -> dict | None:
         """Get resume by MD5 hash if cached"""
         resume_id = self._hash_cache.get(text_hash)
@@ -29,53 +281,280 @@ class ResumeStorage:
         resume_id: str,
         file_name: str,
         file_content: str,
-        status: Literal["processing", "completed", "error"] = "processing"
+        status: ResumeStatus = "processing"
     ) -> dict:
         """Store a new resume"""
+        if resume_id in self._storage:
+            self._remove(resume_id)
+
         self._storage[resume_id] = {
             "id": resume_id,
             "fileName": file_name,
-            "file_content": file_content,
             "uploadDate": datetime.utcnow(),
             "status": status,
-            "summary": None
+            "summary": None,
+            "parseVersion": None,
+            "error": None,
+            "error_code": None
         }
+        self._raw_text[resume_id] = zlib.compress(file_content.encode("utf-8"))
+        self._hash_keys[resume_id] = set()
+        self._sizes[resume_id] = 0
+        self._resize(resume_id)
+        self._touch(resume_id)
+        self._enforce_limits()
         return self._storage[resume_id]
 
     def cache_resume_hash(self, text_hash: str, resume_id: str) -> None:
         """Cache the MD5 hash to resume_id mapping"""
-        self._hash_cache[text_hash] = resume_id
+        if resume_id in self._storage:
+            self._hash_cache[text_hash] = resume_id
+            self._hash_keys[resume_id].add(text_hash)
 
     def get_resume(self, resume_id: str) -> dict | None:
         """Get resume by ID"""
-        return self._storage.get(resume_id)
+        record = self._storage.get(resume_id)
+        if record is None:
+            return None
+        if self._expired(resume_id, time.monotonic()):
+            self._evictions["ttl"] += 1
+            self._remove(resume_id)
+            return None
+        self._touch(resume_id)
+        return record
+
+    def get_raw_text(self, resume_id: str) -> str | None:
+        """Get the extracted text of a resume, decompressing it on demand"""
+        compressed = self._raw_text.get(resume_id)
+        if compressed is None:
+            return None
+        return zlib.decompress(compressed).decode("utf-8")
+
+    def get_summary_json(self, resume_id: str) -> SerializedSummary | None:
+        """Get the summary as JSON bytes serialized when it was stored"""
+        return self._summary_json.get(resume_id)
 
     def update_summary(
         self,
         resume_id: str,
         summary: ResumeSummary,
-        status: Literal["processing", "completed", "error"] = "completed"
+        status: ResumeStatus = "completed",
+        parse_version: str | None = None
     ) -> dict | None:
-        """Update resume with parsed summary"""
+        """Update resume with parsed summary and the parse version that produced it"""
         if resume_id not in self._storage:
             return None
 
         self._storage[resume_id]["summary"] = summary
         self._storage[resume_id]["status"] = status
-        return self._storage[resume_id]
+        self._storage[resume_id]["parseVersion"] = parse_version
+        self._summary_json[resume_id] = SerializedSummary.from_body(
+            summary_body(summary), self._raw_text[resume_id]
+        )
+        self._resize(resume_id)
+        self._touch(resume_id)
+        self._notify_summary(resume_id, summary)
+        self._enforce_limits()
+        return self._storage.get(resume_id)
 
     def update_status(
         self,
         resume_id: str,
-        status: Literal["processing", "completed", "error"]
+        status: ResumeStatus,
+        error: str | None = None,
+        error_code: int | None = None
     ) -> dict | None:
-        """Update resume status"""
+        """Update resume status, recording the failure reason for errors"""
         if resume_id not in self._storage:
             return None
 
         self._storage[resume_id]["status"] = status
-        return self._storage[resume_id]
+        self._storage[resume_id]["error"] = error
+        self._storage[resume_id]["error_code"] = error_code
+        self._resize(resume_id)
+        self._touch(resume_id)
+        self._enforce_limits()
+        return self._storage.get(resume_id)
+
+    def delete_resume(self, resume_id: str) -> None:
+        """Remove a resume and any hash mappings pointing at it"""
+        if resume_id in self._storage:
+            self._remove(resume_id)
+
+    def iter_summaries(self) -> Iterator[tuple[str, ResumeSummary]]:
+        """Yield (resume_id, summary) for every completed resume"""
+        for resume_id, record in list(self._storage.items()):
+            if record["status"] == "completed" and record["summary"] is not None:
+                yield resume_id, record["summary"]
+
+    def iter_outdated(self, parse_version: str, max_failures: int | None = None) -> Iterator[str]:
+        """Yield ids of completed resumes parsed with another (or an unknown) parse version, oldest first"""
+        outdated = [
+            record for record in self._storage.values()
+            if self._outdated(record, parse_version)
+            and (max_failures is None or self._failures(record["id"], parse_version) < max_failures)
+        ]
+        outdated.sort(key=lambda record: record["uploadDate"])
+        for record in outdated:
+            yield record["id"]
+
+    def claim_reparse(
+        self,
+        resume_id: str,
+        parse_version: str,
+        owner: str,
+        lease_seconds: float,
+        max_failures: int | None = None
+    ) -> bool:
+        """Lease an outdated resume to one re-parse worker"""
+        record = self._storage.get(resume_id)
+        if record is None or not self._outdated(record, parse_version):
+            return False
+        if max_failures is not None and self._failures(resume_id, parse_version) >= max_failures:
+            return False
+        now = time.time()
+        holder, expires = self._reparse_leases.get(resume_id, (owner, 0.0))
+        if holder != owner and expires > now:
+            return False
+        self._reparse_leases[resume_id] = (owner, now + lease_seconds)
+        return True
+
+    def release_reparse(self, resume_id: str, owner: str, failed_version: str | None = None) -> int:
+        """Drop owner's lease, counting a failed re-parse to failed_version if given; returns the failures so far"""
+        if self._reparse_leases.get(resume_id, (None,))[0] != owner:
+            return 0
+        del self._reparse_leases[resume_id]
+        if failed_version is None:
+            return 0
+        failures = self._failures(resume_id, failed_version) + 1
+        self._reparse_failures[resume_id] = (failed_version, failures)
+        return failures
+
+    def reserve_reparse_tokens(self, tokens: int, window: float, wait_time: SpendPolicy) -> float:
+        """Record tokens spent now unless wait_time asks to wait; returns that wait"""
+        now = time.time()
+        self._expire_spend(now, window)
+        wait = wait_time(list(self._reparse_spend), now)
+        if wait <= 0:
+            self._reparse_spend.append((now, tokens))
+        return wait
+
+    def reparse_tokens_spent(self, window: float) -> int:
+        """Re-parse tokens recorded over the last window seconds"""
+        self._expire_spend(time.time(), window)
+        return sum(tokens for _, tokens in self._reparse_spend)
+
+    def stats(self) -> dict:
+        """Current memory footprint and eviction counters"""
+        return {
+            "backend": "memory",
+            "entries": len(self._storage),
+            "bytes": self._total_bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "hashEntries": len(self._hash_cache),
+            "rawHashEntries": len(self._raw_hash_cache),
+            "evictions": dict(self._evictions),
+        }
+
+    @staticmethod
+    def _outdated(record: dict, parse_version: str) -> bool:
+        return (
+            record["status"] == "completed" and record["summary"] is not None
+            and record["parseVersion"] != parse_version
+        )
+
+    def _failures(self, resume_id: str, parse_version: str) -> int:
+        failed_version, failures = self._reparse_failures.get(resume_id, (None, 0))
+        return failures if failed_version == parse_version else 0
+
+    def _expire_spend(self, now: float, window: float) -> None:
+        while self._reparse_spend and self._reparse_spend[0][0] <= now - window:
+            self._reparse_spend.popleft()
+
+    def _touch(self, resume_id: str) -> None:
+        self._storage.move_to_end(resume_id)
+        self._last_access[resume_id] = time.monotonic()
+
+    def _resize(self, resume_id: str) -> None:
+        """Recompute the estimated footprint of one entry"""
+        record = self._storage[resume_id]
+        size = ENTRY_OVERHEAD_BYTES + len(self._raw_text[resume_id]) + len(record["fileName"])
+        serialized = self._summary_json.get(resume_id)
+        if serialized is not None:
+            size += len(serialized.body)
+        if record["error"]:
+            size += len(record["error"])
+        self._total_bytes += size - self._sizes[resume_id]
+        self._sizes[resume_id] = size
+
+    def _expired(self, resume_id: str, now: float) -> bool:
+        if self.ttl_seconds <= 0 or self._storage[resume_id]["status"] == "processing":
+            return False
+        return now - self._last_access[resume_id] > self.ttl_seconds
+
+    def _enforce_limits(self) -> None:
+        """Evict idle entries past the TTL, then least recently used ones until under the limits"""
+        now = time.monotonic()
+        expired = []
+        # LRU order is also last-access order, so expired entries sit at the front
+        for resume_id in self._storage:
+            if self.ttl_seconds <= 0 or now - self._last_access[resume_id] <= self.ttl_seconds:
+                break
+            if self._expired(resume_id, now):
+                expired.append(resume_id)
+        for resume_id in expired:
+            self._evictions["ttl"] += 1
+            self._remove(resume_id)
+
+        excess_entries = len(self._storage) - self.max_entries
+        excess_bytes = self._total_bytes - self.max_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        # Walk only as far into the LRU order as needed instead of copying every key
+        victims = []
+        for resume_id, record in self._storage.items():
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            if record["status"] == "processing":
+                continue
+            victims.append(resume_id)
+            excess_entries -= 1
+            excess_bytes -= self._sizes[resume_id]
+        for resume_id in victims:
+            self._evictions["lru"] += 1
+            self._remove(resume_id)
+
+    def _remove(self, resume_id: str) -> None:
+        if self._storage[resume_id]["summary"] is not None:
+            self._notify_remove(resume_id)
+        del self._storage[resume_id]
+        self._raw_text.pop(resume_id, None)
+        self._summary_json.pop(resume_id, None)
+        self._last_access.pop(resume_id, None)
+        self._reparse_leases.pop(resume_id, None)
+        self._reparse_failures.pop(resume_id, None)
+        self._total_bytes -= self._sizes.pop(resume_id, 0)
+        for key in self._hash_keys.pop(resume_id, set()):
+            for cache in (self._hash_cache, self._raw_hash_cache):
+                # The hash may have been re-pointed at a newer resume since
+                if cache.get(key) == resume_id:
+                    del cache[key]
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> BaseResumeStorage:
+    """Build the storage backend selected by STORAGE_BACKEND"""
+    if backend == "memory":
+        return ResumeStorage()
+    if backend == "sqlite":
+        from app.services.sqlite_storage import SQLiteResumeStorage
+        return SQLiteResumeStorage(STORAGE_PATH, busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS)
+    raise ValueError(f"Unknown storage backend: {backend}. Use 'memory' or 'sqlite'")
 
 
 # Singleton instance
-storage = ResumeStorage()
+storage = create_storage()
+
+metrics.callback("gridrez_storage_entries", "Stored resumes", lambda: storage.stats()["entries"])
+metrics.callback("gridrez_storage_bytes", "Approximate storage footprint in bytes", lambda: storage.stats()["bytes"])
@@ -0,0 +1,105 @@
+import json
+import os
+import re
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from pydantic import ValidationError
+
+from app.models.schemas import ParsedResumeData
+from app.services.llm import chains
+from app.services.output_stats import output_stats
+from app.services.scheduler import llm_scheduler, estimate_tokens
+
+
+LLM_REPAIR_ENABLED = os.getenv("LLM_REPAIR_ENABLED", "true").lower() == "true"
+LLM_REPAIR_MODEL = os.getenv("LLM_REPAIR_MODEL", "gpt-4o-mini")
+
+RESUME_REPAIR_CHAIN = "resume_repair"
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+REPAIR_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You fix malformed structured output from a resume parser.
+Return the same data, corrected so it is valid for the requested schema. Do not invent information;
+use null or empty lists for anything that cannot be recovered."""),
+    ("user", """Validation error:
+{error}
+
+Output to fix:
+{output}""")
+])
+
+
+def build_repair_chain(llm: ChatOpenAI) -> Runnable:
+    """Small-model chain that turns invalid parser output into ParsedResumeData"""
+    return REPAIR_PROMPT | llm.with_structured_output(ParsedResumeData, method="function_calling")
+
+
+chains.register(RESUME_REPAIR_CHAIN, build_repair_chain, model=LLM_REPAIR_MODEL)
+
+
+def raw_payload(message: AIMessage) -> str:
+    """The model's answer as text: tool call arguments if present, otherwise the content"""
+    if message.tool_calls:
+        return json.dumps(message.tool_calls[0]["args"])
+    if message.invalid_tool_calls:
+        return message.invalid_tool_calls[0].get("args") or ""
+    return message.content if isinstance(message.content, str) else json.dumps(message.content)
+
+
+def repair_locally(payload: str) -> ParsedResumeData | None:
+    """Fix common JSON slips and drop fields that fail validation, without another LLM call"""
+    text = _CODE_FENCE.sub("", payload.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(_TRAILING_COMMA.sub(r"\1", text[start:end + 1]))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    # Invalid fields fall back to their schema defaults
+    for _ in range(2):
+        try:
+            return ParsedResumeData.model_validate(data)
+        except ValidationError as e:
+            for error in e.errors():
+                if error["loc"]:
+                    data.pop(error["loc"][0], None)
+    return None
+
+
+async def repair_output(message: AIMessage, error: Exception | None) -> ParsedResumeData:
+    """Cheap repair pass for invalid output: local fixes first, then a small-model fix-up call.
+
+    Raises OutputParserException if the output cannot be repaired.
+    """
+    output_stats.invalid_outputs += 1
+    payload = raw_payload(message)
+
+    parsed = repair_locally(payload)
+    if parsed is not None:
+        output_stats.local_repairs += 1
+        return parsed
+
+    if LLM_REPAIR_ENABLED and payload.strip():
+        try:
+            chain = chains.get(RESUME_REPAIR_CHAIN)
+            parsed = await llm_scheduler.run(
+                lambda: chain.ainvoke({"output": payload, "error": str(error)}),
+                tokens=2 * estimate_tokens(payload) + 300
+            )
+            output_stats.llm_repairs += 1
+            return parsed
+        except Exception as e:
+            print(f"Warning: LLM repair of parser output failed: {str(e)}")
+
+    output_stats.failures += 1
+    raise OutputParserException(str(error) if error else "Invalid parser output", llm_output=payload)
@@ -0,0 +1,176 @@
+"""Generated resume corpus in TXT, DOCX and PDF at several sizes.
+
+Run from backend/ to write the files:  python -m benchmarks.corpus --out /tmp/gridrez-corpus
+"""
+import argparse
+import io
+import os
+import random
+import textwrap
+from dataclasses import dataclass
+
+from docx import Document
+
+FIRST_NAMES = ["Jane", "John", "Maria", "Wei", "Aisha", "Lukas", "Sofia", "Omar", "Priya", "Tom", "Elena", "Kenji"]
+LAST_NAMES = ["Doe", "Smith", "Garcia", "Chen", "Khan", "Muller", "Rossi", "Haddad", "Patel", "Brown", "Ivanova"]
+CITIES = ["Berlin, Germany", "London, UK", "San Francisco, CA, USA", "Toronto, Canada", "Bangalore, India"]
+ROLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer",
+    "Frontend Developer", "Machine Learning Engineer", "Engineering Manager", "Product Manager",
+]
+SKILLS = [
+    "Python", "Java", "Go", "TypeScript", "React", "Angular", "Kubernetes", "Docker", "Terraform", "AWS", "GCP",
+    "PostgreSQL", "Redis", "Kafka", "Spark", "Airflow", "PyTorch", "SQL", "GraphQL", "FastAPI", "Django", "Linux",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Systems"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Maintained", "Launched", "Automated", "Scaled"]
+OBJECTS = [
+    "the payments platform", "a real-time analytics pipeline", "the customer onboarding flow",
+    "an internal developer portal", "the search ranking service", "a multi-region Kubernetes setup",
+    "the data warehouse", "the mobile API gateway", "a fraud detection model",
+]
+OUTCOMES = [
+    "cutting latency by 40%", "serving 2M daily users", "reducing cloud costs by a third",
+    "with a team of five engineers", "improving conversion by 12%", "raising test coverage to 90%",
+]
+
+# Work history entries per size class; "large" crosses the long-document threshold
+SIZES = {"small": 2, "medium": 8, "large": 100}
+FORMATS = ("txt", "docx", "pdf")
+
+PDF_LINE_CHARS = 95
+PDF_LINES_PER_PAGE = 60
+
+
+@dataclass
+class CorpusFile:
+    name: str
+    size: str
+    format: str
+    text: str
+    content: bytes
+
+
+def resume_text(rng: random.Random, size: str, index: int) -> str:
+    """Plain-text resume with the usual sections; index makes every resume unique"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    role = rng.choice(ROLES)
+    skills = rng.sample(SKILLS, rng.randint(6, 12))
+    year = 2024
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{index}@example.com | +1 555 {index % 1000:03d} {index % 10000:04d} | "
+        f"{rng.choice(CITIES)} | github.com/{first.lower()}{last.lower()}{index}",
+        role,
+        "",
+        "Summary",
+        f"{role} with a track record of shipping {rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}.",
+        "",
+        "Experience",
+    ]
+    for _ in range(SIZES[size]):
+        start = year - rng.randint(1, 3)
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)}, {start} - {year}")
+        for _ in range(rng.randint(3, 5)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}, {rng.choice(OUTCOMES)}.")
+        year = start
+    lines += [
+        "",
+        "Education",
+        f"BSc Computer Science, University of {rng.choice(CITIES).split(',')[0]}, {year - 1}",
+        "",
+        "Skills",
+        ", ".join(skills),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(text: str) -> bytes:
+    """Minimal multi-page PDF with the text set in Helvetica"""
+    lines = [wrapped for line in text.splitlines() for wrapped in (textwrap.wrap(line, PDF_LINE_CHARS) or [""])]
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))}] /Count {len(pages)} >>",
+    ]
+    for i, page in enumerate(pages):
+        stream = "BT /F1 10 Tf 50 800 Td 12 TL " + " ".join(f"({_pdf_escape(line)}) '" for line in page) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def render_docx(text: str) -> bytes:
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def render(text: str, file_format: str) -> bytes:
+    if file_format == "pdf":
+        return render_pdf(text)
+    if file_format == "docx":
+        return render_docx(text)
+    return text.encode("utf-8")
+
+
+def make_corpus(per_size: int = 5, seed: int = 7, start: int = 0) -> list[CorpusFile]:
+    """per_size resumes for every size class and format; the same seed gives the same corpus"""
+    rng = random.Random(seed)
+    files = []
+    index = start
+    for size in SIZES:
+        for _ in range(per_size):
+            text = resume_text(rng, size, index)
+            for file_format in FORMATS:
+                files.append(CorpusFile(
+                    name=f"resume-{size}-{index}.{file_format}",
+                    size=size,
+                    format=file_format,
+                    text=text,
+                    content=render(text, file_format),
+                ))
+            index += 1
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--per-size", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    files = make_corpus(args.per_size, args.seed)
+    for corpus_file in files:
+        with open(os.path.join(args.out, corpus_file.name), "wb") as f:
+            f.write(corpus_file.content)
+    print(f"wrote {len(files)} files to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Local stand-in for ChatOpenAI with configurable latency and error injection.
+
+Answers are built from the rule-based extractor over the resume text in the
+prompt, so the rest of the pipeline (output parsing, repair, summary
+construction) runs as it would against the real API.
+"""
+import asyncio
+import json
+import random
+import re
+from typing import Any, AsyncIterator
+
+import httpx
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import agenerate_from_stream
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.models.schemas import ParsedResumeData
+from app.services.rules import extract_fields
+from app.services.scheduler import estimate_tokens
+
+_RESUME_TEXT = re.compile(r"\n---\n(.*)\n---\n", re.DOTALL)
+_FAKE_REQUEST = httpx.Request("POST", "http://fake-llm/v1/chat/completions")
+
+
+def fake_answer(prompt: str) -> dict:
+    """ParsedResumeData fields for the resume text embedded in the prompt"""
+    match = _RESUME_TEXT.search(prompt)
+    text = match.group(1) if match else prompt
+    values = extract_fields(text).values
+    data = ParsedResumeData(**values).model_dump(mode="json")
+    data["name"] = data["name"] or "Name not provided"
+    data["currentRole"] = data["currentRole"] or "Not specified"
+    data["experienceYears"] = data["experienceYears"] or 0
+    data["summary"] = data["summary"] or f"{data['currentRole']} with {data['experienceYears']} years of experience."
+    return data
+
+
+class FakeResumeChatModel(BaseChatModel):
+    """Chat model that answers resume prompts locally after a simulated delay"""
+
+    latency: float = 0.8         # seconds until the first token
+    jitter: float = 0.2          # +/- share of the latency, uniformly distributed
+    stream_chunks: int = 8       # the answer is streamed in this many pieces
+    chunk_interval: float = 0.02
+    error_rate: float = 0.0      # share of calls failing with a retryable API error
+    rate_limit_rate: float = 0.0  # share of calls failing with 429
+    invalid_rate: float = 0.0    # share of answers failing schema validation, exercising the repair path
+    seed: int | None = None
+    _rng: random.Random | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-resume"
+
+    @property
+    def rng(self) -> random.Random:
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
+
+    def _maybe_fail(self) -> None:
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            response = httpx.Response(429, request=_FAKE_REQUEST, headers={"retry-after": "0.1"})
+            raise openai.RateLimitError("Rate limit reached (injected)", response=response, body=None)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise openai.APITimeoutError(request=_FAKE_REQUEST)
+
+    def _payload(self, messages: list[BaseMessage], **kwargs: Any) -> tuple[str, bool]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        answer = fake_answer(prompt)
+        if self.rng.random() < self.invalid_rate:
+            answer["experienceYears"] = f"about {answer['experienceYears']} years"
+        return json.dumps(answer), bool(kwargs.get("tools"))
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(max(0.0, self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter))))
+        self._maybe_fail()
+        payload, as_tool_call = self._payload(messages, **kwargs)
+        prompt_tokens = sum(estimate_tokens(str(message.content)) for message in messages)
+
+        size = max(1, -(-len(payload) // self.stream_chunks))
+        pieces = [payload[i:i + size] for i in range(0, len(payload), size)]
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(self.chunk_interval)
+            last = index == len(pieces) - 1
+            usage = {
+                "input_tokens": prompt_tokens,
+                "output_tokens": estimate_tokens(payload),
+                "total_tokens": prompt_tokens + estimate_tokens(payload),
+            } if last else None
+            if as_tool_call:
+                tool = kwargs["tools"][0]
+                name = tool.get("function", tool).get("name")
+                chunk = AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{"name": name if index == 0 else None, "args": piece,
+                                       "id": "call_fake" if index == 0 else None, "index": 0}],
+                    usage_metadata=usage,
+                )
+            else:
+                chunk = AIMessageChunk(content=piece, usage_metadata=usage)
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return asyncio.run(self._agenerate(messages, stop, **kwargs))
+
+    def bind_tools(self, tools: list, tool_choice: str | None = None, **kwargs: Any):
+        """Accept function-calling chains; answers then arrive as tool call chunks"""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
@@ -0,0 +1,97 @@
+"""Job-description ranking latency over synthetic resumes.
+
+Run from backend/:  python -m benchmarks.ranking_benchmark --docs 100000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from app.models.schemas import ResumeSummary
+from app.services.ranking import RankingIndex
+
+SKILLS = [
+    "Python", "Java", "Go", "Rust", "C++", "C#", "JavaScript", "TypeScript", "React", "Angular", "Vue",
+    "Node.js", "Django", "FastAPI", "Spring", "Kubernetes", "Docker", "Terraform", "AWS", "GCP", "Azure",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Airflow", "Machine Learning", "PyTorch",
+    "TensorFlow", "NLP", "Computer Vision", "SQL", "GraphQL", "REST", "CI/CD", "Linux", "Git", "Scala",
+] + [f"Framework{i}" for i in range(260)]
+ROLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer",
+    "Frontend Developer", "Machine Learning Engineer", "Site Reliability Engineer", "Engineering Manager",
+]
+# Zipf-like filler vocabulary standing in for the rest of a resume's text
+VOCABULARY = [f"word{i}" for i in range(20000)]
+VOCABULARY_CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def synthetic_resume(rng: random.Random, index: int) -> tuple[ResumeSummary, str]:
+    skills = rng.sample(SKILLS, rng.randint(5, 15))
+    role = rng.choice(ROLES)
+    filler = rng.choices(VOCABULARY, cum_weights=VOCABULARY_CUM_WEIGHTS, k=300)
+    text = f"{role}\n" + " ".join(filler) + "\nSkills: " + ", ".join(skills)
+    summary = ResumeSummary(
+        id=f"resume-{index}",
+        name=f"Candidate {index}",
+        currentRole=role,
+        experienceYears=rng.randint(0, 25),
+        skills=skills,
+        education=[],
+        summary=f"{role} experienced in {', '.join(skills[:3])}.",
+    )
+    return summary, text
+
+
+def synthetic_job(rng: random.Random) -> str:
+    skills = rng.sample(SKILLS[:40], 6)
+    filler = rng.choices(VOCABULARY, cum_weights=VOCABULARY_CUM_WEIGHTS, k=120)
+    return f"We are hiring a {rng.choice(ROLES)} with {', '.join(skills)}. " + " ".join(filler)
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts: dict[str, str] = {}
+    index = RankingIndex(text_source=texts.get)
+
+    started = time.perf_counter()
+    for i in range(args.docs):
+        summary, text = synthetic_resume(rng, i)
+        texts[summary.id] = text
+        index.on_summary(summary.id, summary)
+        del texts[summary.id]
+    index.flush()
+    build_seconds = time.perf_counter() - started
+
+    jobs = [synthetic_job(rng) for _ in range(args.queries)]
+    index.rank(jobs[0], args.limit)  # folds fresh rows into the column-sorted segment
+
+    latencies = []
+    for job in jobs:
+        started = time.perf_counter()
+        index.rank(job, args.limit)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    stats = index.snapshot()
+    print(f"documents:    {stats['documents']}")
+    print(f"non-zeros:    {stats['nonZeros']}")
+    print(f"index build:  {build_seconds:.1f}s ({build_seconds * 1e6 / max(1, args.docs):.0f}us per resume)")
+    print(f"query p50:    {statistics.median(latencies):.2f}ms")
+    print(f"query p95:    {percentile(latencies, 0.95):.2f}ms")
+    print(f"query p99:    {percentile(latencies, 0.99):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
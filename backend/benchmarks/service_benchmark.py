@@ -0,0 +1,284 @@
+"""Offline service benchmark with a fake LLM: extraction, uploads, cache hits and storage memory.
+
+Run from backend/:  python -m benchmarks.service_benchmark --concurrency 1,8,32 --output benchmark.json
+"""
+import os
+
+# The fake model, not the rate limiter, should set the pace; explicit settings still win
+os.environ.setdefault("LLM_RPM", "1000000")
+os.environ.setdefault("LLM_TPM", "1000000000")
+os.environ.setdefault("PARSE_QUEUE_SIZE", "10000")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+# Load the LLM stack before the first timed upload
+os.environ.setdefault("STARTUP_WARMUP", "blocking")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+from app.main import app
+from app.models.schemas import ResumeSummary
+from app.services.extractors import extract_document
+from app.services.llm import chains
+from app.services.scheduler import llm_scheduler
+from app.services.storage import ResumeStorage, storage
+from app.services.output_stats import output_stats
+from benchmarks.corpus import FORMATS, SIZES, make_corpus, render, resume_text
+from benchmarks.fake_llm import FakeResumeChatModel
+
+CONTENT_TYPES = {
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+POLL_SECONDS = 0.005
+COMPLETION_TIMEOUT = 300
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def summarize(latencies_ms: list[float]) -> dict:
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "meanMs": round(statistics.fmean(latencies_ms), 2),
+        "p50Ms": round(percentile(latencies_ms, 0.50), 2),
+        "p95Ms": round(percentile(latencies_ms, 0.95), 2),
+        "p99Ms": round(percentile(latencies_ms, 0.99), 2),
+        "maxMs": round(max(latencies_ms), 2),
+    }
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def bench_extraction(per_size: int, repeat: int, seed: int) -> dict:
+    """In-process extraction throughput per format and size class"""
+    results: dict[str, dict] = {file_format: {} for file_format in FORMATS}
+    corpus = make_corpus(per_size, seed)
+    for size in SIZES:
+        for file_format in FORMATS:
+            files = [f for f in corpus if f.size == size and f.format == file_format]
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for corpus_file in files:
+                    file_started = time.perf_counter()
+                    extract_document(corpus_file.content, corpus_file.name)
+                    latencies.append((time.perf_counter() - file_started) * 1000)
+            elapsed = time.perf_counter() - started
+            total_bytes = sum(len(f.content) for f in files) * repeat
+            results[file_format][size] = {
+                "avgBytes": total_bytes // max(1, len(latencies)),
+                "filesPerSecond": round(len(latencies) / elapsed, 1),
+                "mbPerSecond": round(total_bytes / elapsed / 1e6, 2),
+                **summarize(latencies),
+            }
+    return results
+
+
+async def wait_until_done(resume_id: str) -> str:
+    """Final status of a background parse"""
+    deadline = time.monotonic() + COMPLETION_TIMEOUT
+    while time.monotonic() < deadline:
+        resume = storage.get_resume(resume_id)
+        if resume is None or resume["status"] != "processing":
+            return resume["status"] if resume else "missing"
+        await asyncio.sleep(POLL_SECONDS)
+    return "timeout"
+
+
+async def upload(client: httpx.AsyncClient, name: str, content: bytes, file_format: str) -> httpx.Response:
+    return await client.post(
+        "/api/resumes/upload", files={"file": (name, content, CONTENT_TYPES[file_format])}
+    )
+
+
+async def bench_uploads(client: httpx.AsyncClient, concurrency: int, requests: int, rng: random.Random, start: int) -> dict:
+    """End-to-end latency of fresh uploads: the upload request, and upload until the parse finished"""
+    files = []
+    for i in range(requests):
+        size = list(SIZES)[i % len(SIZES)]
+        file_format = FORMATS[(i // len(SIZES)) % len(FORMATS)]
+        text = resume_text(rng, size, start + i)
+        files.append((f"bench-{start + i}.{file_format}", render(text, file_format), file_format))
+
+    upload_ms: list[float] = []
+    done_ms: list[float] = []
+    outcomes: dict[str, int] = {}
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(name: str, content: bytes, file_format: str) -> None:
+        async with slots:
+            started = time.perf_counter()
+            response = await upload(client, name, content, file_format)
+            upload_ms.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                outcome = str(response.status_code)
+            else:
+                outcome = await wait_until_done(response.json()["id"])
+                done_ms.append((time.perf_counter() - started) * 1000)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(*f) for f in files))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "uploadsPerSecond": round(requests / elapsed, 2),
+        "outcomes": outcomes,
+        "uploadRequest": summarize(upload_ms),
+        "uploadToParsed": summarize(done_ms),
+    }
+
+
+async def bench_cache_hits(client: httpx.AsyncClient, count: int, rng: random.Random, start: int) -> dict:
+    """Latency of re-uploads answered from the raw-byte, text-hash and near-duplicate paths"""
+    originals = [resume_text(rng, "small", start + i) for i in range(count)]
+    for i, text in enumerate(originals):
+        response = await upload(client, f"original-{i}.txt", text.encode(), "txt")
+        await wait_until_done(response.json()["id"])
+
+    variants = {
+        # Byte-identical file
+        "rawHash": lambda text: text,
+        # Different bytes, same normalized text
+        "textHash": lambda text: text + "\n\n",
+        # Same resume with another phone number
+        "nearDuplicate": lambda text: text.replace("+1 555", "+1 556", 1),
+    }
+    results = {}
+    for path, variant in variants.items():
+        latencies = []
+        hits = 0
+        for i, text in enumerate(originals):
+            started = time.perf_counter()
+            response = await upload(client, f"{path}-{i}.txt", variant(text).encode(), "txt")
+            latencies.append((time.perf_counter() - started) * 1000)
+            hits += response.status_code == 200 and response.json()["status"] == "completed"
+        results[path] = {"hitRate": round(hits / max(1, count), 3), **summarize(latencies)}
+    return results
+
+
+def bench_storage_memory(resumes: int, rng: random.Random) -> dict:
+    """Memory held by ResumeStorage per stored, parsed resume"""
+    memory_storage = ResumeStorage(max_entries=resumes + 1, max_bytes=1 << 62, ttl_seconds=0)
+    texts = [resume_text(rng, list(SIZES)[i % 2], i) for i in range(resumes)]
+    rss_before = max_rss_mb()
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    started = time.perf_counter()
+    for i, text in enumerate(texts):
+        resume_id = f"memory-{i}"
+        memory_storage.store_resume(resume_id=resume_id, file_name=f"{resume_id}.txt", file_content=text, status="processing")
+        memory_storage.cache_raw_hash(memory_storage.compute_raw_hash(text.encode()), resume_id)
+        memory_storage.cache_resume_hash(memory_storage.compute_hash(text), resume_id)
+        memory_storage.update_summary(resume_id, ResumeSummary(
+            id=resume_id, name=f"Candidate {i}", currentRole="Software Engineer", experienceYears=i % 20,
+            skills=["Python", "SQL", "Kubernetes"], education=[], summary="Engineer with a long track record.",
+        ), status="completed")
+    elapsed = time.perf_counter() - started
+    traced = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+    stats = memory_storage.stats()
+    return {
+        "resumes": resumes,
+        "avgTextBytes": sum(len(t) for t in texts) // max(1, resumes),
+        "tracedBytesPerResume": traced // max(1, resumes),
+        "reportedBytesPerResume": stats["bytes"] // max(1, resumes),
+        "storesPerSecond": round(resumes / elapsed, 1),
+        "maxRssGrowthMb": round(max_rss_mb() - rss_before, 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    fake_llm = FakeResumeChatModel(
+        latency=args.llm_latency,
+        jitter=args.llm_jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        invalid_rate=args.invalid_rate,
+        seed=args.seed,
+    )
+    chains.override_chat_model(fake_llm)
+
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "fakeLlm": {
+            "latency": args.llm_latency, "jitter": args.llm_jitter, "errorRate": args.error_rate,
+            "rateLimitRate": args.rate_limit_rate, "invalidRate": args.invalid_rate,
+        },
+        "extraction": bench_extraction(args.per_size, args.extraction_repeat, args.seed),
+    }
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            index = 1_000_000
+            report["upload"] = []
+            for concurrency in args.concurrency:
+                report["upload"].append(await bench_uploads(client, concurrency, args.requests, rng, index))
+                index += args.requests
+            report["cacheHits"] = await bench_cache_hits(client, args.cache_requests, rng, index)
+        report["llmOutput"] = output_stats.snapshot()
+        report["llmScheduler"] = llm_scheduler.snapshot()
+
+    report["storageMemory"] = bench_storage_memory(args.storage_resumes, rng)
+    report["maxRssMb"] = max_rss_mb()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=120, help="uploads per concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    parser.add_argument("--cache-requests", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="fake LLM seconds to first token")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of LLM calls failing with a timeout")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of LLM calls failing with 429")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="share of LLM answers failing validation")
+    parser.add_argument("--per-size", type=int, default=3, help="corpus resumes per size class for extraction")
+    parser.add_argument("--extraction-repeat", type=int, default=3)
+    parser.add_argument("--storage-resumes", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        for level in report["upload"]:
+            print(
+                f"concurrency {level['concurrency']:>3}: {level['uploadsPerSecond']} uploads/s, "
+                f"upload-to-parsed p50 {level['uploadToParsed'].get('p50Ms')}ms "
+                f"p95 {level['uploadToParsed'].get('p95Ms')}ms p99 {level['uploadToParsed'].get('p99Ms')}ms"
+            )
+        print(f"report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Startup-time report: import cost of app.main per module and package, and of the deferred warmup imports.
+
+Run from backend/:  python -m benchmarks.startup_report --runs 3 --budget 1.5 --output startup.json
+
+Each run is a fresh interpreter started with -X importtime, so the numbers are
+cold-import costs. The report fails (exit code 1) when the app import exceeds
+--budget seconds or loads one of the heavy packages that should wait for the warmup.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded by the startup warmup (or on first use), never by `import app.main`
+DEFERRED_PACKAGES = ("langchain", "langchain_core", "langchain_openai", "openai", "PyPDF2", "docx", "httpx")
+
+WARMUP_MARKER = "-- warmup --"
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from app.services.startup import WARMUP_MODULES
+sys.stderr.write({WARMUP_MARKER!r} + "\\n")
+sys.stderr.flush()
+for name in WARMUP_MODULES:
+    # __import__ goes through the C import path that -X importtime instruments; importlib.import_module does not
+    __import__(name)
+print(json.dumps({{"appImport": imported - started, "warmupImport": time.perf_counter() - imported}}))
+"""
+
+# import time:       123 |       4567 |     package.module
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+
+def run_probe(env: dict) -> tuple[dict, dict[str, list[dict]]]:
+    """Wall times of one cold start plus its -X importtime rows, split into app and warmup phases"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr[-2000:]}")
+    phases: dict[str, list[dict]] = {"app": [], "warmup": []}
+    phase = "app"
+    for line in result.stderr.splitlines():
+        if line == WARMUP_MARKER:
+            phase = "warmup"
+            continue
+        match = IMPORT_LINE.match(line)
+        if match:
+            phases[phase].append({
+                "module": match.group(3),
+                "selfUs": int(match.group(1)),
+                "cumulativeUs": int(match.group(2)),
+            })
+    return json.loads(result.stdout.strip().splitlines()[-1]), phases
+
+
+def breakdown(rows: list[dict], top: int) -> dict:
+    """Import cost per top-level package (sum of self times) and the slowest modules"""
+    packages: dict[str, int] = defaultdict(int)
+    for row in rows:
+        packages[row["module"].split(".")[0]] += row["selfUs"]
+    app_modules = [row for row in rows if row["module"] == "app" or row["module"].startswith("app.")]
+    return {
+        "modules": len(rows),
+        "selfSeconds": round(sum(row["selfUs"] for row in rows) / 1e6, 4),
+        "packages": [
+            {"package": name, "seconds": round(us / 1e6, 4)}
+            for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "slowestModules": [
+            {"module": row["module"], "selfSeconds": round(row["selfUs"] / 1e6, 4)}
+            for row in sorted(rows, key=lambda row: -row["selfUs"])[:top]
+        ],
+        # Cumulative includes everything the app module pulled in first
+        "appModules": [
+            {"module": row["module"], "cumulativeSeconds": round(row["cumulativeUs"] / 1e6, 4)}
+            for row in sorted(app_modules, key=lambda row: -row["cumulativeUs"])[:top]
+        ],
+    }
+
+
+def report(runs: int, top: int, budget: float | None) -> dict:
+    env = dict(os.environ)
+    # Keep the probe from touching a real database
+    env.setdefault("STORAGE_BACKEND", "memory")
+    samples = [run_probe(env) for _ in range(max(1, runs))]
+    # The fastest run has the least noise from the rest of the machine
+    timings, phases = min(samples, key=lambda sample: sample[0]["appImport"])
+    app_import = statistics.median(sample[0]["appImport"] for sample in samples)
+
+    eager = sorted({
+        row["module"].split(".")[0] for row in phases["app"]
+        if row["module"].split(".")[0] in DEFERRED_PACKAGES
+    })
+    failures = [f"{package} is imported by app.main" for package in eager]
+    if budget is not None and app_import > budget:
+        failures.append(f"app.main took {app_import:.3f}s to import, over the {budget:.3f}s budget")
+
+    return {
+        "python": sys.version.split()[0],
+        "runs": len(samples),
+        "appImportSeconds": round(app_import, 4),
+        "warmupImportSeconds": round(statistics.median(sample[0]["warmupImport"] for sample in samples), 4),
+        "budgetSeconds": budget,
+        "app": breakdown(phases["app"], top),
+        "warmup": breakdown(phases["warmup"], top),
+        "fastestRun": {key: round(value, 4) for key, value in timings.items()},
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to measure; wall times are medians")
+    parser.add_argument("--top", type=int, default=15, help="packages and modules listed per phase")
+    parser.add_argument("--budget", type=float, default=None, help="fail if importing app.main takes longer (seconds)")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    result = report(args.runs, args.top, args.budget)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"app.main import: {result['appImportSeconds']}s, warmup imports: {result['warmupImportSeconds']}s")
+    else:
+        print(text)
+    for failure in result["failures"]:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Tests never reach the LLM; everything is stored in process memory
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["STORAGE_BACKEND"] = "memory"
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=5, queue_timeout=5)
+        first = await controller.acquire("a", 10)
+        admitted = []
+
+        async def wait(client):
+            permit = await controller.acquire(client, 10)
+            admitted.append(client)
+            permit.release()
+
+        waiters = [asyncio.create_task(wait(client)) for client in ("b", "c", "d")]
+        await asyncio.sleep(0)
+        assert controller.waiting == 3
+        first.release()
+        await asyncio.gather(*waiters)
+        return admitted
+
+    assert asyncio.run(scenario()) == ["b", "c", "d"]
+
+
+def test_full_queue_and_timeouts_are_shed_with_503():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_size=1, queue_timeout=0.05)
+        await controller.acquire("a", 10)
+        waiter = asyncio.create_task(controller.acquire("b", 10))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("c", 10)
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await waiter
+        return controller, full.value, timed_out.value
+
+    controller, full, timed_out = asyncio.run(scenario())
+
+    assert (full.status_code, full.reason) == (503, "queueFull")
+    assert (timed_out.status_code, timed_out.reason) == (503, "timeout")
+    assert full.retry_after >= 1
+    assert controller.waiting == 0
+
+
+def test_per_client_limit_returns_429():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=10, per_client=1)
+        await controller.acquire("a", 10)
+        other = await controller.acquire("b", 10)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("a", 10)
+        return other, rejected.value
+
+    other, rejected = asyncio.run(scenario())
+
+    assert other.client == "b"
+    assert (rejected.status_code, rejected.reason) == (429, "perClient")
+
+
+def test_byte_budget_holds_back_large_uploads():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=10, max_bytes=100, queue_timeout=0.05)
+        await controller.acquire("a", 80)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("b", 30)
+        await controller.acquire("c", 20)
+        return controller
+
+    assert asyncio.run(scenario()).bytes_in_use == 100
+
+
+def test_hand_off_keeps_the_slot_until_the_parse_is_done():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, queue_timeout=0.05)
+        permit = await controller.acquire("a", 50)
+        done = permit.hand_off()
+        permit.release()
+        assert (controller.in_flight, controller.bytes_in_use) == (1, 0)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("b", 10)
+
+        done()
+        return controller, await controller.acquire("b", 10)
+
+    controller, permit = asyncio.run(scenario())
+
+    assert permit.client == "b"
+    assert controller.in_flight == 1
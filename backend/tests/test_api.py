@@ -0,0 +1,109 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes import _resume_event_stream
+from app.main import app
+from app.models.schemas import ResumeSummary
+from app.services.events import progress
+from app.services.storage import storage
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _completed_resume() -> str:
+    resume_id = str(uuid.uuid4())
+    storage.store_resume(resume_id, "jane.txt", "Jane Doe\nEngineer")
+    storage.update_summary(resume_id, ResumeSummary(
+        id=resume_id, name="Jane Doe", currentRole="Engineer", experienceYears=5,
+        skills=["Python"], education=[], summary="Engineer"
+    ))
+    return resume_id
+
+
+def test_summary_is_revalidated_with_its_etag(client):
+    resume_id = _completed_resume()
+
+    response = client.get(f"/api/resumes/{resume_id}/summary")
+    etag = response.headers["etag"]
+    cached = client.get(f"/api/resumes/{resume_id}/summary", headers={"If-None-Match": f"W/{etag}"})
+
+    assert response.status_code == 200
+    assert response.json()["rawText"] == "Jane Doe\nEngineer"
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+
+def test_each_representation_has_its_own_etag(client):
+    resume_id = _completed_resume()
+
+    full = client.get(f"/api/resumes/{resume_id}/summary")
+    narrowed = client.get(f"/api/resumes/{resume_id}/summary", params={"fields": "name,skills"})
+
+    assert narrowed.json() == {"name": "Jane Doe", "skills": ["Python"]}
+    assert narrowed.headers["etag"] != full.headers["etag"]
+    stale = client.get(
+        f"/api/resumes/{resume_id}/summary", params={"fields": "name,skills"},
+        headers={"If-None-Match": full.headers["etag"]}
+    )
+    assert stale.status_code == 200
+
+
+def test_events_end_with_the_completed_summary(client):
+    resume_id = _completed_resume()
+
+    response = client.get(f"/api/resumes/{resume_id}/events")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: completed\ndata: {")
+    assert '"name":"Jane Doe"' in response.text
+
+
+def test_events_follow_the_parse_as_it_runs():
+    resume_id = str(uuid.uuid4())
+    storage.store_resume(resume_id, "jane.txt", "Jane Doe\nEngineer")
+
+    async def scenario():
+        events = []
+        stream = _resume_event_stream(resume_id)
+        events.append(await anext(stream))
+        progress.stage(resume_id, "llm")
+        progress.partial(resume_id, {"name": "Jane Doe"})
+        storage.update_status(resume_id, "error", error="Resume processing timed out.", error_code=504)
+        progress.stage(resume_id, "error", status=504)
+        events += [event async for event in stream]
+        return events
+
+    events = asyncio.run(scenario())
+
+    assert events[0] == 'event: stage\ndata: {"stage": "queued"}\n\n'
+    assert events[1] == 'event: stage\ndata: {"stage": "llm"}\n\n'
+    assert events[2] == 'event: partial\ndata: {"name": "Jane Doe"}\n\n'
+    assert events[3].startswith("event: failed\n") and '"status": 504' in events[3]
+    assert not progress.has_subscribers(resume_id)
+
+
+def test_mislabelled_upload_is_refused_while_streaming(client):
+    response = client.post("/api/resumes/upload", files={"file": ("cv.pdf", b"plain text, not a PDF" * 10)})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "cv.pdf: File content does not match its .pdf extension"
+
+
+def test_batch_is_refused_when_one_file_is_too_large(client):
+    files = [
+        ("files", ("a.txt", b"Jane Doe resume " * 10)),
+        ("files", ("big.txt", b"x" * (10 * 1024 * 1024 + 1))),
+    ]
+
+    response = client.post("/api/resumes/batch", files=files)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "big.txt: File size exceeds 10MB limit"
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.services.batches import BatchProcessor, BatchSource
+
+
+async def _run(processor: BatchProcessor, sources: list[BatchSource], on_done=None) -> dict:
+    batch = processor.submit(sources, on_done=on_done)
+    await asyncio.gather(*processor._tasks)
+    return batch
+
+
+def test_finished_batches_beyond_the_limit_are_forgotten_oldest_first():
+    async def scenario():
+        processor = BatchProcessor(max_tracked=2)
+        batches = [await _run(processor, [BatchSource("a.exe", error=(400, "Invalid file type"))]) for _ in range(3)]
+        return processor, [batch["batchId"] for batch in batches]
+
+    processor, ids = asyncio.run(scenario())
+
+    assert processor.get_batch(ids[0]) is None
+    assert processor.get_batch(ids[1]) and processor.get_batch(ids[2])
+
+
+def test_finished_batches_expire_after_the_ttl():
+    async def scenario():
+        processor = BatchProcessor(ttl_seconds=0)
+        batch = await _run(processor, [BatchSource("a.exe", error=(400, "Invalid file type"))])
+        return processor, batch["batchId"]
+
+    processor, batch_id = asyncio.run(scenario())
+
+    assert processor.get_batch(batch_id) is None
+
+
+def test_unreadable_items_fail_alone_and_on_done_runs_once():
+    done = []
+
+    def unreadable() -> bytes:
+        raise ValueError("corrupt archive member")
+
+    async def scenario():
+        processor = BatchProcessor()
+        return await _run(processor, [
+            BatchSource("bad.exe", error=(400, "Invalid file type")),
+            BatchSource("broken.pdf", read=unreadable),
+        ], on_done=lambda: done.append(True))
+
+    batch = asyncio.run(scenario())
+
+    assert batch["status"] == "completed"
+    assert [item["errorCode"] for item in batch["items"]] == [400, 400]
+    assert "corrupt archive member" in batch["items"][1]["detail"]
+    assert done == [True]
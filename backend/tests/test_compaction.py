@@ -0,0 +1,54 @@
+from app.services.compaction import compact_resume_text
+
+
+def test_repeated_job_titles_are_kept():
+    text = "\n".join([
+        "Jane Doe",
+        "jane@example.com",
+        "Experience",
+        "Software Engineer",
+        "Acme Corp, 2020-2023",
+        "Built the billing platform",
+        "Software Engineer",
+        "Globex, 2017-2020",
+        "Maintained the search service",
+        "Software Engineer",
+        "Initech, 2015-2017",
+        "Wrote reporting tools",
+        "Skills",
+        "Python",
+    ])
+
+    compacted = compact_resume_text(text, max_tokens=0).text
+
+    assert compacted.split("\n").count("Software Engineer") == 3
+    assert "Initech, 2015-2017" in compacted
+
+
+def test_page_headers_and_footers_are_removed():
+    employers = ["Acme Corp", "Globex", "Initech"]
+    pages = [
+        "\n".join([
+            "Jane Doe - Resume",
+            "jane@example.com",
+            "Experience",
+            "Software Engineer",
+            f"{employer}, 20{10 + number}-20{13 + number}",
+            "Mentored two junior engineers",
+            f"Shipped project number {number}",
+            f"Led migration number {number}",
+            "Confidential",
+            f"Page {number} of 3",
+        ])
+        for number, employer in enumerate(employers, start=1)
+    ]
+
+    page_lines = [page.count("\n") + 1 for page in pages]
+    lines = compact_resume_text("\n".join(pages), max_tokens=0, page_lines=page_lines).text.split("\n")
+
+    assert lines.count("Jane Doe - Resume") == 1
+    assert lines.count("Confidential") == 1
+    assert not any(line.startswith("Page ") for line in lines)
+    # Repeated inside the pages, not at their edges
+    assert lines.count("Software Engineer") == 3
+    assert lines.count("Mentored two junior engineers") == 3
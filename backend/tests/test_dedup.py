@@ -0,0 +1,74 @@
+import uuid
+
+from app.models.schemas import ResumeSummary
+from app.services.dedup import NearDuplicateIndex, near_duplicates, reuse_near_duplicate, shingles, simhash
+from app.services.storage import storage
+
+
+def _resume(name: str, phone: str, employer: str = "Acme Corp", projects: int = 0) -> str:
+    return "\n".join([
+        name,
+        f"{name.split()[0].lower()}@example.com | {phone}",
+        "Experience",
+        f"Senior Backend Engineer at {employer}, 2018-2024",
+        "Designed the billing platform, led the migration to Kubernetes and mentored four engineers.",
+        "Built an event pipeline processing two billion events a day with Kafka and Flink.",
+        "Education",
+        "BSc Computer Science, Technical University of Berlin, 2014",
+        "Skills",
+        "Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform, gRPC, Redis",
+        *(f"Delivered project {number} with a team of {number % 7 + 2} engineers." for number in range(projects)),
+    ])
+
+
+def test_contact_changes_keep_the_same_fingerprint():
+    original = _resume("Jane Doe", "+49 30 1234567")
+    changed = _resume("Jane Doe", "+49 170 9999999")
+
+    assert shingles(original) == shingles(changed)
+    assert simhash(shingles(original)) == simhash(shingles(changed))
+
+
+def test_index_finds_near_duplicates_only():
+    texts = {"jane": _resume("Jane Doe", "+49 30 1234567")}
+    index = NearDuplicateIndex(text_source=texts.get, threshold=0.9)
+    index.add("jane", simhash(shingles(texts["jane"])))
+
+    assert index.find(_resume("Jane Doe", "+49 170 9999999")) == "jane"
+    assert index.find(_resume("Jane Doe", "+49 30 1234567", employer="Globex Industries Worldwide")) is None
+    assert index.find(texts["jane"], accept=lambda resume_id: False) is None
+    assert index.stats.hits == 1
+
+
+def test_near_duplicate_reuses_the_summary_with_new_contacts():
+    original_id, copy_id = str(uuid.uuid4()), str(uuid.uuid4())
+    original = _resume("Jane Doe", "+49 30 1234567")
+    storage.store_resume(original_id, "jane.txt", original)
+    storage.update_summary(original_id, ResumeSummary(
+        id=original_id, name="Jane Doe", currentRole="Senior Backend Engineer", experienceYears=6,
+        skills=["Python", "Go"], education=[], summary="Backend engineer", phone="+49 30 1234567"
+    ), parse_version="v1")
+
+    changed = _resume("Jane Doe", "+49 170 9999999")
+    stored = reuse_near_duplicate(copy_id, "jane-2.txt", changed, uuid.uuid4().hex, uuid.uuid4().hex)
+
+    assert stored["status"] == "completed"
+    assert stored["parseVersion"] == "v1"
+    assert stored["summary"].id == copy_id
+    assert stored["summary"].currentRole == "Senior Backend Engineer"
+    assert stored["summary"].phone == "+49 170 9999999"
+
+
+def test_same_template_for_another_person_is_not_reused():
+    original_id = str(uuid.uuid4())
+    storage.store_resume(original_id, "john.txt", _resume("John Smith", "+49 30 7654321", projects=80))
+    storage.update_summary(original_id, ResumeSummary(
+        id=original_id, name="John Smith", currentRole="Engineer", experienceYears=6,
+        skills=[], education=[], summary="Engineer"
+    ))
+
+    other = _resume("Johanna Smythe", "+49 30 7654321", projects=80)
+
+    # The texts are close enough; only the name check keeps them apart
+    assert near_duplicates.find(other) == original_id
+    assert reuse_near_duplicate(str(uuid.uuid4()), "other.txt", other, uuid.uuid4().hex, uuid.uuid4().hex) is None
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services.events import ProgressBroker
+
+
+def test_terminal_stages_drop_the_kept_progress():
+    broker = ProgressBroker()
+    broker.stage("r1", "llm")
+    broker.partial("r1", {"name": "Jane Doe"})
+    assert broker.state("r1") == {"stage": "llm", "fields": {"name": "Jane Doe"}}
+
+    broker.stage("r1", "completed")
+
+    assert broker.state("r1") is None
+
+
+def test_forget_only_drops_the_given_stage():
+    broker = ProgressBroker()
+    broker.stage("extracted", "extracting")
+    broker.stage("queued", "extracting")
+    broker.stage("queued", "queued")
+
+    broker.forget("extracted", stage="extracting")
+    broker.forget("queued", stage="extracting")
+
+    assert broker.state("extracted") is None
+    assert broker.state("queued")["stage"] == "queued"
+
+
+def test_oldest_progress_is_dropped_beyond_the_limit():
+    broker = ProgressBroker(max_tracked=2)
+    for resume_id in ("r1", "r2", "r3"):
+        broker.stage(resume_id, "queued")
+
+    assert broker.state("r1") is None
+    assert broker.state("r3")["stage"] == "queued"
+
+
+def test_subscribers_receive_published_events():
+    async def scenario():
+        broker = ProgressBroker()
+        queue = broker.subscribe("r1")
+        broker.stage("r1", "llm")
+        broker.partial("r1", {"skills": ["Python"]})
+        broker.unsubscribe("r1", queue)
+        broker.stage("r1", "completed")
+        return [queue.get_nowait() for _ in range(queue.qsize())], broker.has_subscribers("r1")
+
+    events, subscribed = asyncio.run(scenario())
+
+    assert events == [("stage", {"stage": "llm"}), ("partial", {"skills": ["Python"]})]
+    assert not subscribed
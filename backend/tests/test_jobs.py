@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.models.schemas import ResumeSummary
+from app.services import jobs
+from app.services.jobs import InflightRegistry, ParseJob, ParseJobQueue, QueueFullError, execute_parse_job
+from app.services.storage import storage
+
+
+def _stored_job() -> ParseJob:
+    resume_id = str(uuid.uuid4())
+    storage.store_resume(resume_id, "cv.txt", "Jane Doe resume text")
+    return ParseJob(resume_id=resume_id, text_content="Jane Doe resume text", text_hash=uuid.uuid4().hex)
+
+
+def _summary(resume_id: str) -> ResumeSummary:
+    return ResumeSummary(
+        id=resume_id, name="Jane Doe", currentRole="Engineer", experienceYears=5,
+        skills=["Python"], education=[], summary="Engineer"
+    )
+
+
+def test_single_flight_returns_the_first_owner():
+    registry = InflightRegistry()
+
+    assert registry.claim("hash", "first") is None
+    owner_id, done = registry.claim("hash", "second")
+    assert owner_id == "first"
+    assert not done.is_set()
+
+    registry.release("hash")
+    assert done.is_set()
+    assert registry.claim("hash", "third") is None
+
+
+def test_queue_rejects_jobs_beyond_its_size(monkeypatch):
+    gate = asyncio.Event()
+
+    async def parse(job):
+        await gate.wait()
+        return _summary(job.resume_id)
+
+    monkeypatch.setattr(jobs, "_compact_and_parse", parse)
+
+    async def scenario():
+        queue = ParseJobQueue(workers=1, max_size=1)
+        queue.start()
+        running, waiting = _stored_job(), _stored_job()
+        queue.submit(running)
+        await asyncio.sleep(0)  # the worker picks up the first job
+        queue.submit(waiting)
+        with pytest.raises(QueueFullError):
+            queue.submit(_stored_job())
+
+        gate.set()
+        await queue.shutdown(drain_timeout=5)
+        return queue, running, waiting
+
+    queue, running, waiting = asyncio.run(scenario())
+
+    assert queue.stats.completed == 2
+    assert queue.stats.rejected == 1
+    assert storage.get_resume(running.resume_id)["status"] == "completed"
+    assert storage.get_resume(waiting.resume_id)["status"] == "completed"
+
+
+def test_shutdown_fails_jobs_that_never_started(monkeypatch):
+    async def parse(job):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs, "_compact_and_parse", parse)
+    finished = []
+
+    async def scenario():
+        queue = ParseJobQueue(workers=1, max_size=5)
+        queue.start()
+        running, waiting = _stored_job(), _stored_job()
+        waiting.on_done = lambda: finished.append(waiting.resume_id)
+        queue.submit(running)
+        queue.submit(waiting)
+        await asyncio.sleep(0)
+        await queue.shutdown(drain_timeout=0.05)
+        with pytest.raises(QueueFullError):
+            queue.submit(_stored_job())
+        return waiting
+
+    waiting = asyncio.run(scenario())
+
+    record = storage.get_resume(waiting.resume_id)
+    assert record["status"] == "error"
+    assert record["error_code"] == 503
+    assert finished == [waiting.resume_id]
+
+
+def test_compaction_counts_against_the_job_timeout(monkeypatch):
+    async def slow_compaction(text_content, page_lines=None):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs, "prepare_llm_text", slow_compaction)
+    job = _stored_job()
+
+    error = asyncio.run(execute_parse_job(job, timeout=0.05))
+
+    assert isinstance(error, asyncio.TimeoutError)
+    record = storage.get_resume(job.resume_id)
+    assert record["status"] == "error"
+    assert record["error_code"] == 504
+    # The hash is released, so a retry can claim it
+    assert jobs.inflight.claim(job.text_hash, "retry") is None
@@ -0,0 +1,44 @@
+from app.services.long_resume import CONTEXT_SEPARATOR, split_long_resume
+from app.services.scheduler import estimate_tokens
+
+
+def _resume(jobs: int) -> str:
+    lines = ["Jane Doe", "jane@example.com", "Berlin, Germany", "Experience"]
+    for number in range(jobs):
+        lines += [
+            f"Senior Engineer at Company {number}, 2010-2012",
+            f"Built and operated service number {number} handling payments, search and reporting workloads.",
+        ]
+    lines += ["Education", "BSc Computer Science, TU Berlin, 2009", "Skills", "Python, Go, PostgreSQL"]
+    return "\n".join(lines)
+
+
+def test_every_chunk_fits_the_budget():
+    chunks = split_long_resume(_resume(200), chunk_tokens=500, max_chunks=50)
+
+    assert len(chunks) > 2
+    assert all(estimate_tokens(chunk.text) <= 500 for chunk in chunks)
+
+
+def test_later_chunks_repeat_the_header():
+    chunks = split_long_resume(_resume(200), chunk_tokens=500, max_chunks=50)
+
+    assert chunks[0].text.startswith("Jane Doe")
+    assert all(chunk.text.startswith("Jane Doe") and CONTEXT_SEPARATOR in chunk.text for chunk in chunks[1:])
+    assert "education" in chunks[-1].sections and "skills" in chunks[-1].sections
+
+
+def test_chunks_beyond_the_limit_are_dropped_from_the_end():
+    chunks = split_long_resume(_resume(200), chunk_tokens=500, max_chunks=3)
+
+    assert len(chunks) == 3
+    assert "Company 0," in chunks[0].text
+
+
+def test_overlong_lines_are_split_to_fit():
+    text = "Jane Doe\nExperience\n" + " ".join(["word"] * 3000) + "\n" + "x" * 5000
+
+    chunks = split_long_resume(text, chunk_tokens=500, max_chunks=50)
+
+    assert all(estimate_tokens(chunk.text) <= 500 for chunk in chunks)
+    assert sum(chunk.text.count("word") for chunk in chunks) == 3000
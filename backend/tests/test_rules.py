@@ -0,0 +1,32 @@
+from app.services.rules import DETERMINISTIC_FIELDS, RuleExtraction, extract_fields
+
+
+RESUME = "\n".join([
+    "Jane Doe",
+    "Senior Backend Engineer",
+    "jane@example.com | +49 30 1234567 | github.com/janedoe",
+    "Berlin, Germany",
+    "Experience",
+    "Senior Backend Engineer, Acme Corp, 2018-2024",
+    "Skills",
+    "Python, Go, PostgreSQL",
+])
+
+
+def test_only_deterministic_fields_are_filled_by_default():
+    extraction = extract_fields(RESUME)
+
+    assert extraction.confident(min_confidence=0) <= set(DETERMINISTIC_FIELDS)
+    assert {"name", "email", "phone"} <= extraction.confident()
+    assert extraction.values["email"] == "jane@example.com"
+
+
+def test_more_fields_can_be_allowed():
+    extraction = RuleExtraction()
+    extraction.add("email", "jane@example.com", 1.0)
+    extraction.add("skills", ["Python"], 0.9)
+    extraction.add("summary", "Engineer", 0.5)
+
+    assert extraction.confident(0.85) == {"email"}
+    assert extraction.confident(0.85, fields=frozenset({"email", "skills", "summary"})) == {"email", "skills"}
+    assert not extraction.covers_all(0.85, fields=frozenset({"email", "skills"}))
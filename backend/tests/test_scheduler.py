@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.scheduler import AdaptiveConcurrencyLimiter, LLMScheduler, TokenBucket
+
+
+def test_token_bucket_waits_for_the_refill():
+    async def scenario():
+        bucket = TokenBucket(per_minute=600)  # 10 tokens per second
+        assert await bucket.acquire(600) is False
+        started = time.monotonic()
+        waited = await bucket.acquire(2)
+        return waited, time.monotonic() - started
+
+    waited, elapsed = asyncio.run(scenario())
+
+    assert waited is True
+    assert 0.15 <= elapsed < 1
+
+
+def test_token_bucket_caps_requests_larger_than_its_capacity():
+    async def scenario():
+        bucket = TokenBucket(per_minute=60)
+        return await bucket.acquire(1000)
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_limiter_halves_on_throttling_and_grows_additively():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=8, min_limit=1, latency_target=10)
+        await limiter.acquire()
+        await limiter.release("throttled", 1)
+        after_throttle = limiter.limit
+        await limiter.acquire()
+        await limiter.release("success", 1)
+        after_success = limiter.limit
+        await limiter.acquire()
+        await limiter.release("success", 60)
+        return after_throttle, after_success, limiter.limit
+
+    after_throttle, after_success, after_slow = asyncio.run(scenario())
+
+    assert after_throttle == 4
+    assert after_success == pytest.approx(4.25)
+    assert after_slow == pytest.approx(4.25 * 0.9)
+
+
+def test_limiter_never_drops_below_its_minimum():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4, min_limit=2)
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.release("throttled", 1)
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_limiter_blocks_calls_beyond_the_limit():
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(max_limit=1)
+        await limiter.acquire()
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not second.done()
+        await limiter.release("success", 0.1)
+        await second
+        return blocked, limiter.in_flight
+
+    assert asyncio.run(scenario()) == (True, 1)
+
+
+def test_scheduler_does_not_retry_permanent_errors():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    scheduler = LLMScheduler(rpm=6000, tpm=100000, max_retries=3)
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call, tokens=10))
+
+    assert len(calls) == 1
+    assert scheduler.limiter.in_flight == 0
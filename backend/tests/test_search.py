@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.models.schemas import ResumeSummary
+from app.services import index_sync as index_sync_module
+from app.services.index_sync import IndexSync
+from app.services.search import ResumeIndex, ResumeQuery
+from app.services.sqlite_storage import SQLiteResumeStorage
+
+
+def _summary(resume_id: str, skills: list[str], years: int = 5) -> ResumeSummary:
+    return ResumeSummary(
+        id=resume_id, name="Jane Doe", currentRole="Backend Engineer", experienceYears=years,
+        skills=skills, education=[], summary="Engineer", location="Berlin, Germany"
+    )
+
+
+def test_cursor_pages_through_matches_newest_first():
+    index = ResumeIndex()
+    for number in range(5):
+        index.on_summary(f"r{number}", _summary(f"r{number}", ["Python"]))
+
+    first = index.search(ResumeQuery(all_skills=["python"]), limit=2)
+    second = index.search(ResumeQuery(all_skills=["python"]), limit=2, cursor=first.next_cursor)
+    last = index.search(ResumeQuery(all_skills=["python"]), limit=2, cursor=second.next_cursor)
+
+    assert first.ids == ["r4", "r3"]
+    assert second.ids == ["r2", "r1"]
+    assert last.ids == ["r0"]
+    assert last.next_cursor is None
+    assert first.total == 5
+
+
+def test_cursor_stays_valid_when_resumes_are_added():
+    index = ResumeIndex()
+    for number in range(3):
+        index.on_summary(f"r{number}", _summary(f"r{number}", ["Python"]))
+    first = index.search(ResumeQuery(), limit=2)
+
+    index.on_summary("new", _summary("new", ["Python"]))
+
+    assert index.search(ResumeQuery(), limit=2, cursor=first.next_cursor).ids == ["r0"]
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        ResumeIndex().search(ResumeQuery(), cursor="not-a-cursor!")
+
+
+def test_filters_combine_skills_years_and_exclusions():
+    index = ResumeIndex()
+    index.on_summary("py", _summary("py", ["Python", "Docker"], years=3))
+    index.on_summary("go", _summary("go", ["Go", "Docker"], years=8))
+    index.on_summary("js", _summary("js", ["JavaScript"], years=10))
+
+    query = ResumeQuery(any_skills=["python", "go"], not_skills=["javascript"], min_years=5, location="berlin")
+
+    assert index.search(query).ids == ["go"]
+
+
+def test_index_sync_replays_other_workers_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "shared.db")
+    local, other = SQLiteResumeStorage(path), SQLiteResumeStorage(path)
+    index = ResumeIndex()
+    local.add_listener(index)
+    monkeypatch.setattr(index_sync_module, "storage", local)
+    sync = IndexSync(interval=0)
+    sync.mark()
+
+    other.store_resume("remote", "remote.txt", "text")
+    other.update_summary("remote", _summary("remote", ["Rust"]))
+    assert asyncio.run(sync.sync_once()) == 1
+    assert index.search(ResumeQuery(all_skills=["rust"])).ids == ["remote"]
+
+    other.delete_resume("remote")
+    asyncio.run(sync.sync_once())
+    assert len(index) == 0
@@ -0,0 +1,125 @@
+import sqlite3
+import time
+
+from app.models.schemas import ResumeSummary
+from app.services.storage import ResumeStorage
+from app.services.sqlite_storage import SQLiteResumeStorage
+
+
+def _summary(resume_id: str, name: str = "Jane Doe") -> ResumeSummary:
+    return ResumeSummary(
+        id=resume_id, name=name, currentRole="Engineer", experienceYears=5,
+        skills=["Python"], education=[], summary="Engineer"
+    )
+
+
+def _completed(store, resume_id: str, text: str = "resume text") -> None:
+    store.store_resume(resume_id, f"{resume_id}.txt", text)
+    store.update_summary(resume_id, _summary(resume_id))
+
+
+def test_least_recently_used_resume_is_evicted_first():
+    store = ResumeStorage(max_entries=2)
+    _completed(store, "a")
+    _completed(store, "b")
+    store.get_resume("a")
+
+    _completed(store, "c")
+
+    assert store.get_resume("b") is None
+    assert store.get_resume("a") and store.get_resume("c")
+    assert store.stats()["evictions"]["lru"] == 1
+
+
+def test_processing_resumes_are_never_evicted():
+    store = ResumeStorage(max_entries=1)
+    store.store_resume("a", "a.txt", "first")
+    store.store_resume("b", "b.txt", "second")
+
+    assert store.get_resume("a")["status"] == "processing"
+    assert store.get_resume("b")["status"] == "processing"
+
+
+def test_byte_limit_evicts_and_drops_hash_mappings():
+    store = ResumeStorage(max_bytes=3000)
+    _completed(store, "a", "x" * 100)
+    store.cache_resume_hash("text-hash", "a")
+    store.cache_raw_hash("raw-hash", "a")
+
+    _completed(store, "b", "y" * 100)
+    _completed(store, "c", "z" * 100)
+
+    assert store.stats()["bytes"] <= 3000
+    assert store.get_resume("a") is None
+    assert store.get_resume_by_hash("text-hash") is None
+    assert store.get_resume_by_raw_hash("raw-hash") is None
+
+
+def test_idle_resumes_expire_after_the_ttl():
+    store = ResumeStorage(ttl_seconds=0.05)
+    _completed(store, "old")
+    time.sleep(0.1)
+
+    _completed(store, "new")
+
+    assert store.get_resume("old") is None
+    assert store.get_resume("new")
+    assert store.stats()["evictions"]["ttl"] == 1
+
+
+def test_summary_etag_changes_with_the_summary():
+    store = ResumeStorage()
+    _completed(store, "a")
+    first = store.get_summary_json("a")
+
+    store.update_summary("a", _summary("a", name="Jane Q. Doe"))
+    second = store.get_summary_json("a")
+
+    assert first.etag != second.etag
+    assert b"Jane Q. Doe" in second.body
+    assert b"rawText" not in second.body
+
+
+def test_sqlite_migrates_the_legacy_schema(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE resumes (
+            id TEXT PRIMARY KEY, file_name TEXT NOT NULL, file_content TEXT NOT NULL,
+            upload_date TEXT NOT NULL, status TEXT NOT NULL, summary TEXT, error TEXT, error_code INTEGER
+        );
+    """)
+    conn.execute(
+        "INSERT INTO resumes VALUES ('old', 'old.txt', 'Old text é', '2024-01-01T00:00:00', 'completed', ?, NULL, NULL)",
+        (_summary("old").model_dump_json(),)
+    )
+    conn.commit()
+    conn.close()
+
+    store = SQLiteResumeStorage(path)
+    SQLiteResumeStorage(path)  # migrating twice is a no-op
+
+    assert store.get_raw_text("old") == "Old text é"
+    assert store.get_resume("old")["summary"].name == "Jane Doe"
+    columns = {row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(resumes)")}
+    assert "file_content" not in columns
+
+
+def test_reparse_spend_is_recorded_only_when_the_policy_allows():
+    store = ResumeStorage()
+
+    assert store.reserve_reparse_tokens(100, 3600, lambda spent, now: 0.0) == 0.0
+    assert store.reserve_reparse_tokens(50, 3600, lambda spent, now: 12.5) == 12.5
+    assert store.reparse_tokens_spent(3600) == 100
+
+
+def test_sqlite_reparse_spend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "shared.db")
+    first, second = SQLiteResumeStorage(path), SQLiteResumeStorage(path)
+
+    first.reserve_reparse_tokens(100, 3600, lambda spent, now: 0.0)
+    seen = []
+    second.reserve_reparse_tokens(50, 3600, lambda spent, now: seen.append([tokens for _, tokens in spent]) or 0.0)
+
+    assert seen == [[100]]
+    assert first.reparse_tokens_spent(3600) == 150
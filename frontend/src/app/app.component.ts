@@ -29,7 +29,7 @@ export class AppComponent {
 
     this.resumeService.uploadResume(file).subscribe({
       next: (response) => {
-        if (response.status === 'completed') {
+        if (response.status === 'completed' || response.status === 'processing') {
           this.uploadComponent.setProcessing();
           this.fetchSummary(response.id);
         } else if (response.status === 'error') {
@@ -44,7 +44,7 @@ export class AppComponent {
   }
 
   private fetchSummary(id: string): void {
-    this.resumeService.pollForSummary(id).subscribe({
+    this.resumeService.watchSummary(id, (progress) => this.uploadComponent.setProgress(progress)).subscribe({
       next: (summary) => {
         this.summary = summary;
         this.currentView = 'summary';
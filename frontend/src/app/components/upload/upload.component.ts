@@ -1,5 +1,6 @@
 import { Component, EventEmitter, Output } from '@angular/core';
 import { CommonModule } from '@angular/common';
+import { ParseProgress } from '../../models/resume.model';
 
 export type UploadState = 'idle' | 'dragging' | 'uploading' | 'processing' | 'error';
 
@@ -16,6 +17,7 @@ export class UploadComponent {
   state: UploadState = 'idle';
   selectedFile: File | null = null;
   errorMessage: string = '';
+  progressNote: string = '';
 
   private readonly maxFileSize = 10 * 1024 * 1024; // 10MB
   private readonly allowedTypes = ['application/pdf', 'text/plain', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'];
@@ -86,6 +88,19 @@ export class UploadComponent {
 
   setProcessing(): void {
     this.state = 'processing';
+    this.progressNote = '';
+  }
+
+  setProgress(progress: ParseProgress): void {
+    if (progress.stage === 'extracting') {
+      this.progressNote = 'Extracting text...';
+    } else if (progress.stage === 'queued') {
+      this.progressNote = 'Waiting for a parser...';
+    } else if (progress.stage === 'llm') {
+      this.progressNote = 'Reading your resume...';
+    } else if (progress.fields?.name) {
+      this.progressNote = `Found ${progress.fields.name}...`;
+    }
   }
 
   setError(message: string): void {
@@ -97,6 +112,7 @@ export class UploadComponent {
     this.state = 'idle';
     this.selectedFile = null;
     this.errorMessage = '';
+    this.progressNote = '';
   }
 
   formatFileSize(bytes: number): string {
@@ -33,3 +33,8 @@ export interface ResumeUploadResponse {
   uploadDate: string;
   status: 'processing' | 'completed' | 'error';
 }
+
+export interface ParseProgress {
+  stage?: 'extracting' | 'queued' | 'llm';
+  fields?: Partial<Omit<ResumeSummary, 'id' | 'rawText'>>;
+}
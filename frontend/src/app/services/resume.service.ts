@@ -1,7 +1,7 @@
 import { Injectable, inject } from '@angular/core';
 import { HttpClient, HttpResponse } from '@angular/common/http';
-import { Observable, switchMap, timer, filter, map, take } from 'rxjs';
-import { ResumeUploadResponse, ResumeSummary } from '../models/resume.model';
+import { Observable, Subscription, switchMap, timer, filter, map, take } from 'rxjs';
+import { ResumeUploadResponse, ResumeSummary, ParseProgress } from '../models/resume.model';
 import { environment } from '../../environments/environment';
 
 @Injectable({
@@ -35,6 +35,49 @@ export class ResumeService {
     );
   }
 
+  /**
+   * Follow parse progress over Server-Sent Events, falling back to polling
+   * if the event stream cannot be used.
+   */
+  watchSummary(id: string, onProgress?: (progress: ParseProgress) => void): Observable<ResumeSummary> {
+    return new Observable<ResumeSummary>((subscriber) => {
+      if (typeof EventSource === 'undefined') {
+        return this.pollForSummary(id).subscribe(subscriber);
+      }
+
+      const source = new EventSource(`${this.apiUrl}/${id}/events`);
+      let fallback: Subscription | null = null;
+
+      source.addEventListener('stage', (event) => {
+        onProgress?.({ stage: JSON.parse((event as MessageEvent).data).stage });
+      });
+      source.addEventListener('partial', (event) => {
+        onProgress?.({ fields: JSON.parse((event as MessageEvent).data) });
+      });
+      source.addEventListener('completed', (event) => {
+        source.close();
+        subscriber.next(JSON.parse((event as MessageEvent).data) as ResumeSummary);
+        subscriber.complete();
+      });
+      source.addEventListener('failed', (event) => {
+        source.close();
+        subscriber.error({ error: JSON.parse((event as MessageEvent).data) });
+      });
+      source.onerror = () => {
+        // Connection problem (proxy, server restart) - fall back to polling
+        source.close();
+        if (!fallback) {
+          fallback = this.pollForSummary(id).subscribe(subscriber);
+        }
+      };
+
+      return () => {
+        source.close();
+        fallback?.unsubscribe();
+      };
+    });
+  }
+
   private getSummaryResponse(id: string): Observable<HttpResponse<ResumeSummary | { detail: string }>> {
     return this.http.get<ResumeSummary>(`${this.apiUrl}/${id}/summary`, {
       observe: 'response'